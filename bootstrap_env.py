@@ -18,6 +18,7 @@ Hinweis:
 
 from __future__ import annotations
 
+import codecs
 import hashlib
 import json
 import os
@@ -28,14 +29,32 @@ from pathlib import Path
 import venv
 
 
+_IS_WIN = os.name == "nt"
+# Prevent spawning extra console windows when running from .pyw
+_CREATE_NO_WINDOW = 0x08000000 if _IS_WIN else 0
+
+
 class BootstrapError(RuntimeError):
     pass
 
 
+def _hidden_console_kwargs(hide_window: bool) -> dict:
+    """Popen kwargs that keep console children (pip, python -c) invisible on Windows."""
+    if not (hide_window and _IS_WIN):
+        return {}
+    si = subprocess.STARTUPINFO()
+    si.dwFlags |= subprocess.STARTF_USESHOWWINDOW  # wShowWindow defaults to SW_HIDE
+    return {"creationflags": _CREATE_NO_WINDOW, "startupinfo": si}
+
+
 def _hash_file(path: Path) -> str:
-    h = hashlib.sha256()
-    h.update(path.read_bytes())
-    return h.hexdigest()
+    with path.open("rb") as f:
+        if hasattr(hashlib, "file_digest"):  # Python 3.11+
+            return hashlib.file_digest(f, "sha256").hexdigest()
+        h = hashlib.sha256()
+        while chunk := f.read(1 << 20):
+            h.update(chunk)
+        return h.hexdigest()
 
 
 def _state_path(venv_dir: Path) -> Path:
@@ -43,13 +62,13 @@ def _state_path(venv_dir: Path) -> Path:
 
 
 def _venv_python(venv_dir: Path) -> Path:
-    if os.name == "nt":
+    if _IS_WIN:
         return venv_dir / "Scripts" / "python.exe"
     return venv_dir / "bin" / "python"
 
 
 def _venv_pythonw(venv_dir: Path) -> Path:
-    if os.name == "nt":
+    if _IS_WIN:
         return venv_dir / "Scripts" / "pythonw.exe"
     # On POSIX there's no pythonw; normal python is fine.
     return _venv_python(venv_dir)
@@ -63,7 +82,9 @@ def ensure_venv(venv_dir: Path, logger) -> None:
 
     logger(f"Erstelle Virtualenv: {venv_dir}")
     try:
-        builder = venv.EnvBuilder(with_pip=True)
+        # pip is seeded lazily by ensure_installed() (ensurepip only if missing);
+        # on POSIX the interpreter is symlinked instead of copied.
+        builder = venv.EnvBuilder(with_pip=False, symlinks=(not _IS_WIN))
         builder.create(venv_dir)
     except Exception as exc:  # noqa: BLE001
         raise BootstrapError(f"Virtualenv konnte nicht erstellt werden: {exc}") from exc
@@ -72,6 +93,23 @@ def ensure_venv(venv_dir: Path, logger) -> None:
         raise BootstrapError("Virtualenv erstellt, aber python.exe/python nicht gefunden.")
 
 
+def _pump_output(stream, logger) -> None:
+    """Forward raw pipe output to logger, one call per line."""
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    pending = ""
+    while True:
+        chunk = stream.read(65536)
+        if not chunk:
+            break
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            logger(line.rstrip("\r"))
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        logger(pending.rstrip("\r"))
+
+
 def _run(
     cmd: list[str],
     cwd: Path,
@@ -81,27 +119,25 @@ def _run(
 ) -> int:
     """Run a subprocess and stream merged stdout/stderr to logger."""
     logger(f"$ {' '.join(cmd)}")
-    creationflags = 0
-    if hide_window and os.name == "nt":
-        # Prevent spawning extra console windows when running from .pyw
-        creationflags = 0x08000000  # CREATE_NO_WINDOW
-
     try:
         proc = subprocess.Popen(
             cmd,
             cwd=str(cwd),
             stdout=subprocess.PIPE,
             stderr=subprocess.STDOUT,
-            text=True,
-            encoding="utf-8",
-            errors="replace",
-            creationflags=creationflags,
+            bufsize=0,
+            **_hidden_console_kwargs(hide_window),
         )
     except FileNotFoundError as exc:
         raise BootstrapError(f"Programm nicht gefunden: {cmd[0]}") from exc
 
     assert proc.stdout is not None
-    for line in proc.stdout:
+    # A helper thread drains the pipe in large chunks, so this thread can react
+    # to cancel requests even while the child prints nothing (or no newline).
+    pump = threading.Thread(target=_pump_output, args=(proc.stdout, logger), daemon=True)
+    pump.start()
+    while pump.is_alive():
+        pump.join(timeout=0.1)
         if cancel_event is not None and cancel_event.is_set():
             try:
                 proc.terminate()
@@ -109,7 +145,6 @@ def _run(
                 pass
             logger("Abbruch angefordert. Beende Prozess …")
             break
-        logger(line.rstrip("\n"))
 
     try:
         return proc.wait(timeout=30)
@@ -131,9 +166,36 @@ def _load_state(venv_dir: Path) -> dict:
         return {}
 
 
+def _write_atomic(path: Path, text: str) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(text, encoding="utf-8")
+    os.replace(tmp, path)
+
+
 def _save_state(venv_dir: Path, state: dict) -> None:
-    sp = _state_path(venv_dir)
-    sp.write_text(json.dumps(state, indent=2, sort_keys=True), encoding="utf-8")
+    # Machine-only file: compact JSON.
+    _write_atomic(_state_path(venv_dir), json.dumps(state, separators=(",", ":")))
+
+
+def _sidecar_path(venv_dir: Path) -> Path:
+    return venv_dir / ".requirements.txt.sha256"
+
+
+def _sidecar_hash(req: Path, venv_dir: Path) -> str | None:
+    """Cached digest of `req` if the sidecar's recorded size/mtime still match."""
+    try:
+        digest, size, mtime_ns = _sidecar_path(venv_dir).read_text(encoding="utf-8").split()
+        st = req.stat()
+    except (OSError, ValueError):
+        return None
+    if str(st.st_size) != size or str(st.st_mtime_ns) != mtime_ns:
+        return None
+    return digest
+
+
+def _write_sidecar_hash(req: Path, venv_dir: Path, digest: str) -> None:
+    st = req.stat()
+    _write_atomic(_sidecar_path(venv_dir), f"{digest}  {st.st_size}  {st.st_mtime_ns}\n")
 
 
 def _deps_ok(venv_dir: Path, root_dir: Path, logger, cancel_event=None, hide_window=False) -> bool:
@@ -154,14 +216,55 @@ def _deps_ok(venv_dir: Path, root_dir: Path, logger, cancel_event=None, hide_win
         "import jfo; "
         "print('imports-ok')"
     )
-    rc = _run(
-        [str(py), "-c", code],
-        cwd=root_dir,
-        logger=logger,
-        cancel_event=cancel_event,
-        hide_window=hide_window,
-    )
-    return rc == 0
+    # One-shot check: no streaming or cancel needed, output only matters on failure.
+    cmd = [str(py), "-c", code]
+    try:
+        res = subprocess.run(
+            cmd,
+            cwd=str(root_dir),
+            capture_output=True,
+            text=True,
+            encoding="utf-8",
+            errors="replace",
+            timeout=30,
+            check=False,
+            **_hidden_console_kwargs(hide_window),
+        )
+    except subprocess.TimeoutExpired:
+        logger(f"$ {' '.join(cmd)}")
+        logger("Import-Check: Zeitüberschreitung.")
+        return False
+    except FileNotFoundError:
+        logger(f"Programm nicht gefunden: {cmd[0]}")
+        return False
+    if res.returncode != 0:
+        logger(f"$ {' '.join(cmd)}")
+        for line in (res.stdout + res.stderr).splitlines():
+            logger(line)
+        return False
+    return True
+
+
+def _site_packages_mtime_ns(venv_dir: Path) -> int:
+    if _IS_WIN:
+        candidates = [venv_dir / "Lib" / "site-packages"]
+    else:
+        candidates = sorted((venv_dir / "lib").glob("python*/site-packages"))
+    for sp in candidates:
+        try:
+            return sp.stat().st_mtime_ns
+        except OSError:
+            continue
+    return 0
+
+
+def _deps_signature(root_dir: Path, venv_dir: Path, req_hash: str) -> list:
+    """Inputs of the import check; if none changed, its result still holds."""
+    try:
+        jfo_mtime = (root_dir / "src" / "jfo" / "__init__.py").stat().st_mtime_ns
+    except OSError:
+        jfo_mtime = 0
+    return [req_hash, jfo_mtime, _site_packages_mtime_ns(venv_dir)]
 
 
 def ensure_installed(root_dir: Path, venv_dir: Path, logger, cancel_event=None, hide_window=False) -> None:
@@ -182,12 +285,23 @@ def ensure_installed(root_dir: Path, venv_dir: Path, logger, cancel_event=None,
         raise BootstrapError(f"requirements.txt nicht gefunden in {root_dir}")
 
     state = _load_state(venv_dir)
-    current_hash = _hash_file(req)
+    # Same mtime and size as recorded in the sidecar: skip rehashing.
+    current_hash = _sidecar_hash(req, venv_dir)
+    if current_hash is None:
+        current_hash = _hash_file(req)
+        if state.get("requirements_hash") == current_hash:
+            # Touched but unchanged content: remember the new mtime/size.
+            _write_sidecar_hash(req, venv_dir, current_hash)
     need_install = state.get("requirements_hash") != current_hash
 
     if not need_install:
+        signature = _deps_signature(root_dir, venv_dir, current_hash)
+        if state.get("deps_ok_signature") == signature:
+            logger("✓ Requirements & App unverändert seit letztem erfolgreichen Check.")
+            return
         logger("requirements.txt unverändert – prüfe Imports …")
         if _deps_ok(venv_dir, root_dir, logger, cancel_event=cancel_event, hide_window=hide_window):
+            _save_state(venv_dir, {**_load_state(venv_dir), "deps_ok_signature": signature})
             logger("✓ Requirements & App sind verfügbar.")
             return
         logger("✗ Import-Check fehlgeschlagen – führe Reparatur/Installation aus …")
@@ -196,26 +310,32 @@ def ensure_installed(root_dir: Path, venv_dir: Path, logger, cancel_event=None,
     py = _venv_python(venv_dir)
 
     logger("Stelle sicher, dass pip verfügbar ist …")
-    _run(
-        [str(py), "-m", "ensurepip", "--upgrade"],
-        cwd=root_dir,
-        logger=logger,
-        cancel_event=cancel_event,
-        hide_window=hide_window,
-    )
-
-    logger("Aktualisiere pip …")
-    _run(
-        [str(py), "-m", "pip", "install", "--upgrade", "pip"],
+    pip_rc = _run(
+        [str(py), "-c", "import pip"],
         cwd=root_dir,
         logger=logger,
         cancel_event=cancel_event,
         hide_window=hide_window,
     )
+    if pip_rc != 0:
+        _run(
+            [str(py), "-m", "ensurepip", "--upgrade"],
+            cwd=root_dir,
+            logger=logger,
+            cancel_event=cancel_event,
+            hide_window=hide_window,
+        )
 
-    logger("Installiere/aktualisiere Dependencies …")
+    # One pip run for pip itself and the requirements: one interpreter start,
+    # and the resolver sees everything at once.
+    logger("Aktualisiere pip und installiere/aktualisiere Dependencies …")
     rc = _run(
-        [str(py), "-m", "pip", "install", "-r", str(req)],
+        [
+            str(py), "-m", "pip", "install",
+            "--disable-pip-version-check", "--no-input", "--prefer-binary",
+            "--upgrade", "pip",
+            "-r", str(req),
+        ],
         cwd=root_dir,
         logger=logger,
         cancel_event=cancel_event,
@@ -227,7 +347,14 @@ def ensure_installed(root_dir: Path, venv_dir: Path, logger, cancel_event=None,
     if not _deps_ok(venv_dir, root_dir, logger, cancel_event=cancel_event, hide_window=hide_window):
         raise BootstrapError("Installation abgeschlossen, aber Import-Check schlägt weiterhin fehl.")
 
-    _save_state(venv_dir, {"requirements_hash": current_hash})
+    _save_state(
+        venv_dir,
+        {
+            "requirements_hash": current_hash,
+            "deps_ok_signature": _deps_signature(root_dir, venv_dir, current_hash),
+        },
+    )
+    _write_sidecar_hash(req, venv_dir, current_hash)
     logger("✓ Installation abgeschlossen.")
 
 
@@ -249,8 +376,9 @@ def run_app(root_dir: Path, venv_dir: Path, logger, hide_window: bool = False) -
             [str(py), "-m", "jfo"],
             cwd=str(root_dir),
             env=env,
-            close_fds=(os.name != "nt"),
-            creationflags=(0x08000000 if (hide_window and os.name == "nt") else 0),
+            close_fds=(not _IS_WIN),
+            # No startupinfo here: SW_HIDE would also hide the app's own window.
+            creationflags=(_CREATE_NO_WINDOW if hide_window else 0),
         )
     except Exception as exc:  # noqa: BLE001
         raise BootstrapError(f"Programmstart fehlgeschlagen: {exc}") from exc
@@ -13,10 +13,12 @@ Safety philosophy:
   (e.g. rename files, then rename folder).
 """
 
+import re
 import shlex
-from typing import Any, Iterable, List, Tuple
+from typing import Any, Callable, Iterable, Iterator, List, Tuple
 
 from jfo.core.operations import Operation, OperationKind
+from jfo.core.pathutil import posix_join, posix_normpath, posix_split
 from jfo.core.plan import Plan
 
 
@@ -37,6 +39,20 @@ def ops_to_journal_dicts(ops: Iterable[Operation]) -> List[dict[str, Any]]:
     return out
 
 
+def journal_dicts_selected(plan: Plan) -> List[dict[str, Any]]:
+    """Journal dicts for the currently selected ops of `plan`.
+
+    The per-op dicts are built once per plan revision (e.g. on the plan-build
+    worker) so the execute worker only filters by the `selected` flag.
+    """
+
+    cache = plan._journal_cache
+    if cache is None or cache[0] != plan.revision:
+        cache = (plan.revision, ops_to_journal_dicts(plan.operations))
+        plan._journal_cache = cache
+    return [d for op, d in zip(plan.operations, cache[1]) if op.selected]
+
+
 def ops_from_journal(record: dict[str, Any]) -> List[Operation]:
     """Load executed operations from a journal record.
 
@@ -82,47 +98,89 @@ def ops_from_journal(record: dict[str, Any]) -> List[Operation]:
     return parse_ops_from_script(script)
 
 
+# Fast path for the exact quoting bash_quote() emits: an argument is a run of
+# '...' segments, "'" escapes and bare '/' joins (hoisted "$_D"/'name' form).
+_ARG_PATTERN = r"""(?:'[^']*'|"'"|/)+"""
+_HELPER_LINE_RE = re.compile(r"(safe_\w+)((?:[ \t]+" + _ARG_PATTERN + r")+)[ \t]*\Z")
+_ARG_RE = re.compile(_ARG_PATTERN)
+_SEGMENT_RE = re.compile(r"""'([^']*)'|"(')"|(/)""")
+
+
+def _unquote_arg(token: str) -> str:
+    return "".join(a or b or c for a, b, c in _SEGMENT_RE.findall(token))
+
+
+def _split_helper_line(line: str) -> List[str] | None:
+    m = _HELPER_LINE_RE.match(line)
+    if m is not None:
+        return [m.group(1)] + [_unquote_arg(t) for t in _ARG_RE.findall(m.group(2))]
+    try:
+        return shlex.split(line, posix=True)
+    except Exception:
+        return None
+
+
+def _ops_mv_into(parts: List[str]) -> List[Operation]:
+    d = parts[1].rstrip("/") or "/"
+    return [
+        Operation(kind=OperationKind.MOVE, src=src, dst=posix_normpath(posix_join(d, posix_split(src)[1])), selected=True)
+        for src in parts[2:]
+    ]
+
+
+# helper name -> (minimum argument count incl. the name, parts -> operations)
+_SCRIPT_HANDLERS: dict[str, Tuple[int, Callable[[List[str]], List[Operation]]]] = {
+    "safe_mv": (3, lambda p: [Operation(kind=OperationKind.MOVE, src=p[1], dst=p[2], selected=True)]),
+    "safe_mv_into": (3, _ops_mv_into),
+    "safe_ln": (3, lambda p: [Operation(kind=OperationKind.LINK, src=p[1], dst=p[2], selected=True)]),
+    "safe_cp": (3, lambda p: [Operation(kind=OperationKind.COPY, src=p[1], dst=p[2], selected=True)]),
+    "safe_mkdir": (2, lambda p: [Operation(kind=OperationKind.MKDIR, src=None, dst=p[1], selected=True)]),
+}
+
+
 def parse_ops_from_script(script: str) -> List[Operation]:
     """Best-effort parse of selected operations from a generated bash script.
 
     We intentionally parse only the helper calls we generate:
       - safe_mv SRC DST
+      - safe_mv_into DIR SRC...
       - safe_ln SRC DST
       - safe_cp SRC DST
       - safe_mkdir DIR
+      - _D=DIR (directory hoisted for following `"$_D"/NAME` arguments)
 
-    We use shlex.split() to correctly interpret concatenated shell quotes,
-    including the common bash-quote pattern: 'foo'"'"'bar'.
+    Lines in the exact form bash_quote() produces are split with a regex; anything
+    else goes through shlex.split(), which handles arbitrary shell quoting.
     """
 
     ops: List[Operation] = []
+    hoisted_dir = "''"
     for raw_line in script.splitlines():
         line = raw_line.strip()
-        if not line or line.startswith("#"):
+        if not line or line[0] == "#":
+            continue
+        if line.startswith("_D="):
+            # Keep the quoted literal; it joins with the following '/NAME'.
+            hoisted_dir = line[3:]
             continue
         if not (line.startswith("safe_") or line.startswith("run ")):
             continue
+        line = line.replace('"$_D"', hoisted_dir)
 
-        try:
-            parts = shlex.split(line, posix=True)
-        except Exception:
-            continue
+        parts = _split_helper_line(line)
         if not parts:
             continue
 
-        cmd = parts[0]
-        if cmd == "safe_mv" and len(parts) >= 3:
-            ops.append(Operation(kind=OperationKind.MOVE, src=parts[1], dst=parts[2], selected=True))
-        elif cmd == "safe_ln" and len(parts) >= 3:
-            ops.append(Operation(kind=OperationKind.LINK, src=parts[1], dst=parts[2], selected=True))
-        elif cmd == "safe_cp" and len(parts) >= 3:
-            ops.append(Operation(kind=OperationKind.COPY, src=parts[1], dst=parts[2], selected=True))
-        elif cmd == "safe_mkdir" and len(parts) >= 2:
-            ops.append(Operation(kind=OperationKind.MKDIR, src=None, dst=parts[1], selected=True))
+        handler = _SCRIPT_HANDLERS.get(parts[0])
+        if handler is not None and len(parts) >= handler[0]:
+            ops.extend(handler[1](parts))
 
     return ops
 
 
+_UNDOABLE_KINDS = frozenset({OperationKind.MOVE, OperationKind.RENAME})
+
+
 def build_undo_plan(
     executed_ops: List[Operation],
     *,
@@ -138,37 +196,35 @@ def build_undo_plan(
     - Other operations are skipped by default.
     """
 
-    undo_ops: List[Operation] = []
     skipped: List[str] = []
 
-    for op in reversed(executed_ops):
-        if op.kind in (OperationKind.MOVE, OperationKind.RENAME):
-            if not op.src or not op.dst:
-                continue
-            undo_ops.append(
-                Operation(
+    def _undo_ops() -> Iterator[Operation]:
+        for op in reversed(executed_ops):
+            if op.kind in _UNDOABLE_KINDS:
+                if not op.src or not op.dst:
+                    continue
+                yield Operation(
                     kind=OperationKind.MOVE,
                     src=op.dst,
                     dst=op.src,
-                    detail=("UNDO " + (op.detail or "")).strip(),
+                    detail=f"UNDO {op.detail}".strip() if op.detail else "UNDO",
                     selected=True,
                 )
-            )
-            continue
+                continue
 
-        if op.kind == OperationKind.MKDIR:
-            # We do not remove directories automatically.
-            continue
+            if op.kind == OperationKind.MKDIR:
+                # We do not remove directories automatically.
+                continue
 
-        if only_mv_rename:
-            skipped.append(f"Skip undo for {op.kind.value}: {op.src or ''} -> {op.dst or ''}")
-            continue
+            if only_mv_rename:
+                skipped.append(f"Skip undo for {op.kind.value}: {op.src or ''} -> {op.dst or ''}")
+                continue
 
-        # Future extension point (dangerous): could implement safe_rm for LINK/COPY.
-        skipped.append(f"Unsupported undo op: {op.kind.value}")
+            # Future extension point (dangerous): could implement safe_rm for LINK/COPY.
+            skipped.append(f"Unsupported undo op: {op.kind.value}")
 
     plan = Plan(title=title)
-    plan.extend(undo_ops)
+    plan.extend(_undo_ops())
     plan.apply_collision_warnings()
     for m in skipped:
         plan.add_warning(m)
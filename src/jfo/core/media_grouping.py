@@ -1,34 +1,51 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
+from functools import cached_property
 from pathlib import PurePosixPath
-from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+from typing import Dict, FrozenSet, Iterable, List, Optional, Sequence, Set, Tuple
+
+from .pathutil import posix_name, posix_parent
+
+
+def _split_suffix(name: str) -> Tuple[str, str]:
+    """(stem, suffix) with PurePosixPath semantics: ".nfo" and "a." have no suffix."""
+    i = name.rfind(".")
+    if 0 < i < len(name) - 1:
+        return name[:i], name[i:]
+    return name, ""
 
 
 @dataclass(frozen=True)
 class MediaFile:
+    """One indexed file. The name parts are derived once with string ops.
+
+    group_media_files() compares suffix/stem for every (video, file) pair in a
+    directory, so they are cached instead of re-parsing a path object per access.
+    """
+
     path: str
 
     @property
     def p(self) -> PurePosixPath:
         return PurePosixPath(self.path)
 
-    @property
+    @cached_property
     def dir(self) -> str:
-        return str(self.p.parent)
+        return posix_parent(self.path)
 
-    @property
+    @cached_property
     def name(self) -> str:
-        return self.p.name
+        return posix_name(self.path)
 
-    @property
+    @cached_property
     def suffix(self) -> str:
-        return self.p.suffix.lower().lstrip(".")
+        return _split_suffix(self.name)[1].lower().lstrip(".")
 
-    @property
+    @cached_property
     def stem(self) -> str:
         # PurePosixPath.stem only removes last suffix; we want full stem for video.
-        return self.p.stem
+        return _split_suffix(self.name)[0]
 
 
 @dataclass
@@ -74,7 +91,7 @@ DEFAULT_SIDECAR_EXTS: Set[str] = {
 
 # Jellyfin/Kodi folder-level artwork naming (common when each movie has its own folder).
 # We only attach these to a video group when the directory contains exactly ONE video file.
-FOLDER_LEVEL_SIDECAR_NAMES: Set[str] = {
+FOLDER_LEVEL_SIDECAR_NAMES: FrozenSet[str] = frozenset({
     # artwork
     "poster.jpg",
     "poster.jpeg",
@@ -106,19 +123,24 @@ FOLDER_LEVEL_SIDECAR_NAMES: Set[str] = {
     "folder.jpg",
     "folder.jpeg",
     "folder.png",
-}
+})
 
 
-FOLDER_LEVEL_NFO_NAMES: Set[str] = {
+FOLDER_LEVEL_NFO_NAMES: FrozenSet[str] = frozenset({
     # common Kodi/Jellyfin folder-level nfo name for movies
     "movie.nfo",
-}
+})
+
+# Lowercased folder-level file name -> suffix appended to a new file stem when
+# renaming it alongside the movie (e.g. poster.jpg -> "<stem>-poster.jpg").
+# NFO names win over artwork names, matching the grouping order below.
+FOLDER_LEVEL_DISPATCH: Dict[str, str] = {n: "-" + n for n in FOLDER_LEVEL_SIDECAR_NAMES}
+FOLDER_LEVEL_DISPATCH.update({n: ".nfo" for n in FOLDER_LEVEL_NFO_NAMES if n.endswith(".nfo")})
 
 
 def _stem_and_suffix(name: str) -> Tuple[str, str]:
-    p = PurePosixPath(name)
-    suf = p.suffix.lower().lstrip(".")
-    return p.stem, suf
+    stem, suf = _split_suffix(name)
+    return stem, suf.lower().lstrip(".")
 
 
 def group_media_files(
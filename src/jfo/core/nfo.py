@@ -6,6 +6,8 @@ import xml.etree.ElementTree as ET
 
 
 _IMDB_RE = re.compile(r"tt\d{3,10}")
+_YEAR_DIGITS_RE = re.compile(r"\d{4}")
+_YEAR_IN_DATE_RE = re.compile(r"\b(19\d{2}|20\d{2})\b")
 
 
 @dataclass(frozen=True)
@@ -17,12 +19,63 @@ class NfoInfo:
     imdbid: str | None
 
 
-def _text(root: ET.Element, tag: str) -> str | None:
-    el = root.find(tag)
-    if el is None or el.text is None:
+def _child_texts(root: ET.Element) -> dict[str, str]:
+    """First non-empty stripped text per direct child tag (one pass over the children)."""
+
+    vals: dict[str, str] = {}
+    for child in root:
+        if child.text and child.tag not in vals:
+            t = child.text.strip()
+            if t:
+                vals[child.tag] = t
+    return vals
+
+
+# Once these direct children are known nothing later in the file can change
+# the result (imdbid has the highest imdb priority), so scanning stops there.
+_EARLY_EXIT_TAGS = frozenset({"title", "originaltitle", "year", "imdbid"})
+_FEED_CHUNK = 1 << 16
+
+
+def _stream_child_texts(doc: str | bytes) -> dict[str, str] | None:
+    """_child_texts() of the document root, read incrementally.
+
+    Subtrees are dropped as soon as they end (cast/plot blocks are most of a
+    large NFO) and parsing stops once _EARLY_EXIT_TAGS are all seen. Returns
+    None when the full-tree path is needed: a parse error (e.g. several
+    top-level nodes) before that point, or a literal <root> wrapper.
+    """
+
+    parser = ET.XMLPullParser(events=("start", "end"))
+    vals: dict[str, str] = {}
+    root: ET.Element | None = None
+    depth = 0
+    try:
+        for i in range(0, len(doc), _FEED_CHUNK):
+            parser.feed(doc[i : i + _FEED_CHUNK])
+            for event, elem in parser.read_events():
+                if event == "start":
+                    if root is None:
+                        if elem.tag == "root":
+                            return None
+                        root = elem
+                    depth += 1
+                    continue
+                depth -= 1
+                if depth != 1:
+                    continue
+                if elem.text and elem.tag not in vals:
+                    t = elem.text.strip()
+                    if t:
+                        vals[elem.tag] = t
+                        if _EARLY_EXIT_TAGS.issubset(vals) and _YEAR_DIGITS_RE.search(vals["year"]):
+                            return vals
+                assert root is not None
+                root.clear()
+        parser.close()
+    except ET.ParseError:
         return None
-    t = el.text.strip()
-    return t if t else None
+    return vals
 
 
 def parse_nfo(xml_text: str) -> NfoInfo:
@@ -33,6 +86,9 @@ def parse_nfo(xml_text: str) -> NfoInfo:
 
     # Some NFOs start with BOM or whitespace.
     xml_text = xml_text.lstrip("\ufeff\n\r\t ")
+    vals = _stream_child_texts(xml_text)
+    if vals is not None:
+        return _info_from_vals(vals)
     try:
         root = ET.fromstring(xml_text)
     except ET.ParseError:
@@ -40,7 +96,26 @@ def parse_nfo(xml_text: str) -> NfoInfo:
         # Wrap into a dummy node.
         wrapped = f"<root>{xml_text}</root>"
         root = ET.fromstring(wrapped)
+    return _info_from_root(root)
 
+
+def parse_nfo_bytes(data: bytes) -> NfoInfo:
+    """Like parse_nfo(), but straight from file bytes (no decode + re-encode).
+
+    The C parser honours the XML declaration's encoding. Anything it rejects goes
+    through the text path with its multi-root fallback.
+    """
+
+    data = data.lstrip(b"\n\r\t ")
+    if data.startswith(b"\xef\xbb\xbf"):
+        data = data[3:].lstrip(b"\n\r\t ")
+    vals = _stream_child_texts(data)
+    if vals is None:
+        return parse_nfo(data.decode("utf-8", errors="replace"))
+    return _info_from_vals(vals)
+
+
+def _info_from_root(root: ET.Element) -> NfoInfo:
     # Movie root is often <movie>. TV episodes can be <episodedetails>.
     # If we wrapped, root is <root>.
     if root.tag == "root":
@@ -49,38 +124,37 @@ def parse_nfo(xml_text: str) -> NfoInfo:
             if child.tag in {"movie", "tvshow", "episodedetails"}:
                 root = child
                 break
+    return _info_from_vals(_child_texts(root))
+
 
-    title = _text(root, "title")
-    original_title = _text(root, "originaltitle")
+def _info_from_vals(vals: dict[str, str]) -> NfoInfo:
+    title = vals.get("title")
+    original_title = vals.get("originaltitle")
 
-    year_raw = _text(root, "year")
+    year_raw = vals.get("year")
     year: int | None = None
     if year_raw:
-        try:
-            year = int(re.findall(r"\d{4}", year_raw)[0])
-        except Exception:
-            year = None
+        m = _YEAR_DIGITS_RE.search(year_raw)
+        if m:
+            year = int(m.group(0))
 
     # Fallbacks: some NFOs use <premiered>YYYY-MM-DD</premiered> or similar.
     if year is None:
         for tag in ("premiered", "releasedate", "released", "dateadded"):
-            v = _text(root, tag)
+            v = vals.get(tag)
             if not v:
                 continue
-            m = re.search(r"\b(19\d{2}|20\d{2})\b", v)
+            m = _YEAR_IN_DATE_RE.search(v)
             if m:
-                try:
-                    year = int(m.group(1))
-                    break
-                except Exception:
-                    pass
+                year = int(m.group(1))
+                break
 
     imdb_raw = (
-        _text(root, "imdbid")
-        or _text(root, "imdb_id")
-        or _text(root, "imdb")
-        or _text(root, "id")
-        or _text(root, "uniqueid")
+        vals.get("imdbid")
+        or vals.get("imdb_id")
+        or vals.get("imdb")
+        or vals.get("id")
+        or vals.get("uniqueid")
     )
 
     imdbid: str | None = None
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from dataclasses import dataclass, field
+from dataclasses import dataclass
 from enum import Enum
 from typing import Optional
 
@@ -13,7 +13,8 @@ class OperationKind(str, Enum):
     COPY = "cp"
 
 
-@dataclass
+# Plans hold tens of thousands of these; slots keep them small and cheap to build.
+@dataclass(slots=True)
 class Operation:
     kind: OperationKind
     src: Optional[str] = None
@@ -23,7 +24,7 @@ class Operation:
     selected: bool = True
     warning: str = ""
     # A stable identifier (for UI selection persistence)
-    op_id: str = field(default_factory=lambda: "")
+    op_id: str = ""
 
     def display_src(self) -> str:
         return self.src or ""
@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+"""Cheap string helpers for remote POSIX paths.
+
+Equivalent to PurePosixPath(p).parent / .name for the absolute, already
+normalized paths we get from the index and `find`, without building a path
+object per call (these run in per-file loops while building plans).
+"""
+
+from pathlib import PurePosixPath
+
+
+def posix_name(path: str) -> str:
+    return path.rstrip("/").rsplit("/", 1)[-1]
+
+
+def posix_parent(path: str) -> str:
+    stripped = path.rstrip("/")
+    if "/" not in stripped:
+        return "/" if path.startswith("/") else "."
+    return stripped.rsplit("/", 1)[0] or "/"
+
+
+def posix_join(directory: str, name: str) -> str:
+    return directory.rstrip("/") + "/" + name
+
+
+def is_normalized_abs(path: str) -> bool:
+    """True if str(PurePosixPath(path)) == path for an absolute path.
+
+    No empty or "." segments and no trailing slash; ".." is left to the caller.
+    """
+
+    if not path.startswith("/"):
+        return False
+    if path == "/":
+        return True
+    return not path.endswith("/") and "//" not in path and "/./" not in path + "/"
+
+
+def posix_normpath(path: str) -> str:
+    """str(PurePosixPath(path)), skipping the path object when already normalized."""
+
+    if is_normalized_abs(path):
+        return path
+    return str(PurePosixPath(path))
+
+
+def posix_split(path: str) -> tuple[str, str]:
+    """(parent, name) like PurePosixPath; string-only for normalized absolute paths."""
+
+    if is_normalized_abs(path):
+        if path == "/":
+            return "/", ""
+        parent, _, name = path.rpartition("/")
+        return parent or "/", name
+    p = PurePosixPath(path)
+    return str(p.parent), p.name
+
+
+def is_plain_name(name: str) -> bool:
+    """True for a single path segment: non-empty, no '/', not '.' or '..'."""
+
+    return bool(name) and "/" not in name and name not in (".", "..")
@@ -1,10 +1,17 @@
 from __future__ import annotations
 
+import itertools
+from collections import Counter
 from dataclasses import dataclass, field
 from typing import Iterable, List, Dict
 
 from .operations import Operation
 
+_COLLISION_PREFIX = "Collision: multiple ops target "
+_COLLISIONS_SUFFIX = " destination collision(s) detected inside the plan."
+
+_plan_ids = itertools.count(1)
+
 
 @dataclass
 class Plan:
@@ -16,34 +23,91 @@ class Plan:
     title: str
     operations: List[Operation] = field(default_factory=list)
     warnings: List[str] = field(default_factory=list)
+    # Bumped on every mutation (extend / selection toggle) so callers can cache derived output.
+    revision: int = field(default=0, compare=False)
+    # Unique per Plan instance for the process lifetime. Unlike id(), it is never
+    # reused after a plan is freed, so (uid, revision) is a safe cache key.
+    uid: int = field(default_factory=lambda: next(_plan_ids), init=False, compare=False)
+    # (revision, per-op journal dicts) filled lazily by history.journal_dicts_selected().
+    _journal_cache: tuple[int, list] | None = field(default=None, init=False, repr=False, compare=False)
+    # (revision, number of selected ops); see count_selected() / set_selected().
+    _selected_cache: tuple[int, int] | None = field(default=None, init=False, repr=False, compare=False)
+    # Revision at which apply_collision_warnings() last ran (and left the plan).
+    _collisions_rev: int | None = field(default=None, init=False, repr=False, compare=False)
 
     def selected_operations(self) -> List[Operation]:
         return [op for op in self.operations if op.selected]
 
     def count_selected(self) -> int:
-        return sum(1 for op in self.operations if op.selected)
+        """Number of selected ops, cached per revision.
+
+        Flip `selected` through set_selected() (or call mark_changed() after
+        editing ops directly) so the cached count stays valid.
+        """
+        cache = self._selected_cache
+        if cache is None or cache[0] != self.revision:
+            cache = (self.revision, sum(1 for op in self.operations if op.selected))
+            self._selected_cache = cache
+        return cache[1]
+
+    def set_selected(self, op: Operation, selected: bool) -> None:
+        """Toggle one op and keep the selected count current without a rescan."""
+        if op.selected == selected:
+            return
+        n = self.count_selected()
+        journal = self._journal_cache
+        op.selected = selected
+        self.revision += 1
+        self._selected_cache = (self.revision, n + (1 if selected else -1))
+        # Journal dicts do not include the selection flag, so they stay valid.
+        if journal is not None and journal[0] == self.revision - 1:
+            self._journal_cache = (self.revision, journal[1])
 
     def detect_destination_collisions(self) -> Dict[str, List[Operation]]:
         """Detect collisions where multiple selected operations target the same dst."""
+        counts = Counter(op.dst for op in self.operations if op.selected and op.dst)
         by_dst: Dict[str, List[Operation]] = {}
-        for op in self.selected_operations():
-            if not op.dst:
-                continue
-            by_dst.setdefault(op.dst, []).append(op)
-        return {dst: ops for dst, ops in by_dst.items() if len(ops) > 1}
+        for op in self.operations:
+            if op.selected and op.dst and counts[op.dst] > 1:
+                by_dst.setdefault(op.dst, []).append(op)
+        return by_dst
 
     def apply_collision_warnings(self) -> None:
-        """Annotate operations with warnings when dst collides within the plan."""
+        """Annotate operations with warnings when dst collides within the plan.
+
+        Warnings from an earlier call are replaced, not appended to, so the
+        annotation can be re-run after toggles. A repeated call on an unchanged
+        plan is a no-op.
+        """
+        if self._collisions_rev == self.revision:
+            return
         collisions = self.detect_destination_collisions()
-        for dst, ops in collisions.items():
-            for op in ops:
-                op.warning = (op.warning + "; " if op.warning else "") + f"Collision: multiple ops target {dst}"
+        derived = {id(op): f"{_COLLISION_PREFIX}{dst}" for dst, ops in collisions.items() for op in ops}
+        changed = False
+        for op in self.operations:
+            base = op.warning
+            if _COLLISION_PREFIX in base:
+                base = "; ".join(p for p in base.split("; ") if not p.startswith(_COLLISION_PREFIX))
+            note = derived.get(id(op))
+            warning = (base + "; " if base else "") + note if note else base
+            if warning != op.warning:
+                op.warning = warning
+                changed = True
+        self.warnings = [w for w in self.warnings if not w.endswith(_COLLISIONS_SUFFIX)]
         if collisions:
-            self.warnings.append(f"{len(collisions)} destination collision(s) detected inside the plan.")
+            self.warnings.append(f"{len(collisions)}{_COLLISIONS_SUFFIX}")
+        if changed:
+            self.mark_changed()
+        self._collisions_rev = self.revision
 
     def add_warning(self, msg: str) -> None:
         if msg not in self.warnings:
             self.warnings.append(msg)
 
+    def mark_changed(self) -> None:
+        """Signal an in-place change (e.g. a toggled `selected` flag)."""
+        self.revision += 1
+
     def extend(self, ops: Iterable[Operation]) -> None:
-        self.operations.extend(list(ops))
+        self.operations.extend(ops)
+        self.revision += 1
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import functools
 import re
 
 
@@ -17,9 +18,10 @@ def assert_safe_text(value: str, *, what: str = "text") -> None:
     - other control chars are disallowed because they break logs and scripts
     """
 
-    if "\x00" in value:
-        raise QuoteError(f"{what} contains NUL byte, refusing.")
+    # One scan; _CONTROL_RE includes NUL, the message is picked only on failure.
     if _CONTROL_RE.search(value):
+        if "\x00" in value:
+            raise QuoteError(f"{what} contains NUL byte, refusing.")
         raise QuoteError(f"{what} contains control character, refusing.")
 
 
@@ -31,14 +33,33 @@ def bash_quote(arg: str) -> str:
     This is safe against globbing, whitespace, &, (), *, etc.
     """
 
-    assert_safe_text(arg, what="path")
-    if arg == "":
-        return "''"
+    return _bash_quote_cached(arg)
+
+
+# Scripts repeat the same directory prefixes in nearly every operation.
+@functools.lru_cache(maxsize=8192)
+def _bash_quote_cached(arg: str) -> str:
+    # isprintable() is a single C-level scan that is False for every control
+    # character, so the regex check only runs for unusual names.
+    if not arg.isprintable():
+        assert_safe_text(arg, what="path")
+    return _quote_checked_text(arg)
+
+
+def _quote_checked_text(arg: str) -> str:
+    """Quote text that already passed assert_safe_text()."""
+
+    if "'" not in arg:
+        return "'" + arg + "'"
     # Close quote, insert escaped single quote, reopen.
     return "'" + arg.replace("'", "'\"'\"'") + "'"
 
 
 def bash_array_literal(items: list[str]) -> str:
+    # Validate the whole array with one scan; only fall back to per-item
+    # checks (which raise with the usual message) when something is off.
+    if "".join(items).isprintable():
+        return "(" + " ".join(_quote_checked_text(x) for x in items) + ")"
     return "(" + " ".join(bash_quote(x) for x in items) + ")"
 
 
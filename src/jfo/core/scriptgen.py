@@ -6,6 +6,7 @@ from pathlib import PurePosixPath
 from typing import List
 
 from .operations import OperationKind
+from .pathutil import posix_split
 from .plan import Plan
 from .quoting import bash_array_literal, bash_quote
 
@@ -17,6 +18,17 @@ class ScriptOptions:
     no_overwrite: bool = True
     show_linkcount: bool = True
     on_exists: str = "error"  # 'error' or 'skip'
+    # Emit a human-readable "# N. mv SRC -> DST" line before each helper call.
+    # Disabling it roughly halves the script size for large plans; the tabs
+    # turn it off above ANNOTATE_OPS_MAX selected ops.
+    annotate_ops: bool = True
+    # Emit in-place renames as `safe_mv "$_D"/'old' "$_D"/'new'`, assigning the
+    # shared directory to _D once per run of renames in the same folder.
+    hoist_dirs: bool = False
+
+
+# Plans with more selected ops than this are generated without per-op comments.
+ANNOTATE_OPS_MAX = 1000
 
 
 def _normalize_root(root: str) -> str:
@@ -115,6 +127,32 @@ safe_cp() {
   run cp -a -- "$src" "$dst"
 }
 
+safe_mv_into() {
+  # Move several sources into one directory, keeping their names.
+  # Checks run per source, but only one mv process is spawned.
+  local d="$1"; shift
+  assert_in_roots "$d"
+  local -a todo=()
+  local src dst
+  for src in "$@"; do
+    dst="${d%/}/${src##*/}"
+    assert_in_roots "$src"
+    assert_in_roots "$dst"
+    if [[ ! -e "$src" ]]; then die "Source missing:" "$src"; fi
+    if [[ -e "$dst" && "$NO_OVERWRITE" == "1" ]]; then
+      if [[ "$ON_EXISTS" == "skip" ]]; then
+        log "SKIP exists:" "$dst"
+        continue
+      fi
+      die "Destination exists:" "$dst"
+    fi
+    todo+=("$src")
+  done
+  if (( ${#todo[@]} == 0 )); then return 0; fi
+  run mkdir -p -- "$d"
+  run mv -- "${todo[@]}" "${d%/}/"
+}
+
 dev_id() {
   # device id of file or directory
   local p="$1"
@@ -160,6 +198,69 @@ safe_ln() {
 '''
 
 
+def _move_into_dir(op) -> str | None:
+    """Return the destination directory if `op` only moves a file into it (same name)."""
+
+    if op.kind not in (OperationKind.MOVE, OperationKind.RENAME) or not op.src or not op.dst:
+        return None
+    src_dir, src_name = posix_split(op.src)
+    dst_dir, dst_name = posix_split(op.dst)
+    if src_name != dst_name or src_dir == dst_dir:
+        return None
+    return dst_dir
+
+
+# Each batch becomes one `mv -- srcs... dir/` argv; stay well below ARG_MAX
+# (and the smaller limits of BusyBox shells on NAS boxes).
+_MV_BATCH_MAX_SRCS = 256
+_MV_BATCH_MAX_BYTES = 64 * 1024
+
+
+def _move_batches(ops) -> List[tuple[str | None, list]]:
+    """Group consecutive same-name moves into one directory.
+
+    Returns (target_dir, ops) pairs; target_dir is None for ops that must be
+    emitted individually. Batches never contain two sources with the same name
+    and are capped by source count and quoted argument size.
+    """
+
+    out: List[tuple[str | None, list]] = []
+    cur_dir: str | None = None
+    cur: list = []
+    names: set[str] = set()
+    cur_bytes = 0
+
+    def flush() -> None:
+        nonlocal cur_dir, cur, names, cur_bytes
+        if len(cur) > 1:
+            out.append((cur_dir, cur))
+        else:
+            out.extend((None, [o]) for o in cur)
+        cur_dir, cur, names, cur_bytes = None, [], set(), 0
+
+    for op in ops:
+        d = _move_into_dir(op)
+        if d is None:
+            flush()
+            out.append((None, [op]))
+            continue
+        name = posix_split(op.src)[1]
+        size = len(bash_quote(op.src)) + 1
+        if (
+            d != cur_dir
+            or name in names
+            or len(cur) >= _MV_BATCH_MAX_SRCS
+            or cur_bytes + size > _MV_BATCH_MAX_BYTES
+        ):
+            flush()
+            cur_dir = d
+        cur.append(op)
+        names.add(name)
+        cur_bytes += size
+    flush()
+    return out
+
+
 def generate_bash_script(plan: Plan, *, options: ScriptOptions) -> str:
     """Generate a self-contained Bash script that executes the selected operations."""
 
@@ -206,27 +307,55 @@ def generate_bash_script(plan: Plan, *, options: ScriptOptions) -> str:
         lines.append("log 'No selected operations. Nothing to do.'")
         return "\n".join(lines) + "\n"
 
-    for idx, op in enumerate(selected_ops, start=1):
+    idx = 0
+    hoisted_dir: str | None = None
+    for batch_dir, batch in _move_batches(selected_ops):
+        if batch_dir is not None:
+            for op in batch:
+                idx += 1
+                if options.annotate_ops:
+                    lines.append(f"# {idx}. mv {op.src} -> {op.dst}")
+                if op.warning:
+                    lines.append(f"#   WARNING: {op.warning}")
+            srcs = " ".join(bash_quote(op.src) for op in batch)
+            lines.append(f"safe_mv_into {bash_quote(batch_dir)} {srcs}")
+            continue
+
+        op = batch[0]
+        idx += 1
         if op.kind == OperationKind.MKDIR:
             d = op.dst or op.src
             if not d:
                 continue
-            lines.append(f"# {idx}. mkdir {d}")
+            if options.annotate_ops:
+                lines.append(f"# {idx}. mkdir {d}")
             lines.append(f"safe_mkdir {bash_quote(d)}")
         elif op.kind in (OperationKind.MOVE, OperationKind.RENAME):
             if not op.src or not op.dst:
                 continue
-            lines.append(f"# {idx}. mv {op.src} -> {op.dst}")
-            lines.append(f"safe_mv {bash_quote(op.src)} {bash_quote(op.dst)}")
+            if options.annotate_ops:
+                lines.append(f"# {idx}. mv {op.src} -> {op.dst}")
+            src_dir, src_name = posix_split(op.src)
+            dst_dir, dst_name = posix_split(op.dst)
+            if options.hoist_dirs and src_dir == dst_dir and src_dir != "/":
+                d = src_dir
+                if d != hoisted_dir:
+                    lines.append(f"_D={bash_quote(d)}")
+                    hoisted_dir = d
+                lines.append(f'safe_mv "$_D"/{bash_quote(src_name)} "$_D"/{bash_quote(dst_name)}')
+            else:
+                lines.append(f"safe_mv {bash_quote(op.src)} {bash_quote(op.dst)}")
         elif op.kind == OperationKind.COPY:
             if not op.src or not op.dst:
                 continue
-            lines.append(f"# {idx}. cp {op.src} -> {op.dst}")
+            if options.annotate_ops:
+                lines.append(f"# {idx}. cp {op.src} -> {op.dst}")
             lines.append(f"safe_cp {bash_quote(op.src)} {bash_quote(op.dst)}")
         elif op.kind == OperationKind.LINK:
             if not op.src or not op.dst:
                 continue
-            lines.append(f"# {idx}. ln {op.src} -> {op.dst}")
+            if options.annotate_ops:
+                lines.append(f"# {idx}. ln {op.src} -> {op.dst}")
             lines.append(f"safe_ln {bash_quote(op.src)} {bash_quote(op.dst)}")
         else:
             lines.append(f"# {idx}. (unsupported op) {op.kind}")
@@ -238,3 +367,17 @@ def generate_bash_script(plan: Plan, *, options: ScriptOptions) -> str:
     lines.append("log 'Done.'")
 
     return "\n".join(lines) + "\n"
+
+
+def with_dry_run(script: str, dry_run: bool) -> str:
+    """Return a generated script with its DRY_RUN switch set to `dry_run`.
+
+    Nothing else in the output depends on ScriptOptions.dry_run, so flipping
+    the header assignment is equivalent to regenerating.
+    """
+
+    old, new = ("DRY_RUN=0", "DRY_RUN=1") if dry_run else ("DRY_RUN=1", "DRY_RUN=0")
+    head, sep, tail = script.partition(f"\n{old}\n")
+    if not sep:
+        return script
+    return f"{head}\n{new}\n{tail}"
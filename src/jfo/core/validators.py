@@ -1,9 +1,12 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from functools import cached_property
 from pathlib import PurePosixPath
 from typing import Iterable, List
 
+from jfo.core.pathutil import is_normalized_abs, posix_normpath
+
 
 class SandboxViolation(ValueError):
     pass
@@ -32,26 +35,43 @@ class Sandbox:
             roots.append(rp)
         return roots
 
+    @cached_property
+    def _roots(self) -> tuple[str, ...]:
+        # Normalized once per Sandbox; assert_all() checks many paths.
+        return tuple(self.normalized_roots())
+
     def assert_path_allowed(self, path: str) -> None:
-        p = str(PurePosixPath(path))
+        p = posix_normpath(path)
         if not p.startswith("/"):
             raise SandboxViolation(f"Remote path must be absolute: {path}")
 
         # Basic traversal guard (still not perfect without realpath)
-        parts = PurePosixPath(p).parts
-        if ".." in parts:
+        if "/../" in p + "/":
             raise SandboxViolation(f"Remote path contains '..' traversal: {path}")
 
-        roots = self.normalized_roots()
+        roots = self._roots
         if not roots:
             raise SandboxViolation(
                 "No allowed roots configured. Set at least one root in Main tab (Root-Sandbox)."
             )
-        for root in roots:
-            if p.startswith(root):
-                return
+        if p.startswith(roots):
+            return
         raise SandboxViolation(f"Path is outside allowed roots: {path}")
 
+    def allows_children_of(self, directory: str) -> bool:
+        """True if assert_path_allowed(directory + "/" + name) passes for every plain name.
+
+        Lets per-directory loops check the directory once instead of every file.
+        False only means "check each path", not that the paths are rejected.
+        """
+
+        if not is_normalized_abs(directory) or "/../" in directory + "/":
+            return False
+        roots = self._roots
+        # Roots end with "/" and a plain name has none, so a matching root
+        # must already be a prefix of "directory/".
+        return bool(roots) and (directory.rstrip("/") + "/").startswith(roots)
+
     def assert_all(self, paths: Iterable[str]) -> None:
         for p in paths:
             self.assert_path_allowed(p)
@@ -14,46 +14,92 @@ Design goals:
 - Support directory renames (prefix rewrite) in addition to file renames.
 """
 
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass
 from datetime import datetime, timezone
-from pathlib import PurePosixPath
-from typing import Iterable, Sequence
+from typing import Callable, Iterable, Sequence
 
 from jfo.core.operations import Operation, OperationKind
 from jfo.core.plan import Plan
 
-from .sqlite_index import connect, distinct_roots, init_db
+from .sqlite_index import connect, distinct_roots, init_db, mark_index_changed
 
 
-def _split_remote_path(path: str) -> tuple[str, str, str]:
-    """Return (dir, name, ext) for a POSIX path."""
+def _normalize_root_marker(root: str) -> str:
+    # Paths in the index and in plans are already normalized absolute POSIX
+    # paths; only trailing slashes need to go.
+    return root.rstrip("/") or "/"
 
-    parts = path.rsplit("/", 1)
-    if len(parts) == 1:
-        d = "/"
-        name = parts[0]
-    else:
-        d, name = parts
-        if not d:
-            d = "/"
-    ext = name.rsplit(".", 1)[-1].lower() if "." in name else ""
-    return d, name, ext
 
+class _RootTrie:
+    """Longest-prefix lookup of scanned-root markers by path component.
+
+    Built once per index update; a lookup costs O(depth of path) no matter how
+    many roots are indexed.
+    """
+
+    # Terminal key; None can never collide with a path component.
+    _END = None
+
+    def __init__(self, roots: Iterable[str]) -> None:
+        self.root: dict = {}
+        for r in roots:
+            node = self.root
+            for part in _normalize_root_marker(r).split("/"):
+                if part:
+                    node = node.setdefault(part, {})
+            node.setdefault(self._END, r)
+
+    def match(self, path: str) -> str | None:
+        """Return the longest root marker that contains `path` (or None)."""
+
+        node = self.root
+        last = node.get(self._END)
+        for part in path.split("/"):
+            if not part:
+                continue
+            node = node.get(part)
+            if node is None:
+                break
+            last = node.get(self._END, last)
+        return last
 
-def _normalize_root_marker(root: str) -> str:
-    r = str(PurePosixPath(root)).rstrip("/")
-    return r if r else "/"
 
+_MOVE_KINDS = (OperationKind.MOVE, OperationKind.RENAME)
+
+# Stay well below SQLite's bound-parameter limit (999 on older builds).
+_SQL_CHUNK = 500
+
+
+def _collect_run(ops: Sequence[Operation], start: int) -> list[Operation]:
+    """Longest run of ops from `start` whose index rows can be written as one batch.
+
+    A run ends before an op that reads a path written (or moved away) earlier in
+    the same run, because its lookup would have to see the earlier change.
+    """
 
-def _pick_root_for_path(path: str, roots: Sequence[str]) -> str | None:
-    """Pick the best (longest) scanned-root marker that contains the given path."""
+    run: list[Operation] = []
+    touched: set[str] = set()
+    for op in ops[start:]:
+        if run and op.src and op.src in touched:
+            break
+        run.append(op)
+        if op.dst:
+            touched.add(op.dst)
+        if op.src and op.kind in _MOVE_KINDS:
+            touched.add(op.src)
+    return run
 
-    p = str(PurePosixPath(path))
-    for r in roots:
-        rr = _normalize_root_marker(r)
-        if p == rr or p.startswith(rr + "/"):
-            return r
-    return None
+
+def _lookup_roots(conn, paths: Sequence[str]) -> dict[str, str]:
+    """Map indexed paths among `paths` to their root marker."""
+
+    out: dict[str, str] = {}
+    for i in range(0, len(paths), _SQL_CHUNK):
+        chunk = list(paths[i : i + _SQL_CHUNK])
+        q = "SELECT path, root FROM files WHERE path IN (%s)" % ",".join("?" * len(chunk))
+        out.update(conn.execute(q, chunk).fetchall())
+    return out
 
 
 @dataclass
@@ -83,92 +129,147 @@ def apply_plan_to_index(
         for r in roots_hint:
             if r and r not in roots:
                 roots.append(r)
-    # Prefer longer roots first.
-    roots.sort(key=lambda x: len(_normalize_root_marker(x)), reverse=True)
+    root_trie = _RootTrie(roots)
 
     stats = IndexUpdateStats()
 
-    conn = connect()
+    conn = connect(bulk=True)
     try:
         conn.execute("BEGIN")
 
         # Prepared statements
-        sel_root = "SELECT root FROM files WHERE path=?"
-        sel_any_prefix = "SELECT 1 FROM files WHERE path LIKE ? LIMIT 1"
         del_path = "DELETE FROM files WHERE path=?"
+        # dir/name/ext are generated from path by SQLite.
         upsert = (
-            "INSERT INTO files(path, dir, name, ext, root, scanned_at) VALUES(?,?,?,?,?,?) "
-            "ON CONFLICT(path) DO UPDATE SET dir=excluded.dir, name=excluded.name, ext=excluded.ext, root=excluded.root, scanned_at=excluded.scanned_at"
+            "INSERT INTO files(path, root, scanned_at) VALUES(?,?,?) "
+            "ON CONFLICT(path) DO UPDATE SET root=excluded.root, scanned_at=excluded.scanned_at"
         )
+        # Half-open range on the (binary) primary key instead of LIKE, which is
+        # case-insensitive and therefore cannot use the index.
         upd_prefix = (
             "UPDATE files "
             "SET "
-            "  path = REPLACE(path, ?, ?), "
-            "  dir  = CASE WHEN dir = ? THEN ? ELSE REPLACE(dir, ?, ?) END, "
-            "  scanned_at = ? "
-            "WHERE path LIKE ?"
+            "  path = :dst_prefix || substr(path, :n), "
+            "  scanned_at = :ts "
+            "WHERE path >= :lo AND path < :hi"
         )
 
-        for op in (o for o in plan.operations if o.selected):
-            kind = op.kind
-            src = op.src
-            dst = op.dst
-
-            if kind in (OperationKind.MOVE, OperationKind.RENAME):
-                if not src or not dst:
-                    continue
-
-                # 1) If src is a known file path in the index, treat as file move/rename.
-                cur = conn.execute(sel_root, (src,))
-                row = cur.fetchone()
-                if row is not None:
-                    old_root = row[0]
-
-                    conn.execute(del_path, (src,))
-                    stats.deleted += 1
-
-                    root_for_dst = _pick_root_for_path(dst, roots) or old_root
-                    d, name, ext = _split_remote_path(dst)
-                    conn.execute(upsert, (dst, d, name, ext, root_for_dst, ts))
-                    stats.inserted += 1
-                    continue
-
-                # 2) If src is a directory rename, rewrite prefix for all contained files.
-                src_dir = str(PurePosixPath(src)).rstrip("/")
-                dst_dir = str(PurePosixPath(dst)).rstrip("/")
-                if src_dir and dst_dir and src_dir != dst_dir:
-                    src_prefix = src_dir + "/"
-                    dst_prefix = dst_dir + "/"
-                    # Only apply if there are any indexed files under that prefix.
-                    cur2 = conn.execute(sel_any_prefix, (src_prefix + "%",))
-                    if cur2.fetchone() is not None:
+        ops = [o for o in plan.operations if o.selected]
+        i = 0
+        while i < len(ops):
+            run = _collect_run(ops, i)
+            known = _lookup_roots(conn, [o.src for o in run if o.kind in _MOVE_KINDS and o.src])
+            deletes: list[tuple[str]] = []
+            upserts: list[tuple[str, str, int]] = []
+
+            def _flush_rows() -> None:
+                if deletes:
+                    conn.executemany(del_path, deletes)
+                    stats.deleted += len(deletes)
+                    deletes.clear()
+                if upserts:
+                    conn.executemany(upsert, upserts)
+                    stats.inserted += len(upserts)
+                    upserts.clear()
+
+            for op in run:
+                i += 1
+                kind = op.kind
+                src = op.src
+                dst = op.dst
+
+                if kind in _MOVE_KINDS:
+                    if not src or not dst:
+                        continue
+
+                    # 1) If src is a known file path in the index, treat as file move/rename.
+                    old_root = known.get(src)
+                    if old_root is not None:
+                        deletes.append((src,))
+                        root_for_dst = root_trie.match(dst) or old_root
+                        upserts.append((dst, root_for_dst, ts))
+                        continue
+
+                    # 2) If src is a directory rename, rewrite prefix for all contained files.
+                    # Pending file rows go first, and later ops must see the new paths,
+                    # so the run ends here and the remaining ops are looked up again.
+                    _flush_rows()
+                    src_dir = src.rstrip("/")
+                    dst_dir = dst.rstrip("/")
+                    if src_dir and dst_dir and src_dir != dst_dir:
+                        src_prefix = src_dir + "/"
                         res = conn.execute(
                             upd_prefix,
-                            (src_prefix, dst_prefix, src_dir, dst_dir, src_prefix, dst_prefix, ts, src_prefix + "%"),
+                            {
+                                "dst_prefix": dst_dir + "/",
+                                "n": len(src_prefix) + 1,
+                                "ts": ts,
+                                "lo": src_prefix,
+                                "hi": src_dir + chr(ord("/") + 1),
+                            },
                         )
                         # rowcount can be -1 on some drivers, but with sqlite it should be fine.
                         try:
-                            stats.updated_prefix += int(res.rowcount or 0)
+                            stats.updated_prefix += max(int(res.rowcount or 0), 0)
                         except Exception:
                             pass
-                continue
-
-            if kind in (OperationKind.COPY, OperationKind.LINK):
-                if not dst:
+                    break
+
+                if kind in (OperationKind.COPY, OperationKind.LINK):
+                    if not dst:
+                        continue
+                    # For copy/link we insert the destination path.
+                    root_for_dst = root_trie.match(dst) or (root_trie.match(src) if src else None) or ""
+                    upserts.append((dst, root_for_dst, ts))
                     continue
-                # For copy/link we insert the destination path.
-                root_for_dst = _pick_root_for_path(dst, roots) or (_pick_root_for_path(src or "", roots) if src else None) or ""
-                d, name, ext = _split_remote_path(dst)
-                conn.execute(upsert, (dst, d, name, ext, root_for_dst, ts))
-                stats.inserted += 1
-                continue
 
-            # MKDIR does not affect the file index.
+                # MKDIR does not affect the file index.
+
+            _flush_rows()
 
         conn.commit()
+        mark_index_changed()
         return stats
     finally:
         try:
             conn.close()
         except Exception:
             pass
+
+
+# One background writer: consecutive runs queue up instead of contending for the DB.
+_INDEX_EXECUTOR = ThreadPoolExecutor(max_workers=1, thread_name_prefix="jfo-index-update")
+
+
+def submit_plan_to_index(
+    plan: Plan,
+    *,
+    roots_hint: Sequence[str] | None = None,
+) -> "Future[IndexUpdateStats]":
+    """Run apply_plan_to_index() on the background index writer.
+
+    The selected operations are snapshotted, so later UI changes to the plan
+    do not affect the update.
+    """
+
+    snapshot = Plan(title=plan.title, operations=plan.selected_operations())
+    return _INDEX_EXECUTOR.submit(apply_plan_to_index, snapshot, roots_hint=roots_hint)
+
+
+def log_index_result(post_line: Callable[[str], None]) -> Callable[["Future[IndexUpdateStats]"], None]:
+    """Return a done-callback for submit_plan_to_index() that reports via `post_line`.
+
+    `post_line` must be safe to call from the writer thread (LogText.post_line).
+    """
+
+    def _done(fut: "Future[IndexUpdateStats]") -> None:
+        try:
+            stats = fut.result()
+        except Exception as exc:  # noqa: BLE001
+            post_line(f"[local] index update WARNING: {exc}")
+            return
+        post_line(
+            f"[local] analysis index updated: +{stats.inserted} -{stats.deleted} prefixUpdates={stats.updated_prefix}"
+        )
+
+    return _done
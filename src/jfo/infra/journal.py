@@ -3,8 +3,10 @@ from __future__ import annotations
 from dataclasses import asdict
 from datetime import datetime, timezone
 import json
+import os
 from pathlib import Path
-from typing import Any, Dict, Optional
+import threading
+from typing import Any, Dict, Optional, TextIO
 
 from platformdirs import user_data_dir
 
@@ -22,8 +24,77 @@ def append_journal(record: Dict[str, Any]) -> None:
     record = dict(record)
     record.setdefault("timestamp_utc", datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"))
     with path.open("a", encoding="utf-8") as f:
-        f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        f.write(json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n")
 
 
 def journal_path() -> str:
     return str(_journal_path())
+
+
+class RunOutput:
+    """Stream a run's stdout/stderr into per-run log files next to the journal.
+
+    The journal record then only references the files (see record_fields()),
+    instead of carrying the joined output inline. Each stream is written by
+    its own pump thread, so each has its own file and lock.
+    """
+
+    _BUFFERING = 1 << 20
+
+    def __init__(self) -> None:
+        run_id = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ") + "-" + os.urandom(3).hex()
+        base = _journal_path().parent / "runs"
+        base.mkdir(parents=True, exist_ok=True)
+        self.stdout_path = base / f"{run_id}.stdout.log"
+        self.stderr_path = base / f"{run_id}.stderr.log"
+        self._files: Dict[str, TextIO] = {}
+        self._counts = {"stdout": 0, "stderr": 0}
+        self._locks = {"stdout": threading.Lock(), "stderr": threading.Lock()}
+
+    def _write(self, kind: str, line: str) -> None:
+        with self._locks[kind]:
+            f = self._files.get(kind)
+            if f is None:
+                path = self.stdout_path if kind == "stdout" else self.stderr_path
+                f = self._files[kind] = path.open("a", encoding="utf-8", buffering=self._BUFFERING)
+            f.write(line + "\n")
+            self._counts[kind] += 1
+
+    def write_stdout(self, line: str) -> None:
+        self._write("stdout", line)
+
+    def write_stderr(self, line: str) -> None:
+        self._write("stderr", line)
+
+    def close(self) -> None:
+        for kind, f in list(self._files.items()):
+            with self._locks[kind]:
+                f.close()
+        self._files.clear()
+
+    def record_fields(self) -> Dict[str, Any]:
+        """Journal fields for this run; a stream without output gets no file."""
+
+        out: Dict[str, Any] = {}
+        for kind, path in (("stdout", self.stdout_path), ("stderr", self.stderr_path)):
+            if self._counts[kind]:
+                out[f"{kind}_log"] = str(path)
+                out[f"{kind}_lines"] = self._counts[kind]
+            else:
+                out[kind] = ""
+        return out
+
+
+def read_run_output(record: Dict[str, Any], kind: str) -> str:
+    """Return a record's stdout/stderr, inline (older records) or from its log file."""
+
+    inline = record.get(kind)
+    if inline:
+        return str(inline)
+    log = record.get(f"{kind}_log")
+    if not log:
+        return ""
+    try:
+        return Path(log).read_text(encoding="utf-8", errors="replace").rstrip("\n")
+    except OSError as exc:
+        return f"<{kind} log not readable: {exc}>"
@@ -1,7 +1,8 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import PurePosixPath
+from typing import Sequence
 
 from jfo.core.quoting import bash_quote
 from jfo.infra.ssh_client import SshManager
@@ -17,17 +18,23 @@ class Mountpoint:
     target: str
 
 
-def list_mountpoints(ssh: SshManager) -> list[Mountpoint]:
-    """Return mountpoints via `df -P -h`.
+_SECTION = "@@JFO_SECTION@@"
+_RC = "@@JFO_RC@@"
 
-    We intentionally use `-P` (POSIX) to keep one mount per line.
-    """
 
-    res = ssh.exec_command("df -P -h")
-    if res.exit_status != 0:
-        raise RuntimeError(res.stderr.strip() or f"df failed (exit {res.exit_status})")
+@dataclass
+class RemoteQueryResult:
+    mountpoints: list[Mountpoint] | None = None
+    # Set when `df` failed; the other sections are still parsed.
+    mount_error: str | None = None
+    directories: dict[str, list[str]] = field(default_factory=dict)
+    # Error message per listed path whose `ls` failed.
+    directory_errors: dict[str, str] = field(default_factory=dict)
+    is_dir: dict[str, bool] = field(default_factory=dict)
+
 
-    lines = [ln.rstrip("\r") for ln in res.stdout.splitlines() if ln.strip()]
+def _parse_mountpoints(stdout: str) -> list[Mountpoint]:
+    lines = [ln.rstrip("\r") for ln in stdout.splitlines() if ln.strip()]
     if not lines:
         return []
 
@@ -52,36 +59,98 @@ def list_mountpoints(ssh: SshManager) -> list[Mountpoint]:
     return out
 
 
-def list_directories(ssh: SshManager, path: str) -> list[str]:
-    """List directory names (not full paths) inside `path`.
+def _parse_ls_dirs(stdout: str) -> list[str]:
+    # `ls -p` marks directories with a trailing '/'.
+    return sorted(ln[:-1] for ln in (l.rstrip("\r") for l in stdout.splitlines()) if len(ln) > 1 and ln.endswith("/"))
 
-    Uses `ls -1Ap` and filters entries that end with '/'.
-    This avoids traversing the full tree and is typically fast enough.
+
+def multi_query(
+    ssh: SshManager,
+    *,
+    mounts: bool = False,
+    list_paths: Sequence[str] = (),
+    isdir_paths: Sequence[str] = (),
+) -> RemoteQueryResult:
+    """Run several lookups in one SSH command (one channel / round trip).
+
+    Each section prints a marker line, its output and a return-code line;
+    the sections are parsed with the same logic as the single-call helpers.
     """
 
-    # -A: no '.' or '..'
-    # -p: append '/' to directories
-    # -1: one per line
-    cmd = f"ls -1Ap -- {bash_quote(path)} 2>/dev/null | sed -n 's:/$::p' | sort"
+    sections: list[tuple[str, str, str]] = []  # (kind, path, shell command)
+    if mounts:
+        sections.append(("mounts", "", "df -P -h"))
+    for p in list_paths:
+        # -A: no '.' or '..'; -p: append '/' to directories; -1: one per line
+        sections.append(("ls", p, f"ls -1Ap -- {bash_quote(p)} 2>/dev/null"))
+    for p in isdir_paths:
+        sections.append(("isdir", p, f"test -d {bash_quote(p)}"))
+
+    result = RemoteQueryResult()
+    if not sections:
+        return result
+
+    cmd = "; ".join(f"echo '{_SECTION} {i}'; {sh}; echo \"{_RC} $?\"" for i, (_k, _p, sh) in enumerate(sections))
     res = ssh.exec_command(cmd)
-    if res.exit_status != 0:
-        # If ls failed, show stderr if present
-        msg = res.stderr.strip() or f"ls failed (exit {res.exit_status})"
-        raise RuntimeError(msg)
 
-    dirs: list[str] = []
+    outputs: dict[int, list[str]] = {}
+    codes: dict[int, int] = {}
+    cur: int | None = None
     for ln in res.stdout.splitlines():
-        ln = ln.strip("\r\n")
-        if not ln:
-            continue
-        dirs.append(ln)
-    return dirs
+        if ln.startswith(_SECTION + " "):
+            cur = int(ln[len(_SECTION) + 1 :])
+            outputs[cur] = []
+        elif ln.startswith(_RC + " ") and cur is not None:
+            codes[cur] = int(ln[len(_RC) + 1 :])
+            cur = None
+        elif cur is not None:
+            outputs[cur].append(ln)
+
+    for i, (kind, path, _sh) in enumerate(sections):
+        text = "\n".join(outputs.get(i, []))
+        rc = codes.get(i, res.exit_status or 1)
+        if kind == "mounts":
+            if rc != 0:
+                result.mount_error = res.stderr.strip() or f"df failed (exit {rc})"
+            else:
+                result.mountpoints = _parse_mountpoints(text)
+        elif kind == "ls":
+            if rc != 0:
+                result.directory_errors[path] = f"ls failed (exit {rc})"
+            else:
+                result.directories[path] = _parse_ls_dirs(text)
+        else:
+            result.is_dir[path] = rc == 0
+    return result
+
+
+def list_mountpoints(ssh: SshManager) -> list[Mountpoint]:
+    """Return mountpoints via `df -P -h`.
+
+    We intentionally use `-P` (POSIX) to keep one mount per line.
+    """
+
+    res = multi_query(ssh, mounts=True)
+    if res.mount_error is not None:
+        raise RuntimeError(res.mount_error)
+    return res.mountpoints or []
+
+
+def list_directories(ssh: SshManager, path: str) -> list[str]:
+    """List directory names (not full paths) inside `path`.
+
+    Uses `ls -1Ap` and keeps entries that end with '/'.
+    This avoids traversing the full tree and is typically fast enough.
+    """
+
+    res = multi_query(ssh, list_paths=[path])
+    if path in res.directory_errors:
+        raise RuntimeError(res.directory_errors[path])
+    return res.directories.get(path, [])
 
 
 def is_dir(ssh: SshManager, path: str) -> bool:
-    cmd = f"test -d -- {bash_quote(path)}"
-    res = ssh.exec_command(cmd)
-    return res.exit_status == 0
+    return multi_query(ssh, isdir_paths=[path]).is_dir.get(path, False)
 
 
 def normalize_posix_path(raw: str) -> str:
@@ -100,3 +169,58 @@ def parent_dir(path: str) -> str:
     p = PurePosixPath(path)
     parent = str(p.parent)
     return parent if parent else "/"
+
+
+# Emits "<path>\0<size>\0<size bytes>" per readable file, "<path>\0-\0" otherwise.
+# Length-prefixed rather than delimited, so file content may contain anything.
+_READ_FILES_FN = r"""_jfo_read() {
+  local n
+  if [ -f "$1" ] && [ -r "$1" ] && n=$(wc -c < "$1" 2>/dev/null); then
+    n=${n//[!0-9]/}
+    printf '%s\0%s\0' "$1" "$n"
+    head -c "$n" -- "$1"
+  else
+    printf '%s\0-\0' "$1"
+  fi
+}
+"""
+
+
+def _parse_read_files(data: bytes, paths: Sequence[str]) -> dict[str, bytes]:
+    out: dict[str, bytes] = {}
+    pos = 0
+    for path in paths:
+        head = path.encode("utf-8") + b"\0"
+        if not data.startswith(head, pos):
+            break  # out of sync (e.g. a file changed size mid-read); callers fall back
+        pos += len(head)
+        end = data.find(b"\0", pos)
+        if end < 0:
+            break
+        size = data[pos:end]
+        pos = end + 1
+        if size == b"-" or not size.isdigit():
+            continue
+        n = int(size)
+        if pos + n > len(data):
+            break
+        out[path] = data[pos : pos + n]
+        pos += n
+    return out
+
+
+def read_files(ssh: SshManager, paths: Sequence[str]) -> dict[str, bytes]:
+    """Fetch several small remote files with one `bash -s` run (one round trip).
+
+    Returns path -> content for the files that could be read; missing or
+    unreadable paths are simply absent. The path list travels on stdin, so
+    there is no argv length limit.
+    """
+
+    paths = list(dict.fromkeys(paths))
+    if not paths:
+        return {}
+    script = _READ_FILES_FN + "".join(f"_jfo_read {bash_quote(p)}\n" for p in paths)
+    buf = bytearray()
+    ssh.exec_bash_script_streaming_raw(script, on_stdout_chunk=buf.extend, on_stderr=lambda _line: None)
+    return _parse_read_files(bytes(buf), paths)
@@ -55,6 +55,37 @@ class AppSettings:
         "idx",
     ])
 
+    # (video_exts, sidecar_exts) snapshot -> normalized sets, see _ext_sets().
+    _ext_set_cache: Optional[tuple] = field(default=None, init=False, repr=False, compare=False)
+
+    def _ext_sets(self) -> tuple[frozenset[str], frozenset[str], frozenset[str]]:
+        """(video, sidecar, both) lower-cased without dots.
+
+        Recomputed only when either list was reassigned or edited.
+        """
+        key = (tuple(self.video_exts), tuple(self.sidecar_exts))
+        cached = self._ext_set_cache
+        if cached is None or cached[0] != key:
+            video = frozenset(e.lower().lstrip(".") for e in key[0])
+            sidecar = frozenset(e.lower().lstrip(".") for e in key[1])
+            cached = self._ext_set_cache = (key, (video, sidecar, video | sidecar))
+        return cached[1]
+
+    @property
+    def video_ext_set(self) -> frozenset[str]:
+        """Normalized video extensions (compare against MediaFile.suffix)."""
+        return self._ext_sets()[0]
+
+    @property
+    def sidecar_ext_set(self) -> frozenset[str]:
+        """Normalized sidecar extensions (compare against MediaFile.suffix)."""
+        return self._ext_sets()[1]
+
+    @property
+    def media_ext_set(self) -> frozenset[str]:
+        """Normalized video + sidecar extensions, e.g. for index queries."""
+        return self._ext_sets()[2]
+
     def get_active_profile(self) -> ConnectionProfile:
         for p in self.profiles:
             if p.name == self.active_profile:
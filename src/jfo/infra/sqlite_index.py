@@ -1,9 +1,13 @@
 from __future__ import annotations
 
 from datetime import datetime, timezone
+import functools
+import os
 import sqlite3
+import string
+import threading
 from pathlib import Path
-from typing import Iterable, List, Optional, Sequence, Tuple
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
 
 from platformdirs import user_data_dir
 
@@ -20,114 +24,329 @@ SCHEMA = """
 PRAGMA journal_mode=WAL;
 PRAGMA synchronous=NORMAL;
 
+-- dir/name/ext are derived from path inside SQLite, so writers only supply
+-- (path, root, scanned_at). rtrim(path, <path without '/'>) keeps everything
+-- up to and including the last '/'; same trick with '.' for the extension.
 CREATE TABLE IF NOT EXISTS files (
     path TEXT PRIMARY KEY,
-    dir TEXT NOT NULL,
-    name TEXT NOT NULL,
-    ext TEXT NOT NULL,
+    dir TEXT NOT NULL GENERATED ALWAYS AS (
+        CASE WHEN length(rtrim(path, replace(path, '/', ''))) <= 1 THEN '/'
+             ELSE substr(path, 1, length(rtrim(path, replace(path, '/', ''))) - 1) END
+    ) STORED,
+    name TEXT NOT NULL GENERATED ALWAYS AS (
+        substr(path, length(rtrim(path, replace(path, '/', ''))) + 1)
+    ) STORED,
+    ext TEXT NOT NULL GENERATED ALWAYS AS (
+        CASE WHEN instr(name, '.') > 0 THEN lower(substr(name, length(rtrim(name, replace(name, '.', ''))) + 1))
+             ELSE '' END
+    ) STORED,
     root TEXT NOT NULL,
     scanned_at INTEGER NOT NULL
 );
 
-CREATE INDEX IF NOT EXISTS idx_files_dir ON files(dir);
-CREATE INDEX IF NOT EXISTS idx_files_root ON files(root);
+-- Browse queries: distinct dirs of a root, files of a dir (ordered by path),
+-- files of a root filtered by extension. Supersede the old idx_files_root.
+CREATE INDEX IF NOT EXISTS idx_files_root_dir ON files(root, dir, path);
+CREATE INDEX IF NOT EXISTS idx_files_root_ext ON files(root, ext, path);
+-- Case-insensitive dir prefix lookups (distinct_dirs_for_root).
+CREATE INDEX IF NOT EXISTS idx_files_root_dir_nocase ON files(root, dir COLLATE NOCASE);
+DROP INDEX IF EXISTS idx_files_root;
 CREATE INDEX IF NOT EXISTS idx_files_name ON files(name);
+-- Covering index for files_in_dir()/files_in_dirs(): (dir, ext) filter, path output.
+-- Its dir prefix also serves plain dir lookups, so the old idx_files_dir goes.
+CREATE INDEX IF NOT EXISTS idx_files_dir_ext ON files(dir, ext, path);
+DROP INDEX IF EXISTS idx_files_dir;
 """
 
 
-def connect() -> sqlite3.Connection:
-    conn = sqlite3.connect(str(_db_path()))
+# Per-connection settings for bulk writers (index updates after large plans).
+# journal_mode=WAL is persistent and set once by SCHEMA; synchronous is not.
+_BULK_PRAGMAS = (
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-65536",
+    "PRAGMA mmap_size=268435456",
+)
+
+
+def connect(*, bulk: bool = False) -> sqlite3.Connection:
+    conn = sqlite3.connect(str(_db_path()), cached_statements=256)
     conn.execute("PRAGMA foreign_keys=ON")
+    if bulk:
+        for pragma in _BULK_PRAGMAS:
+            conn.execute(pragma)
     return conn
 
 
-def init_db() -> None:
-    conn = connect()
+# Trigram full-text index over files.path for substring search. It is an
+# external-content table kept in sync by triggers. Optional: builds without
+# FTS5 (or SQLite < 3.34, no trigram tokenizer) fall back to plain LIKE scans.
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE files_fts USING fts5(path, content='files', content_rowid='rowid', tokenize='trigram');
+
+CREATE TRIGGER files_fts_ai AFTER INSERT ON files BEGIN
+    INSERT INTO files_fts(rowid, path) VALUES (new.rowid, new.path);
+END;
+CREATE TRIGGER files_fts_ad AFTER DELETE ON files BEGIN
+    INSERT INTO files_fts(files_fts, rowid, path) VALUES ('delete', old.rowid, old.path);
+END;
+CREATE TRIGGER files_fts_au AFTER UPDATE OF path ON files BEGIN
+    INSERT INTO files_fts(files_fts, rowid, path) VALUES ('delete', old.rowid, old.path);
+    INSERT INTO files_fts(rowid, path) VALUES (new.rowid, new.path);
+END;
+
+INSERT INTO files_fts(files_fts) VALUES ('rebuild');
+"""
+
+# Trigram matching needs at least this many characters to use the index.
+_FTS_MIN_TERM = 3
+
+
+def _has_fts(conn: sqlite3.Connection) -> bool:
+    row = conn.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name='files_fts'").fetchone()
+    return row is not None
+
+
+def _ensure_fts(conn: sqlite3.Connection) -> None:
+    """Create (and backfill) the trigram index for databases that predate it."""
+
+    if _has_fts(conn):
+        return
     try:
-        conn.executescript(SCHEMA)
-        conn.commit()
-    finally:
+        conn.executescript("BEGIN;" + FTS_SCHEMA + "COMMIT;")
+    except sqlite3.OperationalError:
+        # No FTS5/trigram support in this SQLite build.
+        conn.rollback()
+
+
+# Databases whose schema was already applied by this process.
+_initialized: set[str] = set()
+_init_lock = threading.Lock()
+
+
+# Rebuilds a files table from before dir/name/ext were generated columns.
+# The FTS table and its triggers reference `files` and are recreated by
+# _ensure_fts() afterwards.
+_MIGRATE_GENERATED_COLUMNS = """
+BEGIN;
+DROP TRIGGER IF EXISTS files_fts_ai;
+DROP TRIGGER IF EXISTS files_fts_ad;
+DROP TRIGGER IF EXISTS files_fts_au;
+DROP TABLE IF EXISTS files_fts;
+ALTER TABLE files RENAME TO files_legacy;
+{create_files}
+INSERT INTO files(path, root, scanned_at) SELECT path, root, scanned_at FROM files_legacy;
+DROP TABLE files_legacy;
+COMMIT;
+"""
+
+
+def _migrate_generated_columns(conn: sqlite3.Connection) -> bool:
+    """Convert a legacy files table in place. Returns True if it did."""
+
+    hidden = {row[1]: row[6] for row in conn.execute("PRAGMA table_xinfo(files)")}
+    if hidden.get("dir", 0) != 0:
+        return False
+    start = SCHEMA.index("CREATE TABLE IF NOT EXISTS files")
+    create_files = SCHEMA[start : SCHEMA.index(");", start) + 2]
+    conn.executescript(_MIGRATE_GENERATED_COLUMNS.format(create_files=create_files))
+    return True
+
+
+def init_db() -> None:
+    path = str(_db_path())
+    with _init_lock:
+        if path in _initialized:
+            return
+        conn = connect()
+        try:
+            conn.executescript(SCHEMA)
+            if _migrate_generated_columns(conn):
+                # Indexes went away with the legacy table.
+                conn.executescript(SCHEMA)
+            conn.commit()
+            _ensure_fts(conn)
+        finally:
+            conn.close()
+        _initialized.add(path)
+
+
+_tls = threading.local()
+
+
+def _conn() -> sqlite3.Connection:
+    """This thread's long-lived connection (schema applied, bulk pragmas set).
+
+    Reusing it keeps the page cache warm across browse/search calls instead of
+    opening the database per query. Reopened if the database path changes.
+    """
+
+    path = str(_db_path())
+    conn = getattr(_tls, "conn", None)
+    if conn is not None and _tls.path == path:
+        return conn
+    if conn is not None:
         conn.close()
+    init_db()
+    conn = connect(bulk=True)
+    _tls.conn, _tls.path = conn, path
+    return conn
+
+
+def _substring_match(conn: sqlite3.Connection, term: str) -> Tuple[str, str, Tuple[str, ...]]:
+    """Return (FROM clause, WHERE condition, params) matching `term` anywhere in a path.
+
+    Columns are exposed via alias `f`. Uses the trigram index when possible;
+    its LIKE keeps the semantics of the plain scan (case-insensitive, % and _
+    act as wildcards). CROSS JOIN pins the FTS lookup as the outer loop; otherwise
+    the planner may drive from idx_files_root and probe the FTS table per row.
+    """
+
+    like = "%" + term + "%"
+    if len(term) >= _FTS_MIN_TERM and _has_fts(conn):
+        return "files_fts CROSS JOIN files f ON f.rowid = files_fts.rowid", "files_fts.path LIKE ?", (like,)
+    return "files f", "(f.name LIKE ? OR f.path LIKE ? OR f.dir LIKE ?)", (like, like, like)
+
+
+@functools.lru_cache(maxsize=32)
+def _ext_filter_cached(exts: frozenset) -> Tuple[Tuple[str, ...], str]:
+    exts_l = tuple(sorted({e.lower().lstrip(".") for e in exts}))
+    return exts_l, ",".join("?" * len(exts_l))
+
+
+def _ext_filter(exts: Iterable[str]) -> Tuple[Tuple[str, ...], str]:
+    """(normalized extensions, "?,?,...") for an `ext IN (...)` filter.
+
+    Cached per extension set: callers pass AppSettings' frozensets, so repeated
+    queries skip re-normalizing and bind the same parameters in the same order.
+    """
+
+    return _ext_filter_cached(exts if isinstance(exts, frozenset) else frozenset(exts))
 
 
 def upsert_paths(paths: Sequence[str], *, root: str) -> int:
-    """Upsert file paths into the index. Returns inserted/updated count."""
+    """Upsert file paths into the index. Returns inserted/updated count.
+
+    All rows are written by one executemany() inside one explicit transaction.
+    """
 
-    init_db()
     ts = int(datetime.now(timezone.utc).timestamp())
 
-    rows: List[Tuple[str, str, str, str, str, int]] = []
-    for p in paths:
-        # We store remote POSIX path strings.
-        parts = p.rsplit("/", 1)
-        if len(parts) == 1:
-            d = "/"
-            name = parts[0]
-        else:
-            d, name = parts
-            if d == "":
-                d = "/"
-        ext = name.rsplit(".", 1)[-1].lower() if "." in name else ""
-        rows.append((p, d, name, ext, root, ts))
-
-    conn = connect()
+    conn = _conn()
     try:
+        conn.execute("BEGIN")
+        # ON CONFLICT ... DO UPDATE (not INSERT OR REPLACE) keeps the rowid,
+        # so the files_fts triggers only fire for genuinely new paths.
         conn.executemany(
-            "INSERT INTO files(path, dir, name, ext, root, scanned_at) VALUES(?,?,?,?,?,?) "
-            "ON CONFLICT(path) DO UPDATE SET dir=excluded.dir, name=excluded.name, ext=excluded.ext, root=excluded.root, scanned_at=excluded.scanned_at",
-            rows,
+            "INSERT INTO files(path, root, scanned_at) VALUES(?,?,?) "
+            "ON CONFLICT(path) DO UPDATE SET root=excluded.root, scanned_at=excluded.scanned_at",
+            ((p, root, ts) for p in paths),
         )
         conn.commit()
-        return len(rows)
-    finally:
-        conn.close()
+        mark_index_changed()
+        # Refresh planner statistics where they are stale (cheap no-op otherwise).
+        conn.execute("PRAGMA optimize")
+        return len(paths)
+    except BaseException:
+        # The connection is reused; never leave a transaction open on it.
+        if conn.in_transaction:
+            conn.rollback()
+        raise
 
 
 def distinct_dirs(prefix: str = "", *, limit: int = 200) -> List[str]:
-    init_db()
-    conn = connect()
+    conn = _conn()
+    if prefix:
+        cur = conn.execute(
+            "SELECT DISTINCT dir FROM files WHERE dir LIKE ? ORDER BY dir LIMIT ?",
+            (prefix + "%", limit),
+        )
+    else:
+        cur = conn.execute("SELECT DISTINCT dir FROM files ORDER BY dir LIMIT ?", (limit,))
+    return [r[0] for r in cur.fetchall()]
+
+
+# Generation counter for writes made by this process; part of the read-cache key.
+_write_generation = 0
+
+
+def mark_index_changed() -> None:
+    """Invalidate cached index reads after writing to the database."""
+
+    global _write_generation
+    _write_generation += 1
+
+
+def _mtime_ns(path: str) -> int:
     try:
-        if prefix:
-            cur = conn.execute(
-                "SELECT DISTINCT dir FROM files WHERE dir LIKE ? ORDER BY dir LIMIT ?",
-                (prefix + "%", limit),
-            )
-        else:
-            cur = conn.execute("SELECT DISTINCT dir FROM files ORDER BY dir LIMIT ?", (limit,))
-        return [r[0] for r in cur.fetchall()]
-    finally:
-        conn.close()
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return 0
+
+
+def _cache_stamp() -> Tuple[str, int, int, int]:
+    """Key that changes whenever the database may have changed.
+
+    In WAL mode commits touch the -wal file, not the main file, so both mtimes
+    count; the write generation covers same-tick writes by this process.
+    """
+
+    path = str(_db_path())
+    return (path, _write_generation, _mtime_ns(path), _mtime_ns(path + "-wal"))
+
+
+def _prefix_upper_bound(prefix: str) -> str:
+    """Smallest string greater than every string starting with `prefix`."""
+
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+# SQLite's NOCASE collation folds ASCII letters only.
+_ASCII_FOLD = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)
+
+
+@functools.lru_cache(maxsize=64)
+def _distinct_roots_cached(stamp: Tuple[str, int, int, int], limit: int) -> Tuple[str, ...]:
+    conn = _conn()
+    cur = conn.execute("SELECT DISTINCT root FROM files ORDER BY root LIMIT ?", (limit,))
+    return tuple(r[0] for r in cur.fetchall())
+
+
+@functools.lru_cache(maxsize=64)
+def _distinct_dirs_for_root_cached(
+    stamp: Tuple[str, int, int, int], root: str, prefix: str, limit: int
+) -> Tuple[str, ...]:
+    conn = _conn()
+    # A half-open NOCASE range on idx_files_root_dir_nocase keeps the prefix
+    # match ASCII case-insensitive (like the LIKE it replaces) without scanning
+    # every dir of the root.
+    if prefix:
+        lo = prefix.translate(_ASCII_FOLD)
+        hi = _prefix_upper_bound(lo)
+        if "A" <= hi[-1] <= "Z":
+            # NOCASE would fold the bound itself; folded dirs never contain A-Z.
+            hi = hi[:-1] + "["
+        cur = conn.execute(
+            "SELECT dir FROM files WHERE root=? AND dir >= ? COLLATE NOCASE AND dir < ? COLLATE NOCASE"
+            " GROUP BY dir ORDER BY dir LIMIT ?",
+            (root, lo, hi, limit),
+        )
+    else:
+        cur = conn.execute(
+            "SELECT dir FROM files WHERE root=? GROUP BY dir ORDER BY dir LIMIT ?",
+            (root, limit),
+        )
+    return tuple(r[0] for r in cur.fetchall())
 
 
 def distinct_roots(*, limit: int = 200) -> List[str]:
-    """Return a list of scanned root markers."""
-    init_db()
-    conn = connect()
-    try:
-        cur = conn.execute("SELECT DISTINCT root FROM files ORDER BY root LIMIT ?", (limit,))
-        return [r[0] for r in cur.fetchall()]
-    finally:
-        conn.close()
+    """Return a list of scanned root markers (cached until the database changes)."""
+    return list(_distinct_roots_cached(_cache_stamp(), limit))
 
 
 def distinct_dirs_for_root(root: str, prefix: str = "", *, limit: int = 500) -> List[str]:
-    """Return distinct directories limited to a given root marker."""
-    init_db()
-    conn = connect()
-    try:
-        if prefix:
-            cur = conn.execute(
-                "SELECT DISTINCT dir FROM files WHERE root=? AND dir LIKE ? ORDER BY dir LIMIT ?",
-                (root, prefix + "%", limit),
-            )
-        else:
-            cur = conn.execute(
-                "SELECT DISTINCT dir FROM files WHERE root=? ORDER BY dir LIMIT ?",
-                (root, limit),
-            )
-        return [r[0] for r in cur.fetchall()]
-    finally:
-        conn.close()
+    """Return distinct directories limited to a given root marker (cached until the database changes)."""
+    return list(_distinct_dirs_for_root_cached(_cache_stamp(), root, prefix, limit))
 
 
 def search_files_for_root(
@@ -138,25 +357,20 @@ def search_files_for_root(
     limit: int = 200,
 ) -> List[Tuple[str, str, str, str]]:
     """Search files (path, dir, name, ext) for a given root marker."""
-    init_db()
-    conn = connect()
-    try:
-        like = "%" + term + "%"
-        if exts:
-            exts_l = [e.lower().lstrip(".") for e in exts]
-            qmarks = ",".join("?" for _ in exts_l)
-            cur = conn.execute(
-                f"SELECT path, dir, name, ext FROM files WHERE root=? AND (name LIKE ? OR path LIKE ? OR dir LIKE ?) AND ext IN ({qmarks}) ORDER BY path LIMIT ?",
-                (root, like, like, like, *exts_l, limit),
-            )
-        else:
-            cur = conn.execute(
-                "SELECT path, dir, name, ext FROM files WHERE root=? AND (name LIKE ? OR path LIKE ? OR dir LIKE ?) ORDER BY path LIMIT ?",
-                (root, like, like, like, limit),
-            )
-        return [(r[0], r[1], r[2], r[3]) for r in cur.fetchall()]
-    finally:
-        conn.close()
+    conn = _conn()
+    src, match, params = _substring_match(conn, term)
+    if exts:
+        exts_l, qmarks = _ext_filter(exts)
+        cur = conn.execute(
+            f"SELECT f.path, f.dir, f.name, f.ext FROM {src} WHERE f.root=? AND {match} AND f.ext IN ({qmarks}) ORDER BY f.path LIMIT ?",
+            (root, *params, *exts_l, limit),
+        )
+    else:
+        cur = conn.execute(
+            f"SELECT f.path, f.dir, f.name, f.ext FROM {src} WHERE f.root=? AND {match} ORDER BY f.path LIMIT ?",
+            (root, *params, limit),
+        )
+    return [(r[0], r[1], r[2], r[3]) for r in cur.fetchall()]
 
 
 def search_files_any_root(
@@ -169,160 +383,177 @@ def search_files_any_root(
 
     Returns (path, dir, name, ext, root).
     """
-    init_db()
-    conn = connect()
-    try:
-        like = "%" + term + "%"
-        if exts:
-            exts_l = [e.lower().lstrip(".") for e in exts]
-            qmarks = ",".join("?" for _ in exts_l)
-            cur = conn.execute(
-                f"SELECT path, dir, name, ext, root FROM files WHERE (name LIKE ? OR path LIKE ? OR dir LIKE ?) AND ext IN ({qmarks}) ORDER BY path LIMIT ?",
-                (like, like, like, *exts_l, limit),
-            )
-        else:
-            cur = conn.execute(
-                "SELECT path, dir, name, ext, root FROM files WHERE (name LIKE ? OR path LIKE ? OR dir LIKE ?) ORDER BY path LIMIT ?",
-                (like, like, like, limit),
-            )
-        return [(r[0], r[1], r[2], r[3], r[4]) for r in cur.fetchall()]
-    finally:
-        conn.close()
+    conn = _conn()
+    src, match, params = _substring_match(conn, term)
+    if exts:
+        exts_l, qmarks = _ext_filter(exts)
+        cur = conn.execute(
+            f"SELECT f.path, f.dir, f.name, f.ext, f.root FROM {src} WHERE {match} AND f.ext IN ({qmarks}) ORDER BY f.path LIMIT ?",
+            (*params, *exts_l, limit),
+        )
+    else:
+        cur = conn.execute(
+            f"SELECT f.path, f.dir, f.name, f.ext, f.root FROM {src} WHERE {match} ORDER BY f.path LIMIT ?",
+            (*params, limit),
+        )
+    return [(r[0], r[1], r[2], r[3], r[4]) for r in cur.fetchall()]
 
 
-def export_root_to_csv(root: str, out_path: str) -> int:
+_EXPORT_COLUMNS = ("path", "dir", "name", "ext", "root", "scanned_at")
+_EXPORT_BUFFERING = 1 << 20
+
+
+def _iter_root_row_batches(conn: sqlite3.Connection, root: str, batch: int) -> Iterator[List[tuple]]:
+    """Yield the rows of one root in fixed-size batches (never the whole result set)."""
+
+    cur = conn.execute(
+        "SELECT path, dir, name, ext, root, scanned_at FROM files WHERE root=? ORDER BY path",
+        (root,),
+    )
+    cur.arraysize = batch
+    while rows := cur.fetchmany():
+        yield rows
+
+
+def export_root_to_csv(
+    root: str,
+    out_path: str,
+    *,
+    batch: int = 1000,
+    on_progress: Optional[Callable[[int], None]] = None,
+) -> int:
     """Export all indexed rows for a root to a CSV file.
 
+    Rows are streamed from SQLite in batches of `batch`; `on_progress` (if given)
+    receives the running row count after each batch.
     Returns number of exported rows.
     """
     import csv
 
-    init_db()
-    conn = connect()
-    try:
-        cur = conn.execute(
-            "SELECT path, dir, name, ext, root, scanned_at FROM files WHERE root=? ORDER BY path",
-            (root,),
-        )
-        rows = cur.fetchall()
-        with open(out_path, "w", newline="", encoding="utf-8") as f:
-            w = csv.writer(f)
-            w.writerow(["path", "dir", "name", "ext", "root", "scanned_at"])
-            for r in rows:
-                w.writerow(r)
-        return len(rows)
-    finally:
-        conn.close()
+    conn = _conn()
+    n = 0
+    with open(out_path, "w", newline="", encoding="utf-8", buffering=_EXPORT_BUFFERING) as f:
+        w = csv.writer(f)
+        w.writerow(_EXPORT_COLUMNS)
+        for rows in _iter_root_row_batches(conn, root, batch):
+            w.writerows(rows)
+            n += len(rows)
+            if on_progress is not None:
+                on_progress(n)
+    return n
 
 
-def export_root_to_jsonl(root: str, out_path: str) -> int:
-    """Export all indexed rows for a root to a JSONL file."""
+def export_root_to_jsonl(
+    root: str,
+    out_path: str,
+    *,
+    batch: int = 1000,
+    on_progress: Optional[Callable[[int], None]] = None,
+) -> int:
+    """Export all indexed rows for a root to a JSONL file (streamed like the CSV export)."""
     import json
 
-    init_db()
-    conn = connect()
-    try:
-        cur = conn.execute(
-            "SELECT path, dir, name, ext, root, scanned_at FROM files WHERE root=? ORDER BY path",
-            (root,),
-        )
-        rows = cur.fetchall()
-        with open(out_path, "w", encoding="utf-8") as f:
-            for r in rows:
-                obj = {
-                    "path": r[0],
-                    "dir": r[1],
-                    "name": r[2],
-                    "ext": r[3],
-                    "root": r[4],
-                    "scanned_at": r[5],
-                }
-                f.write(json.dumps(obj, ensure_ascii=False) + "\n")
-        return len(rows)
-    finally:
-        conn.close()
+    conn = _conn()
+    n = 0
+    with open(out_path, "w", encoding="utf-8", buffering=_EXPORT_BUFFERING) as f:
+        for rows in _iter_root_row_batches(conn, root, batch):
+            f.writelines(
+                json.dumps(dict(zip(_EXPORT_COLUMNS, r)), ensure_ascii=False) + "\n" for r in rows
+            )
+            n += len(rows)
+            if on_progress is not None:
+                on_progress(n)
+    return n
 
 
 def search_files(term: str, *, limit: int = 200) -> List[str]:
     """Return file paths matching a substring on name or path."""
-    init_db()
-    conn = connect()
-    try:
-        like = "%" + term + "%"
+    conn = _conn()
+    src, match, params = _substring_match(conn, term)
+    cur = conn.execute(
+        f"SELECT f.path FROM {src} WHERE {match} ORDER BY f.path LIMIT ?",
+        (*params, limit),
+    )
+    return [r[0] for r in cur.fetchall()]
+
+
+def files_in_dir(dir_path: str, *, exts: Optional[Iterable[str]] = None) -> List[str]:
+    conn = _conn()
+    if exts:
+        exts_l, qmarks = _ext_filter(exts)
         cur = conn.execute(
-            "SELECT path FROM files WHERE name LIKE ? OR path LIKE ? ORDER BY path LIMIT ?",
-            (like, like, limit),
+            f"SELECT path FROM files WHERE dir=? AND ext IN ({qmarks}) ORDER BY path",
+            (dir_path, *exts_l),
         )
-        return [r[0] for r in cur.fetchall()]
-    finally:
-        conn.close()
+    else:
+        cur = conn.execute("SELECT path FROM files WHERE dir=? ORDER BY path", (dir_path,))
+    return [r[0] for r in cur.fetchall()]
 
 
-def files_in_dir(dir_path: str, *, exts: Optional[Iterable[str]] = None) -> List[str]:
-    init_db()
-    conn = connect()
-    try:
-        if exts:
-            exts_l = [e.lower().lstrip(".") for e in exts]
-            qmarks = ",".join("?" for _ in exts_l)
-            cur = conn.execute(
-                f"SELECT path FROM files WHERE dir=? AND ext IN ({qmarks}) ORDER BY path",
-                (dir_path, *exts_l),
-            )
-        else:
-            cur = conn.execute("SELECT path FROM files WHERE dir=? ORDER BY path", (dir_path,))
-        return [r[0] for r in cur.fetchall()]
-    finally:
-        conn.close()
+def files_in_dirs(dir_paths: Sequence[str], *, exts: Optional[Iterable[str]] = None) -> Dict[str, List[str]]:
+    """Like files_in_dir() for several directories in one query.
+
+    Returns {dir: [path, ...]}; every requested dir is present (possibly empty).
+    """
+    out: Dict[str, List[str]] = {d: [] for d in dir_paths}
+    if not out:
+        return out
+    conn = _conn()
+    dirs = list(out)
+    dmarks = ",".join("?" for _ in dirs)
+    if exts:
+        exts_l, qmarks = _ext_filter(exts)
+        cur = conn.execute(
+            f"SELECT dir, path FROM files WHERE dir IN ({dmarks}) AND ext IN ({qmarks}) ORDER BY path",
+            (*dirs, *exts_l),
+        )
+    else:
+        cur = conn.execute(f"SELECT dir, path FROM files WHERE dir IN ({dmarks}) ORDER BY path", dirs)
+    for d, p in cur.fetchall():
+        out[d].append(p)
+    return out
 
 
 def files_in_dir_for_root(root: str, dir_path: str, *, exts: Optional[Iterable[str]] = None, limit: int = 5000) -> List[Tuple[str, str, str, str]]:
     """Return (path, dir, name, ext) for a directory within a given root marker."""
-    init_db()
-    conn = connect()
-    try:
-        if exts:
-            exts_l = [e.lower().lstrip(".") for e in exts]
-            qmarks = ",".join("?" for _ in exts_l)
-            cur = conn.execute(
-                f"SELECT path, dir, name, ext FROM files WHERE root=? AND dir=? AND ext IN ({qmarks}) ORDER BY path LIMIT ?",
-                (root, dir_path, *exts_l, limit),
-            )
-        else:
-            cur = conn.execute(
-                "SELECT path, dir, name, ext FROM files WHERE root=? AND dir=? ORDER BY path LIMIT ?",
-                (root, dir_path, limit),
-            )
-        return [(r[0], r[1], r[2], r[3]) for r in cur.fetchall()]
-    finally:
-        conn.close()
+    conn = _conn()
+    if exts:
+        exts_l, qmarks = _ext_filter(exts)
+        cur = conn.execute(
+            f"SELECT path, dir, name, ext FROM files WHERE root=? AND dir=? AND ext IN ({qmarks}) ORDER BY path LIMIT ?",
+            (root, dir_path, *exts_l, limit),
+        )
+    else:
+        cur = conn.execute(
+            "SELECT path, dir, name, ext FROM files WHERE root=? AND dir=? ORDER BY path LIMIT ?",
+            (root, dir_path, limit),
+        )
+    return [(r[0], r[1], r[2], r[3]) for r in cur.fetchall()]
 
 
 def files_under_dir_recursive(dir_path: str, *, exts: Optional[Iterable[str]] = None, limit: int = 20000) -> List[str]:
-    """Return file paths under a directory prefix using LIKE.
+    """Return file paths under a directory prefix.
 
+    The prefix is matched as a range on the primary key (every returned path
+    starts with `dir_path + "/"`), so `%`/`_` in names are not wildcards.
     Note: This is best-effort; it relies on the analysis index.
     """
 
-    init_db()
-    conn = connect()
-    try:
-        prefix = dir_path.rstrip("/") + "/%"
-        if exts:
-            exts_l = [e.lower().lstrip(".") for e in exts]
-            qmarks = ",".join("?" for _ in exts_l)
-            cur = conn.execute(
-                f"SELECT path FROM files WHERE path LIKE ? AND ext IN ({qmarks}) ORDER BY path LIMIT ?",
-                (prefix, *exts_l, limit),
-            )
-        else:
-            cur = conn.execute(
-                "SELECT path FROM files WHERE path LIKE ? ORDER BY path LIMIT ?",
-                (prefix, limit),
-            )
-        return [r[0] for r in cur.fetchall()]
-    finally:
-        conn.close()
+    conn = _conn()
+    prefix = dir_path.rstrip("/") + "/"
+    bounds = (prefix, _prefix_upper_bound(prefix))
+    if exts:
+        exts_l, qmarks = _ext_filter(exts)
+        cur = conn.execute(
+            f"SELECT path FROM files WHERE path >= ? AND path < ? AND ext IN ({qmarks}) ORDER BY path LIMIT ?",
+            (*bounds, *exts_l, limit),
+        )
+    else:
+        cur = conn.execute(
+            "SELECT path FROM files WHERE path >= ? AND path < ? ORDER BY path LIMIT ?",
+            (*bounds, limit),
+        )
+    return [r[0] for r in cur.fetchall()]
 
 
 def files_under_dir_recursive_for_root(
@@ -333,47 +564,38 @@ def files_under_dir_recursive_for_root(
     limit: int = 20000,
 ) -> List[str]:
     """Return file paths under a directory prefix for a specific root marker."""
-    init_db()
-    conn = connect()
-    try:
-        prefix = dir_path.rstrip("/") + "/%"
-        if exts:
-            exts_l = [e.lower().lstrip(".") for e in exts]
-            qmarks = ",".join("?" for _ in exts_l)
-            cur = conn.execute(
-                f"SELECT path FROM files WHERE root=? AND path LIKE ? AND ext IN ({qmarks}) ORDER BY path LIMIT ?",
-                (root, prefix, *exts_l, limit),
-            )
-        else:
-            cur = conn.execute(
-                "SELECT path FROM files WHERE root=? AND path LIKE ? ORDER BY path LIMIT ?",
-                (root, prefix, limit),
-            )
-        return [r[0] for r in cur.fetchall()]
-    finally:
-        conn.close()
+    conn = _conn()
+    prefix = dir_path.rstrip("/") + "/"
+    bounds = (prefix, _prefix_upper_bound(prefix))
+    if exts:
+        exts_l, qmarks = _ext_filter(exts)
+        cur = conn.execute(
+            f"SELECT path FROM files WHERE root=? AND path >= ? AND path < ? AND ext IN ({qmarks}) ORDER BY path LIMIT ?",
+            (root, *bounds, *exts_l, limit),
+        )
+    else:
+        cur = conn.execute(
+            "SELECT path FROM files WHERE root=? AND path >= ? AND path < ? ORDER BY path LIMIT ?",
+            (root, *bounds, limit),
+        )
+    return [r[0] for r in cur.fetchall()]
 
 
 def files_under_root(root: str, *, exts: Optional[Iterable[str]] = None, limit: int = 5000) -> List[str]:
     """Return all file paths under a scanned root (best-effort: by root marker)."""
-    init_db()
-    conn = connect()
-    try:
-        if exts:
-            exts_l = [e.lower().lstrip(".") for e in exts]
-            qmarks = ",".join("?" for _ in exts_l)
-            cur = conn.execute(
-                f"SELECT path FROM files WHERE root=? AND ext IN ({qmarks}) ORDER BY path LIMIT ?",
-                (root, *exts_l, limit),
-            )
-        else:
-            cur = conn.execute(
-                "SELECT path FROM files WHERE root=? ORDER BY path LIMIT ?",
-                (root, limit),
-            )
-        return [r[0] for r in cur.fetchall()]
-    finally:
-        conn.close()
+    conn = _conn()
+    if exts:
+        exts_l, qmarks = _ext_filter(exts)
+        cur = conn.execute(
+            f"SELECT path FROM files WHERE root=? AND ext IN ({qmarks}) ORDER BY path LIMIT ?",
+            (root, *exts_l, limit),
+        )
+    else:
+        cur = conn.execute(
+            "SELECT path FROM files WHERE root=? ORDER BY path LIMIT ?",
+            (root, limit),
+        )
+    return [r[0] for r in cur.fetchall()]
 
 
 def db_path() -> str:
@@ -44,6 +44,35 @@ class HostKeyNotTrusted(Exception):
         self.fingerprint = fingerprint
 
 
+# stdout read size for the raw (self-framed) streaming mode.
+_RAW_RECV_BYTES = 65536
+
+
+def _line_splitter(on_line: Callable[[str], None]) -> Callable[[bytes], None]:
+    """Adapt a per-line callback to byte chunks; an empty chunk flushes the rest."""
+
+    buf = b""
+
+    def feed(chunk: bytes) -> None:
+        nonlocal buf
+        if not chunk:
+            # Flush remaining lines
+            if buf:
+                text = buf.decode("utf-8", errors="replace")
+                for line in text.splitlines():
+                    on_line(line)
+                buf = b""
+            return
+
+        buf += chunk
+        # Emit complete lines
+        while b"\n" in buf:
+            line, buf = buf.split(b"\n", 1)
+            on_line(line.decode("utf-8", errors="replace"))
+
+    return feed
+
+
 @dataclass
 class ExecResult:
     exit_status: int
@@ -61,11 +90,15 @@ class SshManager:
     def __init__(self) -> None:
         self._client: Optional[paramiko.SSHClient] = None
         self._profile: Optional[ConnectionProfile] = None
+        # Shared SFTP session, opened lazily by get_sftp().
+        self._sftp: Optional[paramiko.SFTPClient] = None
+        self._sftp_lock = threading.Lock()
 
     def is_connected(self) -> bool:
         return self._client is not None
 
     def disconnect(self) -> None:
+        self._drop_sftp()
         if self._client is not None:
             try:
                 self._client.close()
@@ -182,6 +215,7 @@ class SshManager:
 
         client.connect(**kwargs)
 
+        self._drop_sftp()
         self._client = client
         self._profile = profile
 
@@ -199,6 +233,31 @@ class SshManager:
             raise RuntimeError("Not connected")
         return self._client.open_sftp()
 
+    def get_sftp(self) -> paramiko.SFTPClient:
+        """Return the shared SFTP session, opening it on first use.
+
+        Saves a channel open + subsystem negotiation per read. Callers must not
+        close it; it is reopened if the channel died and dropped on disconnect.
+        """
+
+        with self._sftp_lock:
+            sftp = self._sftp
+            if sftp is not None:
+                chan = sftp.get_channel()
+                if chan is not None and not chan.closed:
+                    return sftp
+            self._sftp = self.open_sftp()
+            return self._sftp
+
+    def _drop_sftp(self) -> None:
+        with self._sftp_lock:
+            sftp, self._sftp = self._sftp, None
+        if sftp is not None:
+            try:
+                sftp.close()
+            except Exception:
+                pass
+
     def exec_bash_script_streaming(
         self,
         script_text: str,
@@ -213,6 +272,49 @@ class SshManager:
         Returns remote exit status.
         """
 
+        return self._exec_bash_script_chunks(
+            script_text,
+            on_stdout=_line_splitter(on_stdout),
+            on_stderr=_line_splitter(on_stderr),
+            recv_size=4096,
+            timeout=timeout,
+            cancel_event=cancel_event,
+        )
+
+    def exec_bash_script_streaming_raw(
+        self,
+        script_text: str,
+        *,
+        on_stdout_chunk: Callable[[bytes], None],
+        on_stderr: Callable[[str], None],
+        timeout: float = 3600.0,
+        cancel_event: Optional[threading.Event] = None,
+    ) -> int:
+        """Like exec_bash_script_streaming(), but hand stdout over as raw byte chunks.
+
+        For scripts with their own framing (e.g. NUL-delimited `find -print0`).
+        `on_stdout_chunk(b"")` signals end of stream. Returns remote exit status.
+        """
+
+        return self._exec_bash_script_chunks(
+            script_text,
+            on_stdout=on_stdout_chunk,
+            on_stderr=_line_splitter(on_stderr),
+            recv_size=_RAW_RECV_BYTES,
+            timeout=timeout,
+            cancel_event=cancel_event,
+        )
+
+    def _exec_bash_script_chunks(
+        self,
+        script_text: str,
+        *,
+        on_stdout: Callable[[bytes], None],
+        on_stderr: Callable[[bytes], None],
+        recv_size: int,
+        timeout: float,
+        cancel_event: Optional[threading.Event],
+    ) -> int:
         if self._client is None:
             raise RuntimeError("Not connected")
 
@@ -229,7 +331,7 @@ class SshManager:
         chan.shutdown_write()
 
         def _pump(kind: str) -> None:
-            buf = b""
+            emit = on_stdout if kind == "stdout" else on_stderr
             while True:
                 if cancel_event is not None and cancel_event.is_set():
                     try:
@@ -241,7 +343,7 @@ class SshManager:
                 # Decide which stream to read
                 if kind == "stdout":
                     if chan.recv_ready():
-                        chunk = chan.recv(4096)
+                        chunk = chan.recv(recv_size)
                     elif chan.exit_status_ready():
                         chunk = b""
                     else:
@@ -249,29 +351,17 @@ class SshManager:
                         continue
                 else:
                     if chan.recv_stderr_ready():
-                        chunk = chan.recv_stderr(4096)
+                        chunk = chan.recv_stderr(recv_size)
                     elif chan.exit_status_ready():
                         chunk = b""
                     else:
                         time.sleep(0.05)
                         continue
 
+                emit(chunk)
                 if not chunk:
-                    # Flush remaining lines
-                    if buf:
-                        text = buf.decode("utf-8", errors="replace")
-                        for line in text.splitlines():
-                            (on_stdout if kind == "stdout" else on_stderr)(line)
-                        buf = b""
                     return
 
-                buf += chunk
-                # Emit complete lines
-                while b"\n" in buf:
-                    line, buf = buf.split(b"\n", 1)
-                    text = line.decode("utf-8", errors="replace")
-                    (on_stdout if kind == "stdout" else on_stderr)(text)
-
         t_out = threading.Thread(target=_pump, args=("stdout",), daemon=True)
         t_err = threading.Thread(target=_pump, args=("stderr",), daemon=True)
         t_out.start()
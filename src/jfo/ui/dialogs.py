@@ -8,7 +8,7 @@ from pathlib import PurePosixPath
 from typing import Callable, Optional
 
 from jfo.core.validators import Sandbox, SandboxViolation
-from jfo.infra.remote_fs import Mountpoint, list_mountpoints, list_directories, normalize_posix_path, parent_dir
+from jfo.infra.remote_fs import Mountpoint, list_directories, multi_query, normalize_posix_path, parent_dir
 
 
 def ask_trust_hostkey(master: tk.Misc, host_id: str, fingerprint: str) -> bool:
@@ -123,9 +123,16 @@ def pick_remote_directory(
     ttk.Button(bottom, text="Abbrechen", command=lambda: dlg.destroy()).pack(side=tk.RIGHT, padx=6)
 
     # Helpers
+    # Checked on every navigation; rebuilt only when allowed_roots changes.
+    sandbox_cache: dict[tuple[str, ...], Sandbox] = {}
+
     def _sandbox_allows(p: str) -> tuple[bool, str]:
+        key = tuple(allowed_roots)
+        sandbox = sandbox_cache.get(key)
+        if sandbox is None:
+            sandbox = sandbox_cache[key] = Sandbox(list(key))
         try:
-            Sandbox(allowed_roots).assert_path_allowed(p)
+            sandbox.assert_path_allowed(p)
             return True, ""
         except SandboxViolation as exc:
             return False, str(exc)
@@ -164,12 +171,24 @@ def pick_remote_directory(
     # Mountpoints loading
     mountpoints: list[Mountpoint] = []
 
-    def _load_mountpoints_worker() -> None:
+    def _load_mountpoints_worker(initial_dir: str) -> None:
+        # Mountpoints and the initial folder listing share one SSH round trip.
         try:
-            mps = list_mountpoints(ssh)
+            res = multi_query(ssh, mounts=True, list_paths=[initial_dir])
         except Exception as exc:  # noqa: BLE001
-            dlg.after(0, lambda: status_var.set(f"Mountpoints laden fehlgeschlagen: {exc}"))
+            _post_dirs(initial_dir, None, str(exc))
+            dlg.after(0, lambda e=exc: status_var.set(f"Mountpoints laden fehlgeschlagen: {e}"))
             mps = []
+        else:
+            # A failing `df` (common when one NAS mount cannot be stat'ed) must
+            # not hide the listing that ran in the same round trip.
+            if initial_dir in res.directory_errors:
+                _post_dirs(initial_dir, None, res.directory_errors[initial_dir])
+            else:
+                _post_dirs(initial_dir, res.directories.get(initial_dir, []), None)
+            mps = res.mountpoints or []
+            if res.mount_error is not None:
+                dlg.after(0, lambda e=res.mount_error: status_var.set(f"Mountpoints laden fehlgeschlagen: {e}"))
 
         def _apply() -> None:
             nonlocal mountpoints
@@ -205,10 +224,26 @@ def pick_remote_directory(
 
         dlg.after(0, _apply)
 
-    threading.Thread(target=_load_mountpoints_worker, daemon=True).start()
-
     # Directory listing
-    def _refresh_dirs() -> None:
+    def _post_dirs(cur: str, dirs: list[str] | None, err: str | None) -> None:
+        """Show a listing result (called from worker threads)."""
+
+        def _apply_err() -> None:
+            dir_list.delete(0, tk.END)
+            dir_list.insert(tk.END, "<Fehler beim Laden>")
+            status_var.set(f"{cur}: {err}")
+            _update_status()
+
+        def _apply_ok() -> None:
+            dir_list.delete(0, tk.END)
+            for d in dirs or []:
+                dir_list.insert(tk.END, d)
+            status_var.set(f"{cur}  —  {len(dirs or [])} Unterordner")
+            _update_status()
+
+        dlg.after(0, _apply_err if err is not None else _apply_ok)
+
+    def _current_dir_for_listing() -> str:
         cur = normalize_posix_path(path_var.get())
         if not cur:
             cur = "/"
@@ -217,31 +252,18 @@ def pick_remote_directory(
         dir_list.delete(0, tk.END)
         dir_list.insert(tk.END, "(lädt …)")
         _update_status()
+        return cur
+
+    def _refresh_dirs() -> None:
+        cur = _current_dir_for_listing()
 
         def _worker() -> None:
             try:
                 dirs = list_directories(ssh, cur)
             except Exception as exc:  # noqa: BLE001
-                dirs = []
-                err = str(exc)
-
-                def _apply_err() -> None:
-                    dir_list.delete(0, tk.END)
-                    dir_list.insert(tk.END, "<Fehler beim Laden>")
-                    status_var.set(f"{cur}: {err}")
-                    _update_status()
-
-                dlg.after(0, _apply_err)
+                _post_dirs(cur, None, str(exc))
                 return
-
-            def _apply_ok() -> None:
-                dir_list.delete(0, tk.END)
-                for d in dirs:
-                    dir_list.insert(tk.END, d)
-                status_var.set(f"{cur}  —  {len(dirs)} Unterordner")
-                _update_status()
-
-            dlg.after(0, _apply_ok)
+            _post_dirs(cur, dirs, None)
 
         threading.Thread(target=_worker, daemon=True).start()
 
@@ -322,8 +344,8 @@ def pick_remote_directory(
     except Exception:
         pass
 
-    # Initial load
-    _refresh_dirs()
+    # Initial load (mountpoints + current folder in one SSH command)
+    threading.Thread(target=_load_mountpoints_worker, args=(_current_dir_for_listing(),), daemon=True).start()
 
     dlg.wait_window()
     return result["path"]
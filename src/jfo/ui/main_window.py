@@ -3,6 +3,7 @@ from __future__ import annotations
 import tkinter as tk
 from tkinter import ttk
 
+from jfo.core.validators import Sandbox
 from jfo.infra.settings import load_settings, save_settings, AppSettings
 from jfo.infra.ssh_client import SshManager
 from jfo.infra.sqlite_index import init_db
@@ -23,6 +24,7 @@ class MainWindow(ttk.Frame):
         self.master = master
         self.settings: AppSettings = load_settings()
         self.ssh = SshManager()
+        self._sandbox: Sandbox | None = None
 
         init_db()
 
@@ -51,6 +53,15 @@ class MainWindow(ttk.Frame):
         # Save settings on close
         self.master.protocol("WM_DELETE_WINDOW", self._on_close)
 
+    @property
+    def sandbox(self) -> Sandbox:
+        """Sandbox for the current allowed roots; rebuilt only when they change."""
+
+        roots = list(self.settings.allowed_roots)
+        if self._sandbox is None or self._sandbox.allowed_roots != roots:
+            self._sandbox = Sandbox(roots)
+        return self._sandbox
+
     def _on_close(self) -> None:
         try:
             save_settings(self.settings)
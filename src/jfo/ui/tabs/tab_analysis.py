@@ -1,12 +1,13 @@
 from __future__ import annotations
 
+import queue
 import threading
-from dataclasses import dataclass
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
+from typing import Callable
 
 from jfo.core.quoting import bash_quote
-from jfo.core.validators import Sandbox, SandboxViolation
+from jfo.core.validators import SandboxViolation
 from jfo.infra.sqlite_index import (
     upsert_paths,
     db_path,
@@ -17,21 +18,34 @@ from jfo.infra.sqlite_index import (
     export_root_to_csv,
     export_root_to_jsonl,
 )
-from jfo.ui.widgets import LabeledEntry, LabeledCombobox, ReadonlyText, LogText, PlanTable
+from jfo.ui.widgets import LabeledEntry, LabeledCombobox, ReadonlyText, LogText, PlanTable, VirtualPlanTable
 from jfo.ui.dialogs import pick_remote_directory
 
 
-@dataclass
-class FileHitVM:
-    path: str
-    dir: str
-    name: str
-    ext: str
-    root: str
-    selected: bool = True
+# Scan results are written to the index in batches of this size while the scan runs.
+_SCAN_UPSERT_BATCH = 5000
+
+# Delay after the last keystroke before the dir filter/search re-queries.
+_TYPING_DEBOUNCE_MS = 300
+
+# Log a progress line roughly every this many exported rows.
+_EXPORT_PROGRESS_ROWS = 5000
 
 
 class AnalysisTab(ttk.Frame):
+    # stdout is a NUL-delimited record stream (find -print0), so the receiver
+    # can split whole chunks at once and any file name is safe.
+    _SCAN_SCRIPT_TEMPLATE = (
+        "#!/usr/bin/env bash\n"
+        "set -euo pipefail\n"
+        "\n"
+        "ROOT={root_q}\n"
+        "printf '[jfo] scan root=%s\\0' \"$ROOT\"\n"
+        "printf 'JFO_SCAN_BEGIN\\0'\n"
+        "find \"$ROOT\" -type f {find_filter}-print0\n"
+        "printf 'JFO_SCAN_END\\0'\n"
+    )
+
     def __init__(self, master, *, app):
         super().__init__(master)
         self.app = app
@@ -40,7 +54,9 @@ class AnalysisTab(ttk.Frame):
         self._exts: list[str] = []
         self._active_root: str = ""
         self._dir_cache: list[str] = []
-        self._file_hits: list[FileHitVM] = []
+        self._debounce_id: str | None = None
+        # Raw (path, dir, name, ext) rows of the file pane.
+        self._file_hits: list[tuple[str, str, str, str]] = []
 
         # Inputs
         in_frm = ttk.LabelFrame(self, text="Festplatte scannen / Index aufbauen")
@@ -106,6 +122,7 @@ class AnalysisTab(ttk.Frame):
         self.dir_prefix = tk.StringVar(value="")
         de = ttk.Entry(dir_top, textvariable=self.dir_prefix)
         de.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=6)
+        de.bind("<KeyRelease>", lambda _e: self._debounce(lambda: self._load_dirs(interactive=False)))
         ttk.Button(dir_top, text="Ordner laden", command=self._load_dirs).pack(side=tk.LEFT)
 
         self.dir_list = tk.Listbox(left, height=12)
@@ -119,12 +136,13 @@ class AnalysisTab(ttk.Frame):
         self.search_term = tk.StringVar(value="")
         se = ttk.Entry(search_top, textvariable=self.search_term)
         se.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=6)
+        se.bind("<KeyRelease>", lambda _e: self._debounce(lambda: self._search_files(interactive=False)))
 
         self.filter_video_only = tk.BooleanVar(value=True)
         ttk.Checkbutton(search_top, text="nur Videos", variable=self.filter_video_only).pack(side=tk.LEFT)
         ttk.Button(search_top, text="Suchen", command=self._search_files).pack(side=tk.LEFT, padx=6)
 
-        self.files_table = PlanTable(right, columns=["Name", "Ext", "Dir", "Path", "Root"], on_toggle=None)
+        self.files_table = VirtualPlanTable(right, columns=["Name", "Ext", "Dir", "Path", "Root"])
         self.files_table.pack(fill=tk.BOTH, expand=True, pady=(6, 0))
 
         # Plan/Preview
@@ -204,7 +222,7 @@ class AnalysisTab(ttk.Frame):
 
         # Client-side sandbox check (preventive)
         try:
-            Sandbox(self.app.settings.allowed_roots).assert_path_allowed(root)
+            self.app.sandbox.assert_path_allowed(root)
         except SandboxViolation as exc:
             messagebox.showerror(
                 "Sandbox",
@@ -218,33 +236,13 @@ class AnalysisTab(ttk.Frame):
         self._scan_root = root
         self._exts = exts
 
-        all_files = bool(self.all_files.get())
-        find_parts = []
-        for e in exts:
-            find_parts.append(f"-iname '*.{e}'")
-
-        # Build the find expression.
-        # IMPORTANT: use quoted parentheses '(' and ')' to avoid shell parsing issues.
-        # (We previously emitted '\\(' which can be interpreted by bash as an unescaped '(' token.)
-        expr = " -o ".join(find_parts) if find_parts else "-true"
-
-        script = [
-            "#!/usr/bin/env bash",
-            "set -euo pipefail",
-            "IFS=$'\\n\\t'",
-            "set -f",
-            "",
-            f"ROOT={bash_quote(root)}",
-            f"echo '[jfo] scan root='\"$ROOT\"",
-            "echo 'JFO_SCAN_BEGIN'",
-            (
-                f"find \"$ROOT\" -type f -print"
-                if all_files
-                else f"find \"$ROOT\" -type f '(' {expr} ')' -print"
-            ),
-            "echo 'JFO_SCAN_END'",
-        ]
-        self._script = "\n".join(script) + "\n"
+        if self.all_files.get() or not exts:
+            find_filter = ""
+        else:
+            # Quoted parentheses '(' and ')' avoid shell parsing issues
+            # ('\\(' can be interpreted by bash as an unescaped '(' token).
+            find_filter = "'(' " + " -o ".join(f"-iname {bash_quote('*.' + e)}" for e in exts) + " ')' "
+        self._script = self._SCAN_SCRIPT_TEMPLATE.format(root_q=bash_quote(root), find_filter=find_filter)
 
         self.table.bind_operations(
             [object()],
@@ -268,43 +266,86 @@ class AnalysisTab(ttk.Frame):
         t.start()
 
     def _worker_exec(self) -> None:
-        paths: list[str] = []
+        scan_root = self._scan_root
+        paths_buf: list[str] = []
+        seen: set[str] = set()
         in_list = {"active": False}
 
-        def on_out(line: str) -> None:
-            if line.strip() == "JFO_SCAN_BEGIN":
-                in_list["active"] = True
-                return
-            if line.strip() == "JFO_SCAN_END":
-                in_list["active"] = False
-                return
-            if in_list["active"]:
-                p = line.strip("\r")
-                if p:
-                    paths.append(p)
-                    # avoid flooding UI
-                    if len(paths) % 500 == 0:
-                        self.after(0, lambda n=len(paths): self.log.append_line(f"[scan] {n} files..."))
+        # Upserts run on a second thread while the scan is still streaming.
+        pending: queue.Queue[list[str] | None] = queue.Queue()
+        upserted = {"count": 0, "error": None}
+
+        def upsert_worker() -> None:
+            while (chunk := pending.get()) is not None:
+                if upserted["error"] is not None:
+                    continue
+                try:
+                    upserted["count"] += upsert_paths(chunk, root=scan_root)
+                except Exception as exc:  # noqa: BLE001
+                    upserted["error"] = exc
+
+        writer = threading.Thread(target=upsert_worker, daemon=True)
+        writer.start()
+
+        buf = b""
+
+        def on_chunk(chunk: bytes) -> None:
+            nonlocal buf, paths_buf
+            if chunk:
+                records = (buf + chunk).split(b"\0")
+                buf = records.pop()
             else:
-                self.after(0, lambda l=line: self.log.append_line(l))
+                # End of stream: a trailing record without terminator still counts.
+                records, buf = ([buf] if buf else []), b""
+            for rec in records:
+                if rec == b"JFO_SCAN_BEGIN":
+                    in_list["active"] = True
+                    continue
+                if rec == b"JFO_SCAN_END":
+                    in_list["active"] = False
+                    continue
+                p = rec.decode("utf-8", errors="replace")
+                if not in_list["active"]:
+                    self.log.post_line(p)
+                    continue
+                if p and p not in seen:
+                    seen.add(p)
+                    paths_buf.append(p)
+                    if len(seen) % 500 == 0:
+                        self.log.post_line(f"[scan] {len(seen)} files...")
+                    if len(paths_buf) >= _SCAN_UPSERT_BATCH:
+                        pending.put(paths_buf)
+                        paths_buf = []
 
         def on_err(line: str) -> None:
-            self.after(0, lambda l=line: self.log.append_line("STDERR: " + l))
+            self.log.post_line("STDERR: " + line)
 
         try:
-            exit_code = self.app.ssh.exec_bash_script_streaming(self._script, on_stdout=on_out, on_stderr=on_err)
-            if exit_code != 0:
-                self.after(0, lambda: self.log.append_line(f"[local] scan exit={exit_code}"))
-                return
-
-            # Persist
-            count = upsert_paths(paths, root=self._scan_root)
-            self.after(0, lambda: self._after_scan_ok(count))
+            exit_code = self.app.ssh.exec_bash_script_streaming_raw(
+                self._script, on_stdout_chunk=on_chunk, on_stderr=on_err
+            )
         except Exception as exc:  # noqa: BLE001
-            self.after(0, lambda: self.log.append_line(f"[local] scan ERROR: {exc}"))
+            exit_code = None
+            self.log.post_line(f"[local] scan ERROR: {exc}")
+        finally:
+            if paths_buf:
+                pending.put(paths_buf)
+            pending.put(None)
+            writer.join()
+
+        if exit_code is None:
+            return
+        if upserted["error"] is not None:
+            self.log.post_line(f"[local] scan ERROR: {upserted['error']}")
+            return
+        if exit_code != 0:
+            self.log.post_line(f"[local] scan exit={exit_code} ({upserted['count']} paths indexed before failure)")
+            return
+        self.after(0, lambda n=upserted["count"]: self._after_scan_ok(n))
 
     def _after_scan_ok(self, count: int) -> None:
-        self.log.append_line(f"[local] scan OK. indexed {count} paths (root marker='{self._scan_root}')")
+        # Via the buffer so it lands after any stray output still pending there.
+        self.log.post_line(f"[local] scan OK. indexed {count} paths (root marker='{self._scan_root}')")
         self._refresh_roots(select=self._scan_root)
 
     def _refresh_roots(self, select: str | None = None) -> None:
@@ -332,7 +373,9 @@ class AnalysisTab(ttk.Frame):
         self._active_root = root
         return root
 
-    def _load_dirs(self) -> None:
+    def _load_dirs(self, *, interactive: bool = True) -> None:
+        if not interactive and not self.root_combo.get():
+            return
         root = self._ensure_active_root()
         if not root:
             return
@@ -340,8 +383,7 @@ class AnalysisTab(ttk.Frame):
         dirs = distinct_dirs_for_root(root, prefix=prefix, limit=2000)
         self._dir_cache = dirs
         self.dir_list.delete(0, tk.END)
-        for d in dirs:
-            self.dir_list.insert(tk.END, d)
+        self.dir_list.insert(tk.END, *dirs)
         self.log.append_line(f"[local] loaded {len(dirs)} dirs for root '{root}'")
 
     def _load_files_for_selected_dir(self) -> None:
@@ -356,59 +398,77 @@ class AnalysisTab(ttk.Frame):
             return
         d = self._dir_cache[idx]
         rows = files_in_dir_for_root(root, d, exts=None, limit=5000)
-        hits = [FileHitVM(path=r[0], dir=r[1], name=r[2], ext=r[3], root=root) for r in rows]
-        self._file_hits = hits
-        self.files_table.bind_operations(
-            hits,
-            row_getter=lambda h: (h.name, h.ext, h.dir, h.path, h.root),
-        )
+        self._show_file_hits(rows, root)
+
+    def _debounce(self, run: Callable[[], None]) -> None:
+        """Run `run` once typing pauses, instead of querying on every keystroke."""
 
-    def _search_files(self) -> None:
+        if self._debounce_id is not None:
+            self.after_cancel(self._debounce_id)
+
+        def fire() -> None:
+            self._debounce_id = None
+            run()
+
+        self._debounce_id = self.after(_TYPING_DEBOUNCE_MS, fire)
+
+    def _search_files(self, *, interactive: bool = True) -> None:
+        term = self.search_term.get().strip()
+        if not interactive and not (term and self.root_combo.get()):
+            return
         root = self._ensure_active_root()
         if not root:
             return
-        term = self.search_term.get().strip()
         if not term:
             messagebox.showwarning("Suche", "Bitte Suchbegriff eingeben.", parent=self)
             return
 
         exts = None
         if self.filter_video_only.get():
-            exts = self.app.settings.video_exts
+            exts = self.app.settings.video_ext_set
 
         rows = search_files_for_root(root, term, exts=exts, limit=500)
-        hits = [FileHitVM(path=r[0], dir=r[1], name=r[2], ext=r[3], root=root) for r in rows]
-        self._file_hits = hits
-        self.files_table.bind_operations(
-            hits,
-            row_getter=lambda h: (h.name, h.ext, h.dir, h.path, h.root),
-        )
-        self.log.append_line(f"[local] search '{term}' -> {len(hits)} hits (root='{root}')")
+        self._show_file_hits(rows, root)
+        self.log.append_line(f"[local] search '{term}' -> {len(rows)} hits (root='{root}')")
+
+    def _show_file_hits(self, rows: list[tuple[str, str, str, str]], root: str) -> None:
+        self._file_hits = rows
+        self.files_table.set_backing(rows, row_getter=lambda r: (r[2], r[3], r[1], r[0], root))
 
     def _export_csv(self) -> None:
-        root = self._ensure_active_root()
-        if not root:
-            return
-        path = filedialog.asksaveasfilename(
-            title="Export CSV",
-            defaultextension=".csv",
-            filetypes=[("CSV", "*.csv"), ("All files", "*")],
-        )
-        if not path:
-            return
-        n = export_root_to_csv(root, path)
-        self.log.append_line(f"[local] exported {n} rows to CSV: {path}")
+        self._start_export("csv")
 
     def _export_jsonl(self) -> None:
+        self._start_export("jsonl")
+
+    def _start_export(self, kind: str) -> None:
         root = self._ensure_active_root()
         if not root:
             return
+        label = kind.upper()
         path = filedialog.asksaveasfilename(
-            title="Export JSONL",
-            defaultextension=".jsonl",
-            filetypes=[("JSONL", "*.jsonl"), ("All files", "*")],
+            title=f"Export {label}",
+            defaultextension=f".{kind}",
+            filetypes=[(label, f"*.{kind}"), ("All files", "*")],
         )
         if not path:
             return
-        n = export_root_to_jsonl(root, path)
-        self.log.append_line(f"[local] exported {n} rows to JSONL: {path}")
+        self.log.append_line(f"[local] exporting root '{root}' to {label}...")
+        t = threading.Thread(target=self._worker_export, args=(kind, root, path), daemon=True)
+        t.start()
+
+    def _worker_export(self, kind: str, root: str, path: str) -> None:
+        export = export_root_to_csv if kind == "csv" else export_root_to_jsonl
+        reported = {"n": 0}
+
+        def on_progress(n: int) -> None:
+            # avoid flooding UI
+            if n - reported["n"] >= _EXPORT_PROGRESS_ROWS:
+                reported["n"] = n
+                self.log.post_line(f"[export] {n} rows...")
+
+        try:
+            n = export(root, path, on_progress=on_progress)
+            self.log.post_line(f"[local] exported {n} rows to {kind.upper()}: {path}")
+        except Exception as exc:  # noqa: BLE001
+            self.log.post_line(f"[local] export ERROR: {exc}")
@@ -362,7 +362,7 @@ class ConnectionTab(ttk.Frame):
                 # Ensure directory and permissions
                 self.app.ssh.exec_command("mkdir -p ~/.ssh && chmod 700 ~/.ssh")
 
-                sftp = self.app.ssh.open_sftp()
+                sftp = self.app.ssh.get_sftp()
                 existing = ""
                 try:
                     with sftp.open(auth_keys, "r") as f:
@@ -385,11 +385,6 @@ class ConnectionTab(ttk.Frame):
                         pass
                     self.after(0, lambda: self.log.append_line("[local] public key appended to authorized_keys"))
 
-                try:
-                    sftp.close()
-                except Exception:
-                    pass
-
                 self.after(0, lambda: messagebox.showinfo(
                     "Public Key installiert",
                     "Der Public Key wurde in ~/.ssh/authorized_keys installiert (falls nicht vorhanden).\n\nDu kannst jetzt auf 'SSH-Key / Agent' umstellen.",
@@ -1,27 +1,58 @@
 from __future__ import annotations
 
 import csv
-from pathlib import PurePosixPath
+import itertools
 import threading
 import tkinter as tk
 from tkinter import filedialog, ttk, messagebox
+from typing import Iterator, TextIO
 
 from jfo.core.operations import Operation, OperationKind
+from jfo.core.pathutil import posix_normpath
 from jfo.core.plan import Plan
 from jfo.core.history import ops_to_journal_dicts
 from jfo.core.scriptgen import ScriptOptions, generate_bash_script
-from jfo.core.validators import Sandbox, SandboxViolation
-from jfo.infra.journal import append_journal
+from jfo.core.validators import SandboxViolation
+from jfo.infra.journal import RunOutput, append_journal
 from jfo.ui.dialogs import ask_text_confirm, pick_remote_directory, ask_execute_with_dry_run
 from jfo.ui.widgets import LabeledEntry, ReadonlyText, LogText, PlanTable
 
 
+def _iter_input_paths(fh: TextIO) -> Iterator[str]:
+    """Yield relative paths from a plain list or a `path;type` CSV, line by line."""
+
+    # CSV heuristics: header contains ';' or first non-empty line contains ';'
+    head = list(itertools.islice(fh, 5))
+    fh.seek(0)
+    is_csv = any(";" in ln for ln in head if ln.strip())
+
+    if is_csv:
+        # path;type
+        for row in csv.reader(fh, delimiter=";"):
+            rel = row[0].strip() if row else ""
+            if rel and not rel.startswith("#"):
+                yield rel
+    else:
+        for ln in fh:
+            ln = ln.strip()
+            if ln and not ln.startswith("#"):
+                yield ln
+
+
+# Pause after the last row toggle before the script is regenerated.
+_REGEN_DELAY_MS = 250
+
+
 class CreateDirsTab(ttk.Frame):
     def __init__(self, master, *, app):
         super().__init__(master)
         self.app = app
         self._plan: Plan | None = None
         self._script: str = ""
+        # Row toggles only mark the script stale; it is regenerated after a
+        # short pause or right before executing.
+        self._script_dirty = False
+        self._regen_after_id: str | None = None
 
         in_frm = ttk.LabelFrame(self, text="Ordnerstruktur aus Datei")
         in_frm.pack(fill=tk.X, padx=10, pady=10)
@@ -55,7 +86,7 @@ class CreateDirsTab(ttk.Frame):
 
         prev_frm = ttk.LabelFrame(self, text="Preview (Doppelklick toggelt Sel)")
         prev_frm.pack(fill=tk.BOTH, expand=True, padx=10, pady=(0, 10))
-        self.table = PlanTable(prev_frm, columns=["Type", "Path"], on_toggle=self._regen_script)
+        self.table = PlanTable(prev_frm, columns=["Type", "Path"], on_toggle=self._schedule_regen)
         self.table.pack(fill=tk.BOTH, expand=True)
 
         out_frm = ttk.LabelFrame(self, text="Generiertes Script")
@@ -117,29 +148,8 @@ class CreateDirsTab(ttk.Frame):
         if not path:
             raise ValueError("Keine Input-Datei gewählt")
 
-        text = open(path, "r", encoding="utf-8", errors="replace").read().splitlines()
-        entries: list[str] = []
-
-        # CSV heuristics: header contains ';' or first non-empty line contains ';'
-        is_csv = any(";" in ln for ln in text[:5] if ln.strip())
-
-        if is_csv:
-            # path;type
-            for ln in text:
-                if not ln.strip() or ln.strip().startswith("#"):
-                    continue
-                parts = ln.split(";", 1)
-                rel = parts[0].strip()
-                if rel:
-                    entries.append(rel)
-        else:
-            for ln in text:
-                ln = ln.strip()
-                if not ln or ln.startswith("#"):
-                    continue
-                entries.append(ln)
-
-        return entries
+        with open(path, "r", newline="", encoding="utf-8", errors="replace") as fh:
+            return list(_iter_input_paths(fh))
 
     def _build_plan(self) -> None:
         try:
@@ -153,13 +163,12 @@ class CreateDirsTab(ttk.Frame):
             messagebox.showwarning("Eingabe", "Remote Ziel-Root fehlt.", parent=self)
             return
 
-        sandbox = Sandbox(self.app.settings.allowed_roots)
+        sandbox = self.app.sandbox
 
         ops: list[Operation] = []
+        base = remote_root.rstrip("/")
         for rel in entries:
-            rel_clean = rel.lstrip("/")
-            p = PurePosixPath(remote_root) / PurePosixPath(rel_clean)
-            dst = str(p)
+            dst = posix_normpath(f"{base}/{rel.lstrip('/')}")
             try:
                 sandbox.assert_path_allowed(dst)
             except SandboxViolation as exc:
@@ -177,11 +186,22 @@ class CreateDirsTab(ttk.Frame):
         self.table.bind_operations(
             plan.operations,
             row_getter=lambda op: (op.kind.value, op.dst or ""),
+            plan=plan,
         )
 
         self.log.append_line(f"[local] Plan ready: {plan.count_selected()} ops selected")
 
+    def _schedule_regen(self) -> None:
+        self._script_dirty = True
+        if self._regen_after_id is not None:
+            self.after_cancel(self._regen_after_id)
+        self._regen_after_id = self.after(_REGEN_DELAY_MS, self._regen_script)
+
     def _regen_script(self) -> None:
+        if self._regen_after_id is not None:
+            self.after_cancel(self._regen_after_id)
+            self._regen_after_id = None
+        self._script_dirty = False
         if not self._plan:
             return
         opts = ScriptOptions(
@@ -202,6 +222,9 @@ class CreateDirsTab(ttk.Frame):
             messagebox.showerror("SSH", "Nicht verbunden. (Tab Main)", parent=self)
             return
 
+        if self._script_dirty:
+            self._regen_script()
+
         n = self._plan.count_selected()
         if n == 0:
             messagebox.showinfo("Plan", "Keine selektierten Operationen.", parent=self)
@@ -235,25 +258,28 @@ class CreateDirsTab(ttk.Frame):
         assert self._plan is not None
         assert self._script
 
-        stdout_lines: list[str] = []
-        stderr_lines: list[str] = []
+        output = RunOutput()
 
         def on_out(line: str) -> None:
-            stdout_lines.append(line)
-            self.after(0, lambda l=line: self.log.append_line(l))
+            output.write_stdout(line)
+            self.log.post_line(line)
 
         def on_err(line: str) -> None:
-            stderr_lines.append(line)
-            self.after(0, lambda l=line: self.log.append_line("STDERR: " + l))
+            output.write_stderr(line)
+            self.log.post_line("STDERR: " + line)
 
         try:
-            exit_code = self.app.ssh.exec_bash_script_streaming(self._script, on_stdout=on_out, on_stderr=on_err)
+            try:
+                exit_code = self.app.ssh.exec_bash_script_streaming(self._script, on_stdout=on_out, on_stderr=on_err)
+            finally:
+                output.close()
+            profile = self.app.settings.get_active_profile()
             append_journal(
                 {
                     "tab": "create_dirs",
                     "plan_title": self._plan.title,
-                    "host": self.app.settings.get_active_profile().host,
-                    "username": self.app.settings.get_active_profile().username,
+                    "host": profile.host,
+                    "username": profile.username,
                     "dry_run": bool(self.dry_run.get()),
                     "no_overwrite": bool(self.app.settings.no_overwrite),
                     "ops_total": len(self._plan.operations),
@@ -261,10 +287,9 @@ class CreateDirsTab(ttk.Frame):
                     "ops": ops_to_journal_dicts(self._plan.selected_operations()),
                     "script": self._script,
                     "exit_code": exit_code,
-                    "stdout": "\n".join(stdout_lines),
-                    "stderr": "\n".join(stderr_lines),
+                    **output.record_fields(),
                 }
             )
-            self.after(0, lambda: self.log.append_line(f"[local] exit={exit_code} (journal written)"))
+            self.log.post_line(f"[local] exit={exit_code} (journal written)")
         except Exception as exc:  # noqa: BLE001
-            self.after(0, lambda: self.log.append_line(f"[local] ERROR: {exc}"))
+            self.log.post_line(f"[local] ERROR: {exc}")
@@ -1,7 +1,6 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from pathlib import PurePosixPath
 import threading
 import tkinter as tk
 from tkinter import ttk, messagebox
@@ -9,18 +8,19 @@ from tkinter import ttk, messagebox
 from jfo.core.categories import MOVIE_CATEGORIES
 from jfo.core.media_grouping import MediaGroup, group_media_files
 from jfo.core.operations import Operation, OperationKind
+from jfo.core.pathutil import posix_name, posix_normpath
 from jfo.core.plan import Plan
 from jfo.core.history import ops_to_journal_dicts
 from jfo.core.scriptgen import ScriptOptions, generate_bash_script
-from jfo.core.validators import Sandbox, SandboxViolation
-from jfo.infra.journal import append_journal
-from jfo.infra.index_update import apply_plan_to_index
+from jfo.core.validators import SandboxViolation
+from jfo.infra.journal import RunOutput, append_journal
+from jfo.infra.index_update import log_index_result, submit_plan_to_index
 from jfo.infra.sqlite_index import files_under_dir_recursive
 from jfo.ui.dialogs import ask_text_confirm, pick_remote_directory, ask_execute_with_dry_run
 from jfo.ui.widgets import LabeledEntry, ReadonlyText, LogText, PlanTable
 
 
-@dataclass
+@dataclass(slots=True)
 class MovieVM:
     group: MediaGroup
     selected: bool = False
@@ -28,12 +28,21 @@ class MovieVM:
     def display(self, master_root: str) -> str:
         if not self.group.video:
             return "(no video)"
-        p = PurePosixPath(self.group.video.path)
-        try:
-            rel = str(p.relative_to(PurePosixPath(master_root)))
-        except Exception:
-            rel = self.group.video.path
-        return rel
+        path = self.group.video.path
+        prefix = _dir_prefix(master_root)
+        return path[len(prefix) :] if path.startswith(prefix) else path
+
+
+def _dir_prefix(directory: str) -> str:
+    """Normalized `directory` with exactly one trailing slash, for startswith/slicing."""
+    return posix_normpath(directory).rstrip("/") + "/"
+
+
+def _rel_or_name(path: str, root_prefix: str) -> str:
+    """`path` relative to the root behind `root_prefix`, else just its file name."""
+    if path.startswith(root_prefix):
+        return path[len(root_prefix) :]
+    return posix_name(path)
 
 
 class HardlinksTab(ttk.Frame):
@@ -180,7 +189,7 @@ class HardlinksTab(ttk.Frame):
             messagebox.showwarning("Eingabe", "Master-Root fehlt.", parent=self)
             return
 
-        sandbox = Sandbox(self.app.settings.allowed_roots)
+        sandbox = self.app.sandbox
         try:
             sandbox.assert_path_allowed(master_root)
         except SandboxViolation as exc:
@@ -192,7 +201,7 @@ class HardlinksTab(ttk.Frame):
         t.start()
 
     def _worker_load_movies(self, master_root: str) -> None:
-        exts = set([e.lower().lstrip(".") for e in (self.app.settings.video_exts + self.app.settings.sidecar_exts)])
+        exts = self.app.settings.media_ext_set
         paths = files_under_dir_recursive(master_root, exts=exts, limit=200000)
         if not paths:
             self.after(
@@ -207,8 +216,8 @@ class HardlinksTab(ttk.Frame):
 
         groups = group_media_files(
             paths,
-            video_exts=set(self.app.settings.video_exts),
-            sidecar_exts=set(self.app.settings.sidecar_exts),
+            video_exts=self.app.settings.video_ext_set,
+            sidecar_exts=self.app.settings.sidecar_ext_set,
         )
         movies = [MovieVM(group=g) for g in groups if g.video]
 
@@ -257,7 +266,7 @@ class HardlinksTab(ttk.Frame):
             messagebox.showwarning("Eingabe", "Libraries Root fehlt.", parent=self)
             return
 
-        sandbox = Sandbox(self.app.settings.allowed_roots)
+        sandbox = self.app.sandbox
         try:
             sandbox.assert_path_allowed(master_root)
             sandbox.assert_path_allowed(lib_root)
@@ -276,45 +285,36 @@ class HardlinksTab(ttk.Frame):
         ops: list[Operation] = []
 
         # Ensure top-level category folders exist
-        for cat in cats:
-            cat_dir = str(PurePosixPath(lib_root) / cat)
+        cat_dirs = [_dir_prefix(lib_root) + cat for cat in cats]
+        for cat_dir in cat_dirs:
             ops.append(Operation(kind=OperationKind.MKDIR, dst=cat_dir))
 
+        master_prefix = _dir_prefix(master_root)
+        sidecar_kind = OperationKind.LINK if policy == "link" else OperationKind.COPY
+        with_sidecars = policy in ("link", "copy")
+
         for mv in movies:
             g = mv.group
             if not g.video:
                 continue
             src_video = g.video.path
 
-            # Compute relative folder + filename to keep stable structure per movie
-            vpath = PurePosixPath(src_video)
-            try:
-                rel_file = vpath.relative_to(PurePosixPath(master_root))
-            except Exception:
-                # fallback: just basename
-                rel_file = PurePosixPath(vpath.name)
-
-            for cat in cats:
-                dest_file = PurePosixPath(lib_root) / cat / rel_file
-                ops.append(Operation(kind=OperationKind.LINK, src=src_video, dst=str(dest_file)))
-
-                if policy in ("link", "copy"):
-                    for sc in g.sidecars:
-                        sp = PurePosixPath(sc.path)
-                        try:
-                            rel_sc = sp.relative_to(PurePosixPath(master_root))
-                        except Exception:
-                            rel_sc = PurePosixPath(sp.name)
-                        dst_sc = PurePosixPath(lib_root) / cat / rel_sc
-                        kind = OperationKind.LINK if policy == "link" else OperationKind.COPY
-                        ops.append(Operation(kind=kind, src=sc.path, dst=str(dst_sc)))
+            # Relative folder + filename keeps a stable structure per movie
+            # (fallback: just the basename).
+            rel_file = _rel_or_name(src_video, master_prefix)
+            rel_sidecars = [(sc.path, _rel_or_name(sc.path, master_prefix)) for sc in g.sidecars] if with_sidecars else []
+
+            for cat_dir in cat_dirs:
+                ops.append(Operation(kind=OperationKind.LINK, src=src_video, dst=f"{cat_dir}/{rel_file}"))
+                for sc_path, rel_sc in rel_sidecars:
+                    ops.append(Operation(kind=sidecar_kind, src=sc_path, dst=f"{cat_dir}/{rel_sc}"))
 
         plan = Plan(title="Hardlinks")
         plan.extend(ops)
         plan.apply_collision_warnings()
         self._plan = plan
 
-        self.plan_table.bind_operations(plan.operations, row_getter=lambda op: (op.kind.value, op.src or "", op.dst or "", op.warning))
+        self.plan_table.bind_operations(plan.operations, row_getter=lambda op: (op.kind.value, op.src or "", op.dst or "", op.warning), plan=plan)
         self._regen_script()
         self.log.append_line(f"[local] Plan ready: {plan.count_selected()} ops selected")
 
@@ -373,25 +373,28 @@ class HardlinksTab(ttk.Frame):
         assert self._plan is not None
         assert self._script
 
-        stdout_lines: list[str] = []
-        stderr_lines: list[str] = []
+        output = RunOutput()
 
         def on_out(line: str) -> None:
-            stdout_lines.append(line)
-            self.after(0, lambda l=line: self.log.append_line(l))
+            output.write_stdout(line)
+            self.log.post_line(line)
 
         def on_err(line: str) -> None:
-            stderr_lines.append(line)
-            self.after(0, lambda l=line: self.log.append_line("STDERR: " + l))
+            output.write_stderr(line)
+            self.log.post_line("STDERR: " + line)
 
         try:
-            exit_code = self.app.ssh.exec_bash_script_streaming(self._script, on_stdout=on_out, on_stderr=on_err)
+            try:
+                exit_code = self.app.ssh.exec_bash_script_streaming(self._script, on_stdout=on_out, on_stderr=on_err)
+            finally:
+                output.close()
+            profile = self.app.settings.get_active_profile()
             append_journal(
                 {
                     "tab": "hardlinks",
                     "plan_title": self._plan.title,
-                    "host": self.app.settings.get_active_profile().host,
-                    "username": self.app.settings.get_active_profile().username,
+                    "host": profile.host,
+                    "username": profile.username,
                     "dry_run": bool(self.dry_run.get()),
                     "sidecar_policy": self.sidecar_policy.get(),
                     "no_overwrite": bool(self.app.settings.no_overwrite),
@@ -400,23 +403,13 @@ class HardlinksTab(ttk.Frame):
                     "ops": ops_to_journal_dicts(self._plan.selected_operations()),
                     "script": self._script,
                     "exit_code": exit_code,
-                    "stdout": "\n".join(stdout_lines),
-                    "stderr": "\n".join(stderr_lines),
+                    **output.record_fields(),
                 }
             )
 
             # Keep the local analysis index in sync after a successful REAL run.
             if exit_code == 0 and (not bool(self.dry_run.get())):
-                try:
-                    stats = apply_plan_to_index(self._plan)
-                    self.after(
-                        0,
-                        lambda s=stats: self.log.append_line(
-                            f"[local] analysis index updated: +{s.inserted} -{s.deleted} prefixUpdates={s.updated_prefix}"
-                        ),
-                    )
-                except Exception as exc:  # noqa: BLE001
-                    self.after(0, lambda: self.log.append_line(f"[local] index update WARNING: {exc}"))
-            self.after(0, lambda: self.log.append_line(f"[local] exit={exit_code} (journal written)"))
+                submit_plan_to_index(self._plan).add_done_callback(log_index_result(self.log.post_line))
+            self.log.post_line(f"[local] exit={exit_code} (journal written)")
         except Exception as exc:  # noqa: BLE001
-            self.after(0, lambda: self.log.append_line(f"[local] ERROR: {exc}"))
+            self.log.post_line(f"[local] ERROR: {exc}")
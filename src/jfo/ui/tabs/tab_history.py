@@ -10,8 +10,8 @@ from typing import Any, Dict, List, Optional
 from jfo.core.history import ops_from_journal, build_undo_plan, ops_to_journal_dicts
 from jfo.core.plan import Plan
 from jfo.core.scriptgen import ScriptOptions, generate_bash_script
-from jfo.infra.journal import append_journal, journal_path
-from jfo.infra.index_update import apply_plan_to_index
+from jfo.infra.journal import RunOutput, append_journal, journal_path, read_run_output
+from jfo.infra.index_update import log_index_result, submit_plan_to_index
 from jfo.ui.dialogs import ask_text_confirm, ask_execute_with_dry_run
 from jfo.ui.widgets import ReadonlyText, LogText, PlanTable
 
@@ -214,8 +214,8 @@ class HistoryTab(ttk.Frame):
         self.meta_var.set(f"{ts} | {tab} | {user}@{host} | {'DRY' if dry else 'REAL'} | exit={exit_code} | ops={ops_sel}")
 
         self.script_txt.set_text(str(rec.get("script") or ""))
-        self.stdout_txt.set_text(str(rec.get("stdout") or ""))
-        self.stderr_txt.set_text(str(rec.get("stderr") or ""))
+        self.stdout_txt.set_text(read_run_output(rec, "stdout"))
+        self.stderr_txt.set_text(read_run_output(rec, "stderr"))
 
         self._clear_undo()
 
@@ -273,7 +273,7 @@ class HistoryTab(ttk.Frame):
             return
 
         self._undo_plan = plan
-        self.undo_table.bind_operations(plan.operations, row_getter=lambda op: (op.kind.value, op.src or "", op.dst or ""))
+        self.undo_table.bind_operations(plan.operations, row_getter=lambda op: (op.kind.value, op.src or "", op.dst or ""), plan=plan)
         self._regen_undo_script()
 
         self.log.append_line(f"[local] Undo plan ready: {plan.count_selected()} ops selected")
@@ -354,22 +354,25 @@ class HistoryTab(ttk.Frame):
         assert self._undo_plan is not None
         assert self._undo_script
 
-        stdout_lines: list[str] = []
-        stderr_lines: list[str] = []
+        output = RunOutput()
 
         def on_out(line: str) -> None:
-            stdout_lines.append(line)
-            self.after(0, lambda l=line: self.log.append_line(l))
+            output.write_stdout(line)
+            self.log.post_line(line)
 
         def on_err(line: str) -> None:
-            stderr_lines.append(line)
-            self.after(0, lambda l=line: self.log.append_line("STDERR: " + l))
+            output.write_stderr(line)
+            self.log.post_line("STDERR: " + line)
 
         try:
-            exit_code = self.app.ssh.exec_bash_script_streaming(self._undo_script, on_stdout=on_out, on_stderr=on_err)
+            try:
+                exit_code = self.app.ssh.exec_bash_script_streaming(self._undo_script, on_stdout=on_out, on_stderr=on_err)
+            finally:
+                output.close()
 
             # Journal entry for undo
             rec = self._selected_record or {}
+            profile = self.app.settings.get_active_profile()
             append_journal(
                 {
                     "tab": "history_undo",
@@ -380,8 +383,8 @@ class HistoryTab(ttk.Frame):
                         "host": rec.get("host"),
                         "username": rec.get("username"),
                     },
-                    "host": self.app.settings.get_active_profile().host,
-                    "username": self.app.settings.get_active_profile().username,
+                    "host": profile.host,
+                    "username": profile.username,
                     "dry_run": bool(self.undo_dry_run.get()),
                     "no_overwrite": bool(self.app.settings.no_overwrite),
                     "ops_total": len(self._undo_plan.operations),
@@ -389,24 +392,14 @@ class HistoryTab(ttk.Frame):
                     "ops": ops_to_journal_dicts(self._undo_plan.selected_operations()),
                     "script": self._undo_script,
                     "exit_code": exit_code,
-                    "stdout": "\n".join(stdout_lines),
-                    "stderr": "\n".join(stderr_lines),
+                    **output.record_fields(),
                 }
             )
 
             # Update analysis index after successful REAL undo.
             if exit_code == 0 and (not bool(self.undo_dry_run.get())):
-                try:
-                    stats = apply_plan_to_index(self._undo_plan)
-                    self.after(
-                        0,
-                        lambda s=stats: self.log.append_line(
-                            f"[local] analysis index updated: +{s.inserted} -{s.deleted} prefixUpdates={s.updated_prefix}"
-                        ),
-                    )
-                except Exception as exc:  # noqa: BLE001
-                    self.after(0, lambda: self.log.append_line(f"[local] index update WARNING: {exc}"))
-
-            self.after(0, lambda: self.log.append_line(f"[local] exit={exit_code} (journal written)"))
+                submit_plan_to_index(self._undo_plan).add_done_callback(log_index_result(self.log.post_line))
+
+            self.log.post_line(f"[local] exit={exit_code} (journal written)")
         except Exception as exc:  # noqa: BLE001
-            self.after(0, lambda: self.log.append_line(f"[local] ERROR: {exc}"))
+            self.log.post_line(f"[local] ERROR: {exc}")
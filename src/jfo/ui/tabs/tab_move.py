@@ -1,20 +1,23 @@
 from __future__ import annotations
 
-from pathlib import PurePosixPath
+from dataclasses import replace
 import threading
 import tkinter as tk
 from tkinter import ttk, messagebox
 
 from jfo.core.operations import Operation, OperationKind
 from jfo.core.plan import Plan
-from jfo.core.history import ops_to_journal_dicts
-from jfo.core.scriptgen import ScriptOptions, generate_bash_script
-from jfo.core.validators import Sandbox, SandboxViolation
-from jfo.infra.journal import append_journal
-from jfo.infra.index_update import apply_plan_to_index
+from jfo.core.history import journal_dicts_selected
+from jfo.core.scriptgen import ANNOTATE_OPS_MAX, ScriptOptions, generate_bash_script, with_dry_run
+from jfo.core.validators import SandboxViolation
+from jfo.infra.journal import RunOutput, append_journal
+from jfo.infra.index_update import log_index_result, submit_plan_to_index
 from jfo.infra.sqlite_index import files_under_dir_recursive
 from jfo.ui.dialogs import ask_text_confirm, pick_remote_directory, ask_execute_with_dry_run
-from jfo.ui.widgets import LabeledEntry, ReadonlyText, LogText, PlanTable
+from jfo.ui.widgets import LabeledEntry, ReadonlyText, LogText, VirtualPlanTable
+
+# Trailing delay before row toggles regenerate the script; bursts collapse into one run.
+_REGEN_DELAY_MS = 150
 
 
 class MoveTab(ttk.Frame):
@@ -23,6 +26,9 @@ class MoveTab(ttk.Frame):
         self.app = app
         self._plan: Plan | None = None
         self._script: str = ""
+        self._script_cache_key: tuple | None = None
+        self._script_gen_seq = 0
+        self._regen_after_id: str | None = None
 
         in_frm = ttk.LabelFrame(self, text="Massives Verschieben")
         in_frm.pack(fill=tk.X, padx=10, pady=10)
@@ -58,7 +64,8 @@ class MoveTab(ttk.Frame):
 
         prev_frm = ttk.LabelFrame(self, text="Preview (Doppelklick toggelt Sel)")
         prev_frm.pack(fill=tk.BOTH, expand=True, padx=10, pady=(0, 10))
-        self.table = PlanTable(prev_frm, columns=["Type", "Source", "Dest"], on_toggle=self._regen_script)
+        # Move plans can hold tens of thousands of ops; only visible rows become Tk items.
+        self.table = VirtualPlanTable(prev_frm, columns=["Type", "Source", "Dest"], height=10, on_toggle=self._on_table_toggle)
         self.table.pack(fill=tk.BOTH, expand=True)
 
         out_frm = ttk.LabelFrame(self, text="Generiertes Script")
@@ -113,7 +120,7 @@ class MoveTab(ttk.Frame):
             messagebox.showwarning("Eingabe", "Quelle und Ziel müssen gesetzt sein.", parent=self)
             return
 
-        sandbox = Sandbox(self.app.settings.allowed_roots)
+        sandbox = self.app.sandbox
         try:
             sandbox.assert_path_allowed(src)
             sandbox.assert_path_allowed(dst)
@@ -127,46 +134,116 @@ class MoveTab(ttk.Frame):
 
     def _worker_build_plan(self, src: str, dst: str) -> None:
         # Use analysis index to expand the move set.
-        exts = set([e.lower().lstrip(".") for e in (self.app.settings.video_exts + self.app.settings.sidecar_exts)])
+        exts = self.app.settings.media_ext_set
         paths = files_under_dir_recursive(src, exts=exts, limit=50000)
         if not paths:
             self.after(0, lambda: messagebox.showinfo("Scan/Index", "Keine Dateien im Analyse-Index gefunden. Bitte zuerst Tab 'Scan / Index' ausführen.", parent=self))
             return
 
-        ops: list[Operation] = []
         src_prefix = src.rstrip("/")
         dst_prefix = dst.rstrip("/")
 
-        for p in paths:
-            if not p.startswith(src_prefix + "/"):
-                continue
-            rel = p[len(src_prefix) + 1 :]
-            dest = str(PurePosixPath(dst_prefix) / PurePosixPath(rel))
-            ops.append(Operation(kind=OperationKind.MOVE, src=p, dst=dest))
+        # The index query already scopes rows to `src_prefix/`.
+        cut = len(src_prefix) + 1
+        move = OperationKind.MOVE
+        ops = [Operation(move, p, f"{dst_prefix}/{p[cut:]}") for p in paths]
 
         plan = Plan(title="Move")
         plan.extend(ops)
         plan.apply_collision_warnings()
+        journal_dicts_selected(plan)  # warm the cache off the Tk thread
 
         def _apply() -> None:
             self._plan = plan
-            self.table.bind_operations(plan.operations, row_getter=lambda op: (op.kind.value, op.src or "", op.dst or ""))
+            self.table.bind_operations(plan.operations, row_getter=lambda op: (op.kind.value, op.src or "", op.dst or ""), plan=plan)
             self._regen_script()
             self.log.append_line(f"[local] Plan ready: {plan.count_selected()} ops selected (from analysis index)")
 
         self.after(0, _apply)
 
+    def _on_table_toggle(self) -> None:
+        # PlanTable already bumped plan.revision via Plan.set_selected().
+        if self._regen_after_id is not None:
+            self.after_cancel(self._regen_after_id)
+        self._regen_after_id = self.after(_REGEN_DELAY_MS, self._regen_script)
+
+    def _script_key_and_options(self) -> tuple[tuple, ScriptOptions]:
+        assert self._plan is not None
+        dry_run = bool(self.dry_run.get())
+        no_overwrite = bool(self.app.settings.no_overwrite)
+        on_exists = "skip" if self.skip_existing.get() else "error"
+        key = (self._plan.uid, self._plan.revision, dry_run, no_overwrite, on_exists, tuple(self.app.settings.allowed_roots))
+        opts = ScriptOptions(
+            allowed_roots=list(self.app.settings.allowed_roots),
+            dry_run=dry_run,
+            no_overwrite=no_overwrite,
+            annotate_ops=self._plan.count_selected() <= ANNOTATE_OPS_MAX,
+            on_exists=on_exists,
+        )
+        return key, opts
+
+    def _plan_snapshot(self) -> Plan:
+        """Detached copy of the selected ops, safe to hand to a worker thread."""
+        assert self._plan is not None
+        return Plan(
+            title=self._plan.title,
+            operations=[replace(op) for op in self._plan.operations if op.selected],
+            warnings=list(self._plan.warnings),
+        )
+
     def _regen_script(self) -> None:
+        """Regenerate the script in the background (Tk callbacks stay responsive)."""
+        if self._regen_after_id is not None:
+            self.after_cancel(self._regen_after_id)
+            self._regen_after_id = None
         if not self._plan:
             return
-        opts = ScriptOptions(
-            allowed_roots=self.app.settings.allowed_roots,
-            dry_run=bool(self.dry_run.get()),
-            no_overwrite=bool(self.app.settings.no_overwrite),
-            on_exists=("skip" if self.skip_existing.get() else "error"),
+        key, opts = self._script_key_and_options()
+        if key == self._script_cache_key or self._reuse_for_dry_run_flip(key):
+            return
+        self._script_gen_seq += 1
+        t = threading.Thread(
+            target=self._worker_regen,
+            args=(self._script_gen_seq, key, self._plan_snapshot(), opts),
+            daemon=True,
         )
-        self._script = generate_bash_script(self._plan, options=opts)
-        self.out.set_text(self._script)
+        t.start()
+
+    def _worker_regen(self, seq: int, key: tuple, plan: Plan, opts: ScriptOptions) -> None:
+        try:
+            text = generate_bash_script(plan, options=opts)
+        except Exception as exc:  # noqa: BLE001
+            self.log.post_line(f"[local] ERROR generating script: {exc}")
+            return
+        self.after(0, lambda: self._apply_script(seq, key, text))
+
+    def _apply_script(self, seq: int, key: tuple, text: str) -> None:
+        # Drop results that were overtaken by a newer regeneration request.
+        if seq != self._script_gen_seq:
+            return
+        self._script = text
+        self._script_cache_key = key
+        self.out.set_text(text)
+
+    def _ensure_script_current(self) -> None:
+        """Synchronously regenerate if the shown script does not match the current inputs."""
+        if not self._plan:
+            return
+        key, opts = self._script_key_and_options()
+        if key == self._script_cache_key or self._reuse_for_dry_run_flip(key):
+            return
+        self._script_gen_seq += 1
+        self._apply_script(self._script_gen_seq, key, generate_bash_script(self._plan, options=opts))
+
+    def _reuse_for_dry_run_flip(self, key: tuple) -> bool:
+        """Flip DRY_RUN in the shown script if that is the only input that changed."""
+        cached = self._script_cache_key
+        # key[2] is the dry-run flag (see _script_key_and_options).
+        if cached is None or cached[:2] + cached[3:] != key[:2] + key[3:]:
+            return False
+        self._script_gen_seq += 1
+        self._apply_script(self._script_gen_seq, key, with_dry_run(self._script, key[2]))
+        return True
 
     def _execute(self) -> None:
         if not self._plan:
@@ -203,6 +280,13 @@ class MoveTab(ttk.Frame):
                 self.log.append_line("[local] cancelled by mass-confirm")
                 return
 
+        # A background regeneration may still be pending; never execute a stale script.
+        try:
+            self._ensure_script_current()
+        except Exception as exc:  # noqa: BLE001
+            messagebox.showerror("Script", str(exc), parent=self)
+            return
+
         self.log.append_line("[local] executing script...")
         t = threading.Thread(target=self._worker_exec, daemon=True)
         t.start()
@@ -211,50 +295,43 @@ class MoveTab(ttk.Frame):
         assert self._plan is not None
         assert self._script
 
-        stdout_lines: list[str] = []
-        stderr_lines: list[str] = []
+        output = RunOutput()
 
         def on_out(line: str) -> None:
-            stdout_lines.append(line)
-            self.after(0, lambda l=line: self.log.append_line(l))
+            output.write_stdout(line)
+            self.log.post_line(line)
 
         def on_err(line: str) -> None:
-            stderr_lines.append(line)
-            self.after(0, lambda l=line: self.log.append_line("STDERR: " + l))
+            output.write_stderr(line)
+            self.log.post_line("STDERR: " + line)
 
         try:
-            exit_code = self.app.ssh.exec_bash_script_streaming(self._script, on_stdout=on_out, on_stderr=on_err)
+            try:
+                exit_code = self.app.ssh.exec_bash_script_streaming(self._script, on_stdout=on_out, on_stderr=on_err)
+            finally:
+                output.close()
+            profile = self.app.settings.get_active_profile()
             append_journal(
                 {
                     "tab": "move",
                     "plan_title": self._plan.title,
-                    "host": self.app.settings.get_active_profile().host,
-                    "username": self.app.settings.get_active_profile().username,
+                    "host": profile.host,
+                    "username": profile.username,
                     "dry_run": bool(self.dry_run.get()),
                     "skip_existing": bool(self.skip_existing.get()),
                     "no_overwrite": bool(self.app.settings.no_overwrite),
                     "ops_total": len(self._plan.operations),
                     "ops_selected": self._plan.count_selected(),
-                    "ops": ops_to_journal_dicts(self._plan.selected_operations()),
+                    "ops": journal_dicts_selected(self._plan),
                     "script": self._script,
                     "exit_code": exit_code,
-                    "stdout": "\n".join(stdout_lines),
-                    "stderr": "\n".join(stderr_lines),
+                    **output.record_fields(),
                 }
             )
 
             # Keep the local analysis index in sync after a successful REAL run.
             if exit_code == 0 and (not bool(self.dry_run.get())):
-                try:
-                    stats = apply_plan_to_index(self._plan)
-                    self.after(
-                        0,
-                        lambda s=stats: self.log.append_line(
-                            f"[local] analysis index updated: +{s.inserted} -{s.deleted} prefixUpdates={s.updated_prefix}"
-                        ),
-                    )
-                except Exception as exc:  # noqa: BLE001
-                    self.after(0, lambda: self.log.append_line(f"[local] index update WARNING: {exc}"))
-            self.after(0, lambda: self.log.append_line(f"[local] exit={exit_code} (journal written)"))
+                submit_plan_to_index(self._plan).add_done_callback(log_index_result(self.log.post_line))
+            self.log.post_line(f"[local] exit={exit_code} (journal written)")
         except Exception as exc:  # noqa: BLE001
-            self.after(0, lambda: self.log.append_line(f"[local] ERROR: {exc}"))
+            self.log.post_line(f"[local] ERROR: {exc}")
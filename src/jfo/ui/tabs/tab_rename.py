@@ -1,27 +1,30 @@
 from __future__ import annotations
 
+import functools
 import re
+import string
 from dataclasses import dataclass
-from pathlib import PurePosixPath
 import threading
 import tkinter as tk
 from tkinter import ttk, messagebox, simpledialog
+from typing import Callable
 
 from jfo.core.media_grouping import (
     MediaGroup,
     group_media_files,
-    FOLDER_LEVEL_SIDECAR_NAMES,
-    FOLDER_LEVEL_NFO_NAMES,
+    FOLDER_LEVEL_DISPATCH,
 )
-from jfo.core.nfo import parse_nfo
+from jfo.core.nfo import NfoInfo, parse_nfo, parse_nfo_bytes
 from jfo.core.quoting import bash_quote
 from jfo.core.operations import Operation, OperationKind
+from jfo.core.pathutil import is_plain_name, posix_join, posix_name, posix_parent
 from jfo.core.plan import Plan
 from jfo.core.history import ops_to_journal_dicts
 from jfo.core.scriptgen import ScriptOptions, generate_bash_script
-from jfo.core.validators import Sandbox, SandboxViolation
-from jfo.infra.journal import append_journal
-from jfo.infra.index_update import apply_plan_to_index
+from jfo.core.validators import SandboxViolation
+from jfo.infra.journal import RunOutput, append_journal
+from jfo.infra.index_update import log_index_result, submit_plan_to_index
+from jfo.infra.remote_fs import read_files
 from jfo.infra.sqlite_index import (
     distinct_roots,
     search_files_for_root,
@@ -36,27 +39,74 @@ from jfo.ui.widgets import LabeledEntry, LabeledCombobox, ReadonlyText, LogText,
 
 
 _IMDB_RE = re.compile(r"tt\d{3,10}")
+_YEAR_ANY_RE = re.compile(r"\d{4}")
+_YEAR_STRICT_RE = re.compile(r"(19\d{2}|20\d{2})")
+# Trailing delay before row toggles regenerate the script; bursts collapse into one run.
+_REGEN_DELAY_MS = 150
+_SEP_RE = re.compile(r"[\\/]")
+_WS_RE = re.compile(r"\s+")
+# str.translate table dropping C0 control characters and DEL.
+_CTRL_TBL = dict.fromkeys([*range(0x20), 0x7F])
 
 
 def _sanitize_title(value: str) -> str:
-    value = value.strip()
-    # Replace problematic path separators
-    value = value.replace("/", "-").replace("\\\\", "-")
-    # Control characters
-    value = "".join(ch for ch in value if ch >= " " and ch != "\x7f")
-    # Collapse whitespace
-    value = re.sub(r"\s+", " ", value)
-    # Remove trailing dots/spaces (Windows-compat)
-    value = value.rstrip(" .")
-    return value
-
-
-@dataclass
+    # Replace problematic path separators, then drop control characters
+    value = _SEP_RE.sub("-", value.strip()).translate(_CTRL_TBL)
+    # Collapse whitespace and remove trailing dots/spaces (Windows-compat)
+    return _WS_RE.sub(" ", value).rstrip(" .")
+
+
+def _sftp_read_bytes(sftp, path: str) -> bytes:  # noqa: ANN001
+    """Read a whole remote file; prefetch() pipelines the SFTP read requests."""
+    with sftp.file(path, "rb") as f:
+        f.prefetch()
+        return f.read()
+
+
+_TEMPLATE_FIELDS = ("title", "year", "imdbid")
+
+
+@functools.lru_cache(maxsize=8)
+def _compile_template(tpl: str) -> Callable[[str, int, str], str]:
+    """Return fmt(title, year, imdbid) -> sanitized stem, parsed once.
+
+    Equivalent to _sanitize_title(tpl.format(...)) for a sanitized title and a
+    valid imdbid. Plain "{title}"-style fields become a list of pieces with the
+    literals sanitized up front; any format spec, conversion or unknown field
+    falls back to str.format plus a full sanitize per call.
+    """
+
+    try:
+        parts = list(string.Formatter().parse(tpl))
+    except ValueError:
+        parts = None
+    if parts is None or any(
+        field is not None and (field not in _TEMPLATE_FIELDS or spec or conv) for _lit, field, spec, conv in parts
+    ):
+        return lambda title, year, imdbid: _sanitize_title(tpl.format(title=title, year=year, imdbid=imdbid))
+
+    # Field values contain no separators, control characters or runs of
+    # whitespace, so sanitizing the literals leaves only the outer strip.
+    pieces = [
+        (_WS_RE.sub(" ", _SEP_RE.sub("-", lit).translate(_CTRL_TBL)), _TEMPLATE_FIELDS.index(field) if field is not None else -1)
+        for lit, field, _spec, _conv in parts
+    ]
+
+    def fmt(title: str, year: int, imdbid: str) -> str:
+        values = (title, str(year), imdbid)
+        return "".join(lit + values[i] if i >= 0 else lit for lit, i in pieces).strip().rstrip(" .")
+
+    return fmt
+
+
+@dataclass(slots=True)
 class GroupVM:
     group: MediaGroup
     selected: bool = True
     proposed: str = ""
     warning: str = ""
+    # len(group.all_files()); fixed for the lifetime of a load.
+    file_count: int = 0
 
     def video_path(self) -> str:
         return self.group.video.path if self.group.video else ""
@@ -65,7 +115,15 @@ class GroupVM:
         return self.group.nfo.path if self.group.nfo else ""
 
 
-@dataclass
+def _group_row(vm: GroupVM) -> tuple[str, ...]:
+    return (vm.video_path(), vm.nfo_path(), str(vm.file_count), vm.proposed, vm.warning)
+
+
+def _group_key(vm: GroupVM) -> str:
+    return vm.video_path() or vm.nfo_path()
+
+
+@dataclass(frozen=True, slots=True)
 class IndexHitVM:
     path: str
     dir: str
@@ -85,6 +143,8 @@ class RenameTab(ttk.Frame):
         self._groups: list[GroupVM] = []
         self._plan: Plan | None = None
         self._script: str = ""
+        self._script_cache_key: tuple | None = None
+        self._regen_after_id: str | None = None
 
         in_frm = ttk.LabelFrame(self, text="Umbenennen (Jellyfin/Kodi-kompatibel)")
         in_frm.pack(fill=tk.X, padx=10, pady=10)
@@ -118,6 +178,7 @@ class RenameTab(ttk.Frame):
         hit_ysb.pack(side=tk.RIGHT, fill=tk.Y)
 
         self._hits: list[IndexHitVM] = []
+        self._search_seq = 0
 
         # Remote folder + browse button (prevents path typos)
         folder_row = ttk.Frame(in_frm)
@@ -149,6 +210,9 @@ class RenameTab(ttk.Frame):
         self.manual_title.pack(side=tk.LEFT, padx=(0, 10), fill=tk.X, expand=True)
         self.manual_year.pack(side=tk.LEFT, padx=(0, 10))
         self.manual_imdb.pack(side=tk.LEFT)
+        # Manual mode: leave blank fields to the prompts instead of reading the NFO.
+        self.skip_nfo_fallback = tk.BooleanVar(value=False)
+        ttk.Checkbutton(man_frm, text="NFO ignorieren", variable=self.skip_nfo_fallback).pack(side=tk.LEFT, padx=(10, 0))
 
         opt_frm = ttk.Frame(in_frm)
         opt_frm.pack(fill=tk.X, pady=(6, 2))
@@ -176,7 +240,7 @@ class RenameTab(ttk.Frame):
         # Plan list
         plan_frm = ttk.LabelFrame(self, text="Plan (Alt → Neu) (Doppelklick toggelt Sel)")
         plan_frm.pack(fill=tk.X, expand=False, padx=10, pady=(0, 10))
-        self.plan_table = PlanTable(plan_frm, columns=["Type", "Source", "Dest", "Warn"], on_toggle=self._regen_script)
+        self.plan_table = PlanTable(plan_frm, columns=["Type", "Source", "Dest", "Warn"], on_toggle=self._on_table_toggle)
         self.plan_table.tree.configure(height=8)
         self.plan_table.pack(fill=tk.BOTH, expand=True)
 
@@ -257,19 +321,37 @@ class RenameTab(ttk.Frame):
             return
 
         root = self._current_root_filter()
-        video_exts = self.app.settings.video_exts
+        video_exts = self.app.settings.video_ext_set
 
-        if root:
-            rows = search_files_for_root(root, term, exts=video_exts, limit=200)
-            hits = [IndexHitVM(path=r[0], dir=r[1], name=r[2], ext=r[3], root=root) for r in rows]
-        else:
-            rows = search_files_any_root(term, exts=video_exts, limit=200)
-            hits = [IndexHitVM(path=r[0], dir=r[1], name=r[2], ext=r[3], root=r[4]) for r in rows]
+        self._search_seq += 1
+        t = threading.Thread(target=self._worker_search_index, args=(self._search_seq, term, root, video_exts), daemon=True)
+        t.start()
+
+    def _worker_search_index(self, seq: int, term: str, root: str, video_exts: frozenset[str]) -> None:
+        # Rows are (path, dir, name, ext[, root]) - IndexHitVM's field order.
+        hit = IndexHitVM
+        try:
+            if root:
+                rows = search_files_for_root(root, term, exts=video_exts, limit=200)
+                hits = [hit(*r, root) for r in rows]
+            else:
+                rows = search_files_any_root(term, exts=video_exts, limit=200)
+                hits = [hit(*r) for r in rows]
+        except Exception as exc:  # noqa: BLE001
+            self.log.post_line(f"[local] index search ERROR: {exc}")
+            return
+        self.after(0, lambda: self._apply_hits(seq, term, hits))
 
+    def _apply_hits(self, seq: int, term: str, hits: list[IndexHitVM]) -> None:
+        # A newer search was started meanwhile; its results win.
+        if seq != self._search_seq:
+            return
         self._hits = hits
         self.hit_list.delete(0, tk.END)
-        for h in hits:
-            self.hit_list.insert(tk.END, f"[{h.root}] {h.name}  ({h.ext})  —  {h.path}")
+        # Listbox.insert is variadic: one Tcl call for all hits.
+        labels = [f"[{h.root}] {h.name}  ({h.ext})  —  {h.path}" for h in hits]
+        if labels:
+            self.hit_list.insert(tk.END, *labels)
 
         self.log.append_line(f"[local] index search '{term}' -> {len(hits)} hits")
 
@@ -322,22 +404,16 @@ class RenameTab(ttk.Frame):
 
             sftp = None
             try:
-                sftp = self.app.ssh.open_sftp()
+                sftp = self.app.ssh.get_sftp()
             except Exception:
                 sftp = None
 
             if sftp is not None:
                 try:
-                    with sftp.file(nfo_path, "r") as f:
-                        xml_text = f.read().decode("utf-8", errors="replace")
+                    xml_text = _sftp_read_bytes(sftp, nfo_path).decode("utf-8", errors="replace")
                 except Exception:
                     # Fallback below
                     xml_text = ""
-                finally:
-                    try:
-                        sftp.close()
-                    except Exception:
-                        pass
 
             if not xml_text:
                 # Fallback via shell (works even when SFTP is chrooted)
@@ -361,7 +437,7 @@ class RenameTab(ttk.Frame):
 
             self.after(0, _apply)
         except Exception as exc:  # noqa: BLE001
-            self.after(0, lambda: self.log.append_line(f"[local] NFO prefill ERROR: {exc}"))
+            self.log.post_line(f"[local] NFO prefill ERROR: {exc}")
 
     def _load_groups(self, *, focus_video_path: str | None = None) -> None:
         """Load groups from the analysis index.
@@ -375,7 +451,7 @@ class RenameTab(ttk.Frame):
             messagebox.showwarning("Eingabe", "Ordner fehlt.", parent=self)
             return
 
-        sandbox = Sandbox(self.app.settings.allowed_roots)
+        sandbox = self.app.sandbox
         try:
             sandbox.assert_path_allowed(folder)
         except SandboxViolation as exc:
@@ -402,7 +478,7 @@ class RenameTab(ttk.Frame):
         recursive: bool,
         focus_video_path: str | None,
     ) -> None:
-        exts = set([e.lower().lstrip(".") for e in (self.app.settings.video_exts + self.app.settings.sidecar_exts)])
+        exts = self.app.settings.media_ext_set
 
         # Pull paths from the local analysis index.
         paths: list[str] = []
@@ -431,10 +507,10 @@ class RenameTab(ttk.Frame):
 
         groups = group_media_files(
             paths,
-            video_exts=set(self.app.settings.video_exts),
-            sidecar_exts=set(self.app.settings.sidecar_exts),
+            video_exts=self.app.settings.video_ext_set,
+            sidecar_exts=self.app.settings.sidecar_ext_set,
         )
-        vms = [GroupVM(group=g) for g in groups]
+        vms = [GroupVM(group=g, file_count=len(g.all_files())) for g in groups]
 
         # Safe defaults:
         # - If we have a focus path, select only that.
@@ -457,23 +533,17 @@ class RenameTab(ttk.Frame):
                 try:
                     sftp = None
                     try:
-                        sftp = self.app.ssh.open_sftp()
+                        sftp = self.app.ssh.get_sftp()
                     except Exception:
                         sftp = None
 
                     xml_text = ""
                     if sftp is not None:
                         try:
-                            with sftp.file(sel_vm.group.nfo.path, "r") as f:
-                                xml_text = f.read().decode("utf-8", errors="replace")
+                            xml_text = _sftp_read_bytes(sftp, sel_vm.group.nfo.path).decode("utf-8", errors="replace")
                         except Exception:
                             # Fall back to shell below
                             xml_text = ""
-                        finally:
-                            try:
-                                sftp.close()
-                            except Exception:
-                                pass
 
                     if not xml_text:
                         res = self.app.ssh.exec_command(f"cat -- {bash_quote(sel_vm.group.nfo.path)}")
@@ -489,16 +559,7 @@ class RenameTab(ttk.Frame):
 
         def _apply() -> None:
             self._groups = vms
-            self.group_table.bind_operations(
-                self._groups,
-                row_getter=lambda vm: (
-                    vm.video_path(),
-                    vm.nfo_path(),
-                    str(len(vm.group.all_files())),
-                    vm.proposed,
-                    vm.warning,
-                ),
-            )
+            self.group_table.update_operations(self._groups, row_getter=_group_row, key_fn=_group_key)
             self.log.append_line(f"[local] loaded {len(self._groups)} groups")
 
             if prefill_err:
@@ -524,11 +585,12 @@ class RenameTab(ttk.Frame):
             return
 
         mode = self.mode.get()
-        sandbox = Sandbox(self.app.settings.allowed_roots)
+        sandbox = self.app.sandbox
 
         manual_title = _sanitize_title(self.manual_title.get())
         manual_year = self.manual_year.get().strip()
         manual_imdb = self.manual_imdb.get().strip()
+        skip_nfo = bool(self.skip_nfo_fallback.get())
 
         selected_groups = [vm for vm in self._groups if vm.selected and vm.group.video]
 
@@ -567,26 +629,70 @@ class RenameTab(ttk.Frame):
         # SFTP is much faster than cat per file.
         sftp = None
         try:
-            sftp = self.app.ssh.open_sftp()
+            sftp = self.app.ssh.get_sftp()
         except Exception:
             sftp = None
 
-        def _read_nfo_text(nfo_path: str) -> str:
-            """Read an .nfo file (prefer SFTP for speed, fall back to cat)."""
+        prefetched: dict[str, bytes] = {}
+
+        def _read_nfo_info(nfo_path: str) -> NfoInfo:
+            """Read and parse an .nfo file (prefer SFTP for speed, fall back to cat)."""
+            data = prefetched.get(nfo_path)
+            if data is not None:
+                return parse_nfo_bytes(data)
             # IMPORTANT: On some NAS devices the SFTP subsystem is restricted (chroot)
             # even though the interactive shell can access absolute /volume paths.
             # Therefore we must *always* fall back to a shell `cat` if SFTP open fails.
             if sftp is not None:
                 try:
-                    with sftp.file(nfo_path, "r") as f:
-                        return f.read().decode("utf-8", errors="replace")
+                    data = _sftp_read_bytes(sftp, nfo_path)
                 except Exception:
                     pass
+                else:
+                    return parse_nfo_bytes(data)
 
             res = self.app.ssh.exec_command(f"cat -- {bash_quote(nfo_path)}")
             if res.exit_status != 0:
                 raise RuntimeError((res.stderr or "cat failed").strip())
-            return res.stdout
+            return parse_nfo(res.stdout)
+
+        # Phase 1: every remote NFO read happens here, before the prompts below
+        # can leave the SSH/SFTP session idle; the loop only looks results up.
+        manual_year_int: int | None = None
+        if manual_year:
+            m = _YEAR_ANY_RE.search(manual_year)
+            manual_year_int = int(m.group(0)) if m else None
+        need_nfo = mode == "nfo" or (
+            not skip_nfo and not (manual_title and manual_year_int is not None and manual_imdb)
+        )
+        nfo_results: dict[str, NfoInfo | Exception] = {}
+
+        def _try_read(nfo_path: str) -> NfoInfo | Exception:
+            try:
+                return _read_nfo_info(nfo_path)
+            except Exception as exc:  # noqa: BLE001
+                return exc
+
+        if need_nfo:
+            paths = list(dict.fromkeys(vm.group.nfo.path for vm in selected_groups if vm.group.nfo))
+            # Fetch all NFOs with one remote call instead of one round trip each;
+            # anything missing from the batch is read per file. The shared SFTP
+            # client is not thread-safe, so those reads stay sequential.
+            if len(paths) > 1:
+                try:
+                    prefetched.update(read_files(self.app.ssh, paths))
+                except Exception:  # noqa: BLE001
+                    pass
+            for p in paths:
+                nfo_results[p] = _try_read(p)
+
+        def _nfo_info(nfo_path: str) -> NfoInfo:
+            res = nfo_results.get(nfo_path)
+            if res is None:
+                res = nfo_results[nfo_path] = _read_nfo_info(nfo_path)
+            if isinstance(res, Exception):
+                raise res
+            return res
 
         def _prompt_imdb_id(title_hint: str | None, year_hint: int | None) -> str | None:
             """Ask user for an IMDb-ID (tt1234567). Returns None on cancel."""
@@ -619,7 +725,7 @@ class RenameTab(ttk.Frame):
                 if val is None:
                     return None
                 val = val.strip()
-                m = re.fullmatch(r"(19\d{2}|20\d{2})", val)
+                m = _YEAR_STRICT_RE.fullmatch(val)
                 if m:
                     return int(m.group(1))
                 messagebox.showwarning("Jahr", "Ungültig. Bitte z.B. 2001 eingeben.", parent=self)
@@ -631,6 +737,15 @@ class RenameTab(ttk.Frame):
             val = _sanitize_title(val)
             return val if val else None
 
+        fmt_stem = _compile_template(self.app.settings.naming_template)
+        rename_folder = bool(self.rename_folder.get())
+        # Local aliases for the per-file loop below (runs once per plan op).
+        rename_kind = OperationKind.RENAME
+        add_op = ops.append
+        assert_allowed = sandbox.assert_path_allowed
+        folder_suffix = FOLDER_LEVEL_DISPATCH.get
+        # Lower-cased folder names; many groups (season packs) share a directory.
+        dir_low_cache: dict[str, str] = {}
         for vm in self._groups:
             if not vm.selected:
                 continue
@@ -649,8 +764,7 @@ class RenameTab(ttk.Frame):
                     warn = "Missing NFO"
                 else:
                     try:
-                        xml_text = _read_nfo_text(g.nfo.path)
-                        info = parse_nfo(xml_text)
+                        info = _nfo_info(g.nfo.path)
                         preferred_title = info.original_title or info.title
                         title = _sanitize_title(preferred_title or "")
                         year = info.year
@@ -677,19 +791,15 @@ class RenameTab(ttk.Frame):
 
             else:
                 title = manual_title or None
-                year = None
-                if manual_year:
-                    try:
-                        year = int(re.findall(r"\d{4}", manual_year)[0])
-                    except Exception:
-                        year = None
+                year = manual_year_int
                 imdbid = manual_imdb or None
 
                 # Best-effort fill from NFO if user didn't provide all fields.
-                if (not title or year is None or not imdbid) and g.nfo:
+                if (not title or year is None or not imdbid) and g.nfo and skip_nfo:
+                    self.log.append_line(f"[local] NFO ignored (manual): {g.nfo.path}")
+                elif (not title or year is None or not imdbid) and g.nfo:
                     try:
-                        xml_text = _read_nfo_text(g.nfo.path)
-                        info = parse_nfo(xml_text)
+                        info = _nfo_info(g.nfo.path)
                         preferred_title = info.original_title or info.title
                         if not title:
                             title = _sanitize_title(preferred_title or "") or None
@@ -722,7 +832,8 @@ class RenameTab(ttk.Frame):
                 if not title or year is None or not imdbid:
                     if not warn:
                         warn = "Missing title/year/imdbid"
-                elif not _IMDB_RE.fullmatch(imdbid):
+                elif imdbid != manual_imdb and not _IMDB_RE.fullmatch(imdbid):
+                    # manual_imdb was already validated above
                     warn = "Invalid imdbid"
 
             if warn:
@@ -731,21 +842,28 @@ class RenameTab(ttk.Frame):
                 continue
 
             assert title and year and imdbid
-            new_stem = self.app.settings.naming_template.format(title=title, year=year, imdbid=imdbid)
-            new_stem = _sanitize_title(new_stem)
+            new_stem = fmt_stem(title, year, imdbid)
             vm.proposed = new_stem
             vm.warning = ""
 
             old_stem = g.video.stem
+            old_stem_len = len(old_stem)
+            stem_prefixes = (old_stem + ".", old_stem + "-")
             dir_path = g.video.dir
+            dir_prefix = posix_join(dir_path, "")
+            # Sidecars share the video's directory: if the sandbox admits every
+            # entry of it, per-file checks reduce to "is this a plain entry of dir_path".
+            dir_ok = sandbox.allows_children_of(dir_path)
 
             # Build rename operations for video + sidecars
             for f in g.all_files():
                 src = f.path
+                name = f.name
                 try:
-                    sandbox.assert_path_allowed(src)
+                    if not (dir_ok and src == dir_prefix + name and is_plain_name(name)):
+                        assert_allowed(src)
                 except SandboxViolation as exc:
-                    ops.append(Operation(kind=OperationKind.RENAME, src=src, dst=src, warning=str(exc), selected=False))
+                    add_op(Operation(kind=rename_kind, src=src, dst=src, warning=str(exc), selected=False))
                     continue
 
                 # Determine suffix part to preserve.
@@ -756,29 +874,23 @@ class RenameTab(ttk.Frame):
                 #  - <stem>-poster.jpg / <stem>-backdrop.jpg / ...
                 #  - folder-level artwork names (poster.jpg, logo.png, ...)
                 #    -> renamed to <new_stem>-poster.jpg etc (only when grouped safely).
-                name = f.name
-                nlow = name.lower()
                 suffix_part = ""
 
                 # 1) Usual stem-based pattern: keep everything after the stem (preserves extension casing).
-                if name.startswith(old_stem) and len(name) > len(old_stem):
-                    rest = name[len(old_stem) :]
-                    if rest.startswith(".") or rest.startswith("-"):
-                        suffix_part = rest
+                if name.startswith(stem_prefixes):
+                    suffix_part = name[old_stem_len:]
 
                 # 2) Folder-level NFO (movie.nfo) -> rename to <new_stem>.nfo
-                if not suffix_part and nlow in FOLDER_LEVEL_NFO_NAMES and nlow.endswith(".nfo"):
-                    suffix_part = ".nfo"
-
-                # 3) Folder-level artwork (poster.jpg, logo.png, ...)
-                if not suffix_part and nlow in FOLDER_LEVEL_SIDECAR_NAMES:
-                    suffix_part = "-" + nlow
+                # 3) Folder-level artwork (poster.jpg, logo.png, ...) -> <new_stem>-poster.jpg
+                # One dict lookup covers both (NFO names win, as in grouping).
+                if not suffix_part:
+                    suffix_part = folder_suffix(name.lower(), "")
 
                 if not suffix_part:
                     # Not a recognized sidecar naming; skip conservatively
-                    ops.append(
+                    add_op(
                         Operation(
-                            kind=OperationKind.RENAME,
+                            kind=rename_kind,
                             src=src,
                             dst=src,
                             warning="Unrecognized sidecar name; skipped",
@@ -788,30 +900,29 @@ class RenameTab(ttk.Frame):
                     continue
 
                 dst_name = new_stem + suffix_part
-                dst = str(PurePosixPath(dir_path) / dst_name)
+                dst = dir_prefix + dst_name
                 try:
-                    sandbox.assert_path_allowed(dst)
+                    if not (dir_ok and is_plain_name(dst_name)):
+                        assert_allowed(dst)
                 except SandboxViolation as exc:
-                    ops.append(Operation(kind=OperationKind.RENAME, src=src, dst=dst, warning=str(exc), selected=False))
+                    add_op(Operation(kind=rename_kind, src=src, dst=dst, warning=str(exc), selected=False))
                     continue
 
-                ops.append(Operation(kind=OperationKind.RENAME, src=src, dst=dst))
+                add_op(Operation(rename_kind, src, dst))
 
             # Optional: rename the containing folder (safe heuristic).
             # Only rename if the folder name equals the old video stem.
-            if self.rename_folder.get():
+            if rename_folder and dir_path not in dir_renames_done:
                 try:
-                    dir_base = PurePosixPath(dir_path).name
-                    dir_low = dir_base.lower()
+                    dir_low = dir_low_cache.get(dir_path)
+                    if dir_low is None:
+                        dir_low = dir_low_cache[dir_path] = posix_name(dir_path).lower()
                     old_low = old_stem.lower()
                     # Safer-but-more-useful heuristic:
                     # - rename if directory name matches the old stem
                     # - OR if one is a prefix of the other (common: folder without " 1", file with " 1")
-                    if (
-                        (dir_low == old_low or old_low.startswith(dir_low) or dir_low.startswith(old_low))
-                        and dir_path not in dir_renames_done
-                    ):
-                        new_dir = str(PurePosixPath(dir_path).parent / new_stem)
+                    if dir_low == old_low or old_low.startswith(dir_low) or dir_low.startswith(old_low):
+                        new_dir = posix_join(posix_parent(dir_path), new_stem)
                         if new_dir != dir_path:
                             try:
                                 sandbox.assert_path_allowed(dir_path)
@@ -833,17 +944,11 @@ class RenameTab(ttk.Frame):
                     # Never fail the whole plan because of folder rename heuristics
                     pass
 
-        if sftp is not None:
-            try:
-                sftp.close()
-            except Exception:
-                pass
-
         # Ensure directory renames happen last.
         ops.extend(dir_ops)
 
-        plan = Plan(title="Rename")
-        plan.extend(ops)
+        # The plan takes the list as is (no second copy of every op reference).
+        plan = Plan(title="Rename", operations=ops)
         plan.apply_collision_warnings()
         self._plan = plan
 
@@ -854,29 +959,49 @@ class RenameTab(ttk.Frame):
                 if vm.selected and vm.warning:
                     reasons.append(vm.warning)
             if reasons:
-                self.log.append_line("[local] Plan has 0 selected ops. Reasons: " + "; ".join(sorted(set(reasons))))
+                self.log.append_line("[local] Plan has 0 selected ops. Reasons: " + "; ".join(dict.fromkeys(reasons)))
             else:
                 self.log.append_line("[local] Plan has 0 selected ops. (No warnings recorded)")
 
-        self.plan_table.bind_operations(plan.operations, row_getter=lambda op: (op.kind.value, op.src or "", op.dst or "", op.warning))
-        self.group_table.bind_operations(
-            self._groups,
-            row_getter=lambda vm: (vm.video_path(), vm.nfo_path(), str(len(vm.group.all_files())), vm.proposed, vm.warning),
-        )
+        self.plan_table.bind_operations(plan.operations, row_getter=lambda op: (op.kind.value, op.src or "", op.dst or "", op.warning), plan=plan)
+        self.group_table.update_operations(self._groups, row_getter=_group_row, key_fn=_group_key)
 
         self._regen_script()
         self.log.append_line(f"[local] Plan ready: {plan.count_selected()} ops selected")
 
+    def _on_table_toggle(self) -> None:
+        # PlanTable already flipped op.selected via Plan.set_selected().
+        if self._regen_after_id is not None:
+            self.after_cancel(self._regen_after_id)
+        self._regen_after_id = self.after(_REGEN_DELAY_MS, self._regen_script)
+
     def _regen_script(self) -> None:
+        if self._regen_after_id is not None:
+            self.after_cancel(self._regen_after_id)
+            self._regen_after_id = None
         if not self._plan:
             return
+        dry_run = bool(self.dry_run.get())
+        no_overwrite = bool(self.app.settings.no_overwrite)
+        # Plan.revision covers selection toggles; skip the regen and the
+        # Text rewrite when nothing that feeds the script changed.
+        key = (self._plan.uid, self._plan.revision, dry_run, no_overwrite, tuple(self.app.settings.allowed_roots))
+        if key == self._script_cache_key:
+            return
+        if self._plan.count_selected() == 0:
+            # Nothing would run; _execute refuses empty plans anyway.
+            self._script = ""
+            self._script_cache_key = key
+            self.out.set_text("")
+            return
         opts = ScriptOptions(
-            allowed_roots=self.app.settings.allowed_roots,
-            dry_run=bool(self.dry_run.get()),
-            no_overwrite=bool(self.app.settings.no_overwrite),
+            allowed_roots=list(self.app.settings.allowed_roots),
+            dry_run=dry_run,
+            no_overwrite=no_overwrite,
             on_exists="error",
         )
         self._script = generate_bash_script(self._plan, options=opts)
+        self._script_cache_key = key
         self.out.set_text(self._script)
 
     def _execute(self) -> None:
@@ -913,6 +1038,10 @@ class RenameTab(ttk.Frame):
                 self.log.append_line("[local] cancelled by mass-confirm")
                 return
 
+        if self._regen_after_id is not None:
+            # A toggle burst is still pending; run with the current selection.
+            self._regen_script()
+
         self.log.append_line("[local] executing script...")
         t = threading.Thread(target=self._worker_exec, daemon=True)
         t.start()
@@ -921,25 +1050,28 @@ class RenameTab(ttk.Frame):
         assert self._plan is not None
         assert self._script
 
-        stdout_lines: list[str] = []
-        stderr_lines: list[str] = []
+        output = RunOutput()
 
         def on_out(line: str) -> None:
-            stdout_lines.append(line)
-            self.after(0, lambda l=line: self.log.append_line(l))
+            output.write_stdout(line)
+            self.log.post_line(line)
 
         def on_err(line: str) -> None:
-            stderr_lines.append(line)
-            self.after(0, lambda l=line: self.log.append_line("STDERR: " + l))
+            output.write_stderr(line)
+            self.log.post_line("STDERR: " + line)
 
         try:
-            exit_code = self.app.ssh.exec_bash_script_streaming(self._script, on_stdout=on_out, on_stderr=on_err)
+            try:
+                exit_code = self.app.ssh.exec_bash_script_streaming(self._script, on_stdout=on_out, on_stderr=on_err)
+            finally:
+                output.close()
+            profile = self.app.settings.get_active_profile()
             append_journal(
                 {
                     "tab": "rename",
                     "plan_title": self._plan.title,
-                    "host": self.app.settings.get_active_profile().host,
-                    "username": self.app.settings.get_active_profile().username,
+                    "host": profile.host,
+                    "username": profile.username,
                     "dry_run": bool(self.dry_run.get()),
                     "no_overwrite": bool(self.app.settings.no_overwrite),
                     "ops_total": len(self._plan.operations),
@@ -947,25 +1079,15 @@ class RenameTab(ttk.Frame):
                     "ops": ops_to_journal_dicts(self._plan.selected_operations()),
                     "script": self._script,
                     "exit_code": exit_code,
-                    "stdout": "\n".join(stdout_lines),
-                    "stderr": "\n".join(stderr_lines),
+                    **output.record_fields(),
                 }
             )
 
             # Keep the local analysis index in sync after a successful REAL run.
             # Without this, subsequent searches still show old paths until the next scan.
             if exit_code == 0 and (not bool(self.dry_run.get())):
-                try:
-                    stats = apply_plan_to_index(self._plan)
-                    self.after(
-                        0,
-                        lambda s=stats: self.log.append_line(
-                            f"[local] analysis index updated: +{s.inserted} -{s.deleted} prefixUpdates={s.updated_prefix}"
-                        ),
-                    )
-                except Exception as exc:  # noqa: BLE001
-                    self.after(0, lambda: self.log.append_line(f"[local] index update WARNING: {exc}"))
+                submit_plan_to_index(self._plan).add_done_callback(log_index_result(self.log.post_line))
 
-            self.after(0, lambda: self.log.append_line(f"[local] exit={exit_code} (journal written)"))
+            self.log.post_line(f"[local] exit={exit_code} (journal written)")
         except Exception as exc:  # noqa: BLE001
-            self.after(0, lambda: self.log.append_line(f"[local] ERROR: {exc}"))
+            self.log.post_line(f"[local] ERROR: {exc}")
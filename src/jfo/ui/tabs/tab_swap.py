@@ -16,38 +16,44 @@ Safety:
 - Enforces sandbox (allowed roots).
 """
 
-import secrets
-from dataclasses import dataclass
-from pathlib import PurePosixPath
+import itertools
+import os
+import time
+from dataclasses import dataclass, field, replace
 import threading
 import tkinter as tk
 from tkinter import ttk, messagebox
+from typing import Iterator
 
-from jfo.core.media_grouping import (
-    group_media_files,
-    FOLDER_LEVEL_SIDECAR_NAMES,
-    FOLDER_LEVEL_NFO_NAMES,
-)
+from jfo.core.media_grouping import group_media_files, MediaGroup, FOLDER_LEVEL_DISPATCH
 from jfo.core.operations import Operation, OperationKind
+from jfo.core.pathutil import posix_join, posix_name, posix_parent
 from jfo.core.plan import Plan
-from jfo.core.scriptgen import ScriptOptions, generate_bash_script
-from jfo.core.validators import Sandbox, SandboxViolation
+from jfo.core.scriptgen import ANNOTATE_OPS_MAX, ScriptOptions, generate_bash_script
+from jfo.core.validators import SandboxViolation
 from jfo.core.quoting import bash_quote
-from jfo.core.history import ops_to_journal_dicts
-from jfo.infra.journal import append_journal
-from jfo.infra.index_update import apply_plan_to_index
-from jfo.infra.sqlite_index import files_in_dir
+from jfo.core.history import journal_dicts_selected
+from jfo.infra.journal import RunOutput, append_journal
+from jfo.infra.index_update import log_index_result, submit_plan_to_index
+from jfo.infra.sqlite_index import files_in_dirs
 from jfo.ui.dialogs import ask_text_confirm, pick_remote_directory, ask_execute_with_dry_run
 from jfo.ui.widgets import LabeledEntry, ReadonlyText, LogText, PlanTable
 
 
-@dataclass
+# Temp folder suffixes only need to be unique next to the swapped folders;
+# pid + a time-seeded counter is enough (the script refuses existing targets).
+_SWAP_TMP_COUNTER = itertools.count(int(time.time()) & 0xFFFF)
+
+
+@dataclass(frozen=True, slots=True)
 class FolderInfo:
     path: str
     name: str
     video_stem: str
     files_count: int
     nfo_path: str | None = None
+    # The single video group found while inspecting; reused to build the rename ops.
+    group: MediaGroup | None = field(default=None, repr=False, compare=False)
 
 
 class SwapTab(ttk.Frame):
@@ -56,6 +62,8 @@ class SwapTab(ttk.Frame):
         self.app = app
         self._plan: Plan | None = None
         self._script: str = ""
+        self._script_cache_key: tuple | None = None
+        self._script_gen_seq = 0
         self._info_a: FolderInfo | None = None
         self._info_b: FolderInfo | None = None
 
@@ -168,17 +176,29 @@ class SwapTab(ttk.Frame):
         Prefer the local analysis index (fast), fall back to remote find.
         """
 
-        # From local analysis index
-        exts = set([e.lower().lstrip(".") for e in (self.app.settings.video_exts + self.app.settings.sidecar_exts)])
-        paths = files_in_dir(dir_path, exts=exts)
-        if paths:
-            return paths
+        return self._list_files_best_effort_many([dir_path])[dir_path]
 
+    def _list_files_best_effort_many(self, dir_paths: list[str]) -> dict[str, list[str]]:
+        """Batched variant: one index query for all folders, remote find only for misses."""
+
+        # From local analysis index
+        exts = self.app.settings.media_ext_set
+        by_dir = files_in_dirs(dir_paths, exts=exts)
+        for d, paths in by_dir.items():
+            if not paths:
+                by_dir[d] = self._find_files_remote(d)
+        return by_dir
+
+    def _find_files_remote(self, dir_path: str) -> list[str]:
         # Fallback: remote find (maxdepth 1)
         if not self.app.ssh.is_connected():
             return []
-        cmd = f"find {bash_quote(dir_path)} -maxdepth 1 -type f -print"
+        # The directory check rides along in the same round trip (exit 3 = missing).
+        q = bash_quote(dir_path)
+        cmd = f"test -d {q} || exit 3; find {q} -maxdepth 1 -type f -print"
         res = self.app.ssh.exec_command(cmd)
+        if res.exit_status == 3:
+            raise RuntimeError(f"Folder not found or not a directory: {dir_path}")
         if res.exit_status != 0:
             raise RuntimeError(res.stderr.strip() or f"find failed (exit {res.exit_status})")
         out: list[str] = []
@@ -203,8 +223,9 @@ class SwapTab(ttk.Frame):
 
     def _worker_load_infos(self, a: str, b: str) -> None:
         try:
-            info_a = self._inspect_folder(a)
-            info_b = self._inspect_folder(b)
+            listing = self._list_files_best_effort_many([a, b])
+            info_a = self._inspect_folder(a, listing[a])
+            info_b = self._inspect_folder(b, listing[b])
         except Exception as exc:  # noqa: BLE001
             self.after(0, lambda: self.log.append_line(f"[local] ERROR: {exc}"))
             return
@@ -217,21 +238,17 @@ class SwapTab(ttk.Frame):
 
         self.after(0, _apply)
 
-    def _inspect_folder(self, path: str) -> FolderInfo:
-        # Basic existence check
-        res = self.app.ssh.exec_command(f"test -d -- {bash_quote(path)}")
-        if res.exit_status != 0:
-            raise RuntimeError(f"Folder not found or not a directory: {path}")
-
-        name = PurePosixPath(path).name
-        paths = self._list_files_best_effort(path)
+    def _inspect_folder(self, path: str, paths: list[str]) -> FolderInfo:
+        # No separate existence check: index hits imply the folder exists (the
+        # script still refuses missing sources) and the find fallback checks it.
+        name = posix_name(path)
         if not paths:
             raise RuntimeError(f"No files found in folder (index empty and find returned nothing): {path}")
 
         groups = group_media_files(
             paths,
-            video_exts=set(self.app.settings.video_exts),
-            sidecar_exts=set(self.app.settings.sidecar_exts),
+            video_exts=self.app.settings.video_ext_set,
+            sidecar_exts=self.app.settings.sidecar_ext_set,
         )
         groups = [g for g in groups if g.video]
         if len(groups) != 1:
@@ -241,7 +258,7 @@ class SwapTab(ttk.Frame):
             )
         g = groups[0]
         nfo_path = g.nfo.path if g.nfo else None
-        return FolderInfo(path=path, name=name, video_stem=g.video.stem if g.video else "", files_count=len(g.all_files()), nfo_path=nfo_path)
+        return FolderInfo(path=path, name=name, video_stem=g.video.stem if g.video else "", files_count=len(g.all_files()), nfo_path=nfo_path, group=g)
 
     def _render_infos(self) -> None:
         a = self._info_a
@@ -279,7 +296,7 @@ class SwapTab(ttk.Frame):
             messagebox.showwarning("Optionen", "Bitte mindestens 'Dateinamen tauschen' oder 'Ordnernamen tauschen' aktivieren.", parent=self)
             return
 
-        sandbox = Sandbox(self.app.settings.allowed_roots)
+        sandbox = self.app.sandbox
         try:
             sandbox.assert_path_allowed(a)
             sandbox.assert_path_allowed(b)
@@ -297,15 +314,16 @@ class SwapTab(ttk.Frame):
 
     def _worker_build_plan(self, a: str, b: str) -> None:
         try:
-            info_a = self._inspect_folder(a)
-            info_b = self._inspect_folder(b)
+            listing = self._list_files_best_effort_many([a, b])
+            info_a = self._inspect_folder(a, listing[a])
+            info_b = self._inspect_folder(b, listing[b])
         except Exception as exc:  # noqa: BLE001
             self.after(0, lambda: self.log.append_line(f"[local] ERROR: {exc}"))
             return
 
         # Safer default: require same parent to truly 'swap names' instead of moving directories between parents.
-        parent_a = str(PurePosixPath(info_a.path).parent)
-        parent_b = str(PurePosixPath(info_b.path).parent)
+        parent_a = posix_parent(info_a.path)
+        parent_b = posix_parent(info_b.path)
         if parent_a != parent_b:
             self.after(
                 0,
@@ -325,113 +343,148 @@ class SwapTab(ttk.Frame):
         old_stem_a = info_a.video_stem
         old_stem_b = info_b.video_stem
 
-        ops: list[Operation] = []
         plan = Plan(title="Swap")
         plan.add_warning("Hinweis: Swap-Operationen sollten zusammen ausgeführt werden. Das Abwählen einzelner Zeilen kann zu Inkonsistenzen führen.")
 
-        def _build_file_ops(dir_path: str, old_stem: str, new_stem: str) -> list[Operation]:
-            # Gather file paths (best effort)
-            paths = self._list_files_best_effort(dir_path)
-            groups = group_media_files(
-                paths,
-                video_exts=set(self.app.settings.video_exts),
-                sidecar_exts=set(self.app.settings.sidecar_exts),
-            )
-            groups = [g for g in groups if g.video]
-            if len(groups) != 1:
-                raise RuntimeError(f"Expected 1 video group in {dir_path}, got {len(groups)}")
-            g = groups[0]
+        def _build_file_ops(dir_path: str, old_stem: str, new_stem: str, g: MediaGroup) -> Iterator[Operation]:
+            dir_prefix = dir_path.rstrip("/") + "/"
+            old_stem_len = len(old_stem)
+            old_stem_dot = old_stem + "."
+            old_stem_dash = old_stem + "-"
 
-            out_ops: list[Operation] = []
             for f in g.all_files():
                 src = f.path
                 name = f.name
-                nlow = name.lower()
-                suffix_part = ""
-
-                if name.startswith(old_stem) and len(name) > len(old_stem):
-                    rest = name[len(old_stem) :]
-                    if rest.startswith(".") or rest.startswith("-"):
-                        suffix_part = rest
 
-                if not suffix_part and nlow in FOLDER_LEVEL_NFO_NAMES and nlow.endswith(".nfo"):
-                    suffix_part = ".nfo"
-
-                if not suffix_part and nlow in FOLDER_LEVEL_SIDECAR_NAMES:
-                    suffix_part = "-" + nlow
+                if name.startswith(old_stem_dot) or name.startswith(old_stem_dash):
+                    suffix_part = name[old_stem_len:]
+                else:
+                    suffix_part = FOLDER_LEVEL_DISPATCH.get(name.lower(), "")
 
                 if not suffix_part:
-                    out_ops.append(
-                        Operation(
-                            kind=OperationKind.RENAME,
-                            src=src,
-                            dst=src,
-                            warning="Unrecognized sidecar name; skipped",
-                            selected=False,
-                        )
+                    yield Operation(
+                        kind=OperationKind.RENAME,
+                        src=src,
+                        dst=src,
+                        warning="Unrecognized sidecar name; skipped",
+                        selected=False,
                     )
                     continue
 
                 dst_name = new_stem + suffix_part
-                dst = str(PurePosixPath(dir_path) / dst_name)
+                dst = dir_prefix + dst_name
                 if dst == src:
-                    out_ops.append(
-                        Operation(
-                            kind=OperationKind.RENAME,
-                            src=src,
-                            dst=dst,
-                            warning="Already matches; skipped",
-                            selected=False,
-                        )
+                    yield Operation(
+                        kind=OperationKind.RENAME,
+                        src=src,
+                        dst=dst,
+                        warning="Already matches; skipped",
+                        selected=False,
                     )
                     continue
-                out_ops.append(Operation(kind=OperationKind.RENAME, src=src, dst=dst))
-            return out_ops
+                yield Operation(kind=OperationKind.RENAME, src=src, dst=dst)
 
         try:
             if bool(self.swap_files.get()):
                 # Rename contained files first while folder names are still stable.
-                ops.extend(_build_file_ops(info_a.path, old_stem_a, name_b))
-                ops.extend(_build_file_ops(info_b.path, old_stem_b, name_a))
+                plan.extend(_build_file_ops(info_a.path, old_stem_a, name_b, info_a.group))
+                plan.extend(_build_file_ops(info_b.path, old_stem_b, name_a, info_b.group))
 
             if bool(self.swap_folders.get()):
                 # Swap the directory names using a temporary name.
-                parent = PurePosixPath(parent_a)
-                tmp = str(parent / f"{name_a}.__JFO_SWAP_TMP__{secrets.token_hex(3)}")
+                tmp = posix_join(parent_a, f"{name_a}.__JFO_SWAP_TMP__{os.getpid():x}_{next(_SWAP_TMP_COUNTER):x}")
                 # Use explicit RENAME kind for readability (script uses mv anyway).
-                ops.append(Operation(kind=OperationKind.RENAME, src=info_a.path, dst=tmp, detail="swap: A -> tmp"))
-                ops.append(Operation(kind=OperationKind.RENAME, src=info_b.path, dst=info_a.path, detail="swap: B -> A"))
-                ops.append(Operation(kind=OperationKind.RENAME, src=tmp, dst=info_b.path, detail="swap: tmp -> B"))
+                plan.extend(
+                    (
+                        Operation(kind=OperationKind.RENAME, src=info_a.path, dst=tmp, detail="swap: A -> tmp"),
+                        Operation(kind=OperationKind.RENAME, src=info_b.path, dst=info_a.path, detail="swap: B -> A"),
+                        Operation(kind=OperationKind.RENAME, src=tmp, dst=info_b.path, detail="swap: tmp -> B"),
+                    )
+                )
         except Exception as exc:  # noqa: BLE001
             self.after(0, lambda: self.log.append_line(f"[local] ERROR building swap ops: {exc}"))
             return
 
-        plan.extend(ops)
         plan.apply_collision_warnings()
+        journal_dicts_selected(plan)  # warm the cache off the Tk thread
 
         def _apply() -> None:
             self._plan = plan
             self._info_a = info_a
             self._info_b = info_b
             self._render_infos()
-            self.table.bind_operations(plan.operations, row_getter=lambda op: (op.kind.value, op.src or "", op.dst or "", op.warning))
+            self.table.bind_operations(plan.operations, row_getter=lambda op: (op.kind.value, op.src or "", op.dst or "", op.warning), plan=plan)
             self._regen_script()
             self.log.append_line(f"[local] Plan ready: {plan.count_selected()} ops selected")
 
         self.after(0, _apply)
 
+    def _script_key_and_options(self) -> tuple[tuple, ScriptOptions]:
+        assert self._plan is not None
+        dry_run = bool(self.dry_run.get())
+        no_overwrite = bool(self.app.settings.no_overwrite)
+        key = (self._plan.uid, self._plan.revision, dry_run, no_overwrite, tuple(self.app.settings.allowed_roots))
+        opts = ScriptOptions(
+            allowed_roots=list(self.app.settings.allowed_roots),
+            dry_run=dry_run,
+            no_overwrite=no_overwrite,
+            annotate_ops=self._plan.count_selected() <= ANNOTATE_OPS_MAX,
+            on_exists="error",
+            hoist_dirs=True,
+        )
+        return key, opts
+
+    def _plan_snapshot(self) -> Plan:
+        """Detached copy of the selected ops, safe to hand to a worker thread."""
+        assert self._plan is not None
+        return Plan(
+            title=self._plan.title,
+            operations=[replace(op) for op in self._plan.operations if op.selected],
+            warnings=list(self._plan.warnings),
+        )
+
     def _regen_script(self) -> None:
+        """Regenerate the script in the background (Tk callbacks stay responsive)."""
         if not self._plan:
+            self._script_cache_key = None
             self.out.set_text("")
             return
-        opts = ScriptOptions(
-            allowed_roots=self.app.settings.allowed_roots,
-            dry_run=bool(self.dry_run.get()),
-            no_overwrite=bool(self.app.settings.no_overwrite),
-            on_exists="error",
+        key, opts = self._script_key_and_options()
+        if key == self._script_cache_key:
+            return
+        self._script_gen_seq += 1
+        t = threading.Thread(
+            target=self._worker_regen,
+            args=(self._script_gen_seq, key, self._plan_snapshot(), opts),
+            daemon=True,
         )
-        self._script = generate_bash_script(self._plan, options=opts)
-        self.out.set_text(self._script)
+        t.start()
+
+    def _worker_regen(self, seq: int, key: tuple, plan: Plan, opts: ScriptOptions) -> None:
+        try:
+            text = generate_bash_script(plan, options=opts)
+        except Exception as exc:  # noqa: BLE001
+            self.after(0, lambda e=exc: self.log.append_line(f"[local] ERROR generating script: {e}"))
+            return
+        self.after(0, lambda: self._apply_script(seq, key, text))
+
+    def _apply_script(self, seq: int, key: tuple, text: str) -> None:
+        # Drop results that were overtaken by a newer regeneration request.
+        if seq != self._script_gen_seq:
+            return
+        self._script = text
+        self._script_cache_key = key
+        self.out.set_text(text)
+
+    def _ensure_script_current(self) -> None:
+        """Synchronously regenerate if the shown script does not match the current inputs."""
+        if not self._plan:
+            return
+        key, opts = self._script_key_and_options()
+        if key == self._script_cache_key:
+            return
+        self._script_gen_seq += 1
+        self._apply_script(self._script_gen_seq, key, generate_bash_script(self._plan, options=opts))
 
     # ---------- Execute ----------
 
@@ -459,7 +512,6 @@ class SwapTab(ttk.Frame):
             if choice == "real":
                 self.dry_run.set(False)
                 self._update_execute_label()
-                self._regen_script()
                 self.log.append_line("[local] executing REAL run (Dry-Run disabled)")
             else:
                 self.log.append_line("[local] executing TEST run (Dry-Run enabled)")
@@ -470,6 +522,13 @@ class SwapTab(ttk.Frame):
                 self.log.append_line("[local] cancelled by mass-confirm")
                 return
 
+        # A background regeneration may still be pending; never execute a stale script.
+        try:
+            self._ensure_script_current()
+        except Exception as exc:  # noqa: BLE001
+            messagebox.showerror("Script", str(exc), parent=self)
+            return
+
         self.log.append_line("[local] executing script...")
         t = threading.Thread(target=self._worker_exec, daemon=True)
         t.start()
@@ -478,25 +537,29 @@ class SwapTab(ttk.Frame):
         assert self._plan is not None
         assert self._script
 
-        stdout_lines: list[str] = []
-        stderr_lines: list[str] = []
+        output = RunOutput()
 
         def on_out(line: str) -> None:
-            stdout_lines.append(line)
-            self.after(0, lambda l=line: self.log.append_line(l))
+            output.write_stdout(line)
+            self.log.post_line(line)
 
         def on_err(line: str) -> None:
-            stderr_lines.append(line)
-            self.after(0, lambda l=line: self.log.append_line("STDERR: " + l))
+            output.write_stderr(line)
+            self.log.post_line("STDERR: " + line)
 
         try:
-            exit_code = self.app.ssh.exec_bash_script_streaming(self._script, on_stdout=on_out, on_stderr=on_err)
+            try:
+                exit_code = self.app.ssh.exec_bash_script_streaming(self._script, on_stdout=on_out, on_stderr=on_err)
+            finally:
+                output.close()
+            self.log.post_line(f"[local] exit={exit_code}")
+            profile = self.app.settings.get_active_profile()
             append_journal(
                 {
                     "tab": "swap",
                     "plan_title": self._plan.title,
-                    "host": self.app.settings.get_active_profile().host,
-                    "username": self.app.settings.get_active_profile().username,
+                    "host": profile.host,
+                    "username": profile.username,
                     "dry_run": bool(self.dry_run.get()),
                     "swap_files": bool(self.swap_files.get()),
                     "swap_folders": bool(self.swap_folders.get()),
@@ -505,27 +568,16 @@ class SwapTab(ttk.Frame):
                     "no_overwrite": bool(self.app.settings.no_overwrite),
                     "ops_total": len(self._plan.operations),
                     "ops_selected": self._plan.count_selected(),
-                    "ops": ops_to_journal_dicts(self._plan.selected_operations()),
+                    "ops": journal_dicts_selected(self._plan),
                     "script": self._script,
                     "exit_code": exit_code,
-                    "stdout": "\n".join(stdout_lines),
-                    "stderr": "\n".join(stderr_lines),
+                    **output.record_fields(),
                 }
             )
+            self.log.post_line("[local] journal written")
 
             # Keep the local analysis index in sync after a successful REAL run.
             if exit_code == 0 and (not bool(self.dry_run.get())):
-                try:
-                    stats = apply_plan_to_index(self._plan)
-                    self.after(
-                        0,
-                        lambda s=stats: self.log.append_line(
-                            f"[local] analysis index updated: +{s.inserted} -{s.deleted} prefixUpdates={s.updated_prefix}"
-                        ),
-                    )
-                except Exception as exc:  # noqa: BLE001
-                    self.after(0, lambda: self.log.append_line(f"[local] index update WARNING: {exc}"))
-
-            self.after(0, lambda: self.log.append_line(f"[local] exit={exit_code} (journal written)"))
+                submit_plan_to_index(self._plan).add_done_callback(log_index_result(self.log.post_line))
         except Exception as exc:  # noqa: BLE001
-            self.after(0, lambda: self.log.append_line(f"[local] ERROR: {exc}"))
+            self.log.post_line(f"[local] ERROR: {exc}")
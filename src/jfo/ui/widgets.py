@@ -1,8 +1,12 @@
 from __future__ import annotations
 
+from collections import deque
+import threading
 import tkinter as tk
 from tkinter import ttk
-from typing import Callable, Iterable, List, Optional
+from typing import Callable, Iterable, List, Optional, Sequence
+
+from jfo.core.plan import Plan
 
 
 class LabeledEntry(ttk.Frame):
@@ -46,8 +50,8 @@ class ReadonlyText(ttk.Frame):
 
     def set_text(self, value: str) -> None:
         self.text.config(state=tk.NORMAL)
-        self.text.delete("1.0", tk.END)
-        self.text.insert(tk.END, value)
+        # One mutation instead of delete + insert (one reflow of the new content).
+        self.text.replace("1.0", tk.END, value)
         self.text.config(state=tk.DISABLED)
 
     def get_text(self) -> str:
@@ -55,19 +59,64 @@ class ReadonlyText(ttk.Frame):
 
 
 class LogText(ttk.Frame):
+    # Oldest lines are dropped beyond this so multi-MB outputs stay responsive.
+    MAX_LINES = 20000
+    FLUSH_MS = 33
+
     def __init__(self, master, *, height: int = 10):
         super().__init__(master)
         self.text = tk.Text(self, height=height, wrap=tk.WORD)
         self.text.pack(fill=tk.BOTH, expand=True)
         self.text.config(state=tk.DISABLED)
+        # Bounded: anything beyond MAX_LINES would be trimmed on insert anyway.
+        self._pending: deque[str] = deque(maxlen=self.MAX_LINES)
+        self._pending_lock = threading.Lock()
+        self._flush_scheduled = False
 
     def append_line(self, line: str) -> None:
+        """Append from the Tk thread.
+
+        Lines logged while a handler runs are written in one insert once Tk is idle.
+        """
+        with self._pending_lock:
+            self._pending.append(line)
+            if self._flush_scheduled:
+                return
+            self._flush_scheduled = True
+        self.after_idle(self._flush_pending)
+
+    def post_line(self, line: str) -> None:
+        """Append from a worker thread.
+
+        Lines are buffered and flushed in one insert at most ~30 times per second,
+        instead of one Tk event per line.
+        """
+        with self._pending_lock:
+            self._pending.append(line)
+            if self._flush_scheduled:
+                return
+            self._flush_scheduled = True
+        self.after(self.FLUSH_MS, self._flush_pending)
+
+    def _flush_pending(self) -> None:
+        with self._pending_lock:
+            lines, self._pending = self._pending, deque(maxlen=self.MAX_LINES)
+            self._flush_scheduled = False
+        if lines:
+            self._insert("\n".join(lines) + "\n")
+
+    def _insert(self, chunk: str) -> None:
         self.text.config(state=tk.NORMAL)
-        self.text.insert(tk.END, line + "\n")
+        self.text.insert(tk.END, chunk)
+        last = int(self.text.index("end-1c").split(".")[0])
+        if last > self.MAX_LINES:
+            self.text.delete("1.0", f"{last - self.MAX_LINES + 1}.0")
         self.text.see(tk.END)
         self.text.config(state=tk.DISABLED)
 
     def clear(self) -> None:
+        with self._pending_lock:
+            self._pending.clear()
         self.text.config(state=tk.NORMAL)
         self.text.delete("1.0", tk.END)
         self.text.config(state=tk.DISABLED)
@@ -84,6 +133,11 @@ class PlanTable(ttk.Frame):
         super().__init__(master)
         self._on_toggle = on_toggle
         self._ops_by_iid: dict[str, object] = {}
+        self._plan: Plan | None = None
+        # Filled by update_operations(): stable iid per row key and the row
+        # values last written to each iid, so reloads only touch changed rows.
+        self._row_iids: dict[str, str] = {}
+        self._row_values: dict[str, tuple[str, ...]] = {}
 
         cols = ["Sel"] + columns
         self.tree = ttk.Treeview(self, columns=cols, show="headings", selectmode="extended")
@@ -101,23 +155,92 @@ class PlanTable(ttk.Frame):
         self.tree.bind("<Double-1>", self._on_double_click)
 
     def clear(self) -> None:
-        for item in self.tree.get_children():
-            self.tree.delete(item)
+        self.tree.delete(*self.tree.get_children())
         self._ops_by_iid.clear()
+        self._row_iids.clear()
+        self._row_values.clear()
+        self._plan = None
 
-    def bind_operations(self, operations: list[object], *, row_getter: Callable[[object], tuple[str, ...]]):
+    def bind_operations(
+        self,
+        operations: list[object],
+        *,
+        row_getter: Callable[[object], tuple[str, ...]],
+        plan: Plan | None = None,
+    ):
         """Populate rows and remember operation objects.
 
         row_getter(op) must return a tuple matching the provided 'columns'.
         The op object must have a boolean attribute 'selected'.
+        Pass the owning `plan` so toggles go through Plan.set_selected().
         """
 
         self.clear()
-        for op in operations:
-            sel = "✓" if getattr(op, "selected", True) else ""
-            row = (sel,) + row_getter(op)
-            iid = self.tree.insert("", tk.END, values=row)
-            self._ops_by_iid[iid] = op
+        self._plan = plan
+        rows = [(("✓" if getattr(op, "selected", True) else ""),) + tuple(row_getter(op)) for op in operations]
+        # Call the Tcl command directly: ttk.Treeview.insert() re-formats its
+        # option dict in Python for every row, which dominates for thousands of rows.
+        # Tk lays out and redraws only once idle, so the rows appear in one
+        # repaint; detaching the tree would only add a forget/pack relayout.
+        call = self.tree.tk.call
+        widget = str(self.tree)
+        iids = [call(widget, "insert", "", "end", "-values", row) for row in rows]
+        self._ops_by_iid = dict(zip(iids, operations))
+
+    def update_operations(
+        self,
+        operations: list[object],
+        *,
+        row_getter: Callable[[object], tuple[str, ...]],
+        key_fn: Callable[[object], str],
+        plan: Plan | None = None,
+    ) -> None:
+        """Like bind_operations(), but diff against the rows already shown.
+
+        key_fn(op) identifies a row across reloads. Rows keep their iid, so
+        only new/removed keys are inserted/deleted and only rows whose values
+        changed are rewritten; scroll position and Treeview selection survive.
+        Falls back to a full rebuild when keys are not unique.
+        """
+
+        keys = [key_fn(op) for op in operations]
+        if len(set(keys)) != len(keys):
+            self.bind_operations(operations, row_getter=row_getter, plan=plan)
+            return
+        if len(self._row_iids) != len(self._ops_by_iid):
+            # Rows came from bind_operations() and carry no keys.
+            self.clear()
+
+        self._plan = plan
+        call = self.tree.tk.call
+        widget = str(self.tree)
+        old_iids = self._row_iids
+        row_values = self._row_values
+        new_iids: dict[str, str] = {}
+        ops_by_iid: dict[str, object] = {}
+        order: list[str] = []
+        for key, op in zip(keys, operations):
+            row = (("✓" if getattr(op, "selected", True) else ""),) + tuple(row_getter(op))
+            iid = old_iids.pop(key, None)
+            if iid is None:
+                iid = call(widget, "insert", "", "end", "-values", row)
+            elif row_values.get(iid) != row:
+                call(widget, "item", iid, "-values", row)
+            row_values[iid] = row
+            new_iids[key] = iid
+            ops_by_iid[iid] = op
+            order.append(iid)
+
+        gone = list(old_iids.values())
+        if gone:
+            self.tree.delete(*gone)
+            for iid in gone:
+                row_values.pop(iid, None)
+        if list(self.tree.get_children()) != order:
+            for index, iid in enumerate(order):
+                call(widget, "move", iid, "", index)
+        self._row_iids = new_iids
+        self._ops_by_iid = ops_by_iid
 
     def selected_objects(self) -> list[object]:
         """Return objects for currently selected rows (Treeview selection)."""
@@ -136,12 +259,194 @@ class PlanTable(ttk.Frame):
         if op is None:
             return
         current = bool(getattr(op, "selected", True))
-        setattr(op, "selected", not current)
+        if self._plan is not None:
+            self._plan.set_selected(op, not current)
+        else:
+            setattr(op, "selected", not current)
+
+        # Update only the Sel cell
+        mark = "✓" if getattr(op, "selected", True) else ""
+        self.tree.set(iid, "Sel", mark)
+        cached = self._row_values.get(iid)
+        if cached is not None:
+            self._row_values[iid] = (mark,) + cached[1:]
+        if self._on_toggle:
+            self._on_toggle()
+
+
+class VirtualPlanTable(ttk.Frame):
+    """Table for large result sets that only creates Treeview items for visible rows.
+
+    The backing rows stay a plain sequence; scrolling re-binds the values of a
+    fixed set of item "slots". Selection flags (the "Sel" column, toggled by
+    double-click like PlanTable) are kept in a bytearray, one byte per row,
+    or - after bind_operations() - in the operations' own `selected` flags.
+    """
 
-        # Update row
-        values = list(self.tree.item(iid, "values"))
-        if values:
-            values[0] = "✓" if getattr(op, "selected", True) else ""
-            self.tree.item(iid, values=values)
+    def __init__(
+        self,
+        master,
+        *,
+        columns: list[str],
+        height: int = 20,
+        on_toggle: Callable[[], None] | None = None,
+    ):
+        super().__init__(master)
+        self._on_toggle = on_toggle
+        self._items: Sequence[object] = ()
+        self._row_getter: Callable[[object], tuple[str, ...]] = lambda item: ()
+        self._flags = bytearray()
+        # Set by bind_operations(): "Sel" mirrors op.selected instead of _flags.
+        self._ops_mode = False
+        self._plan: Plan | None = None
+        self._sel_rows: set[int] = set()
+        self._slots: list[str] = []
+        self._slot_values: list[tuple] = []
+        self._top = 0
+
+        cols = ["Sel"] + columns
+        self.tree = ttk.Treeview(self, columns=cols, show="headings", selectmode="extended", height=height)
+        self.tree.heading("Sel", text="Sel")
+        self.tree.column("Sel", width=40, stretch=False, anchor=tk.CENTER)
+        for c in columns:
+            self.tree.heading(c, text=c)
+            self.tree.column(c, width=220, stretch=True)
+        self.ysb = ttk.Scrollbar(self, orient="vertical", command=self._on_scrollbar)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.ysb.pack(side=tk.RIGHT, fill=tk.Y)
+
+        self.tree.bind("<Configure>", lambda _e: self._render())
+        self.tree.bind("<<TreeviewSelect>>", self._on_select)
+        self.tree.bind("<Double-1>", self._on_double_click)
+        self.tree.bind("<MouseWheel>", self._on_wheel)
+        self.tree.bind("<Button-4>", lambda _e: self._scroll_by(-3))
+        self.tree.bind("<Button-5>", lambda _e: self._scroll_by(3))
+        self.tree.bind("<Prior>", lambda _e: self._scroll_by(-len(self._slots)))
+        self.tree.bind("<Next>", lambda _e: self._scroll_by(len(self._slots)))
+
+    def set_backing(self, items: Sequence[object], *, row_getter: Callable[[object], tuple[str, ...]]) -> None:
+        """Show `items`; row_getter(item) must return a tuple matching the columns."""
+
+        self._bind(items, row_getter, ops_mode=False, plan=None)
+
+    def bind_operations(
+        self,
+        operations: Sequence[object],
+        *,
+        row_getter: Callable[[object], tuple[str, ...]],
+        plan: Plan | None = None,
+    ) -> None:
+        """PlanTable-compatible: the "Sel" column shows and toggles op.selected."""
+
+        self._bind(operations, row_getter, ops_mode=True, plan=plan)
+
+    def _bind(self, items, row_getter, *, ops_mode: bool, plan: Plan | None) -> None:  # noqa: ANN001
+        self._items = items
+        self._row_getter = row_getter
+        self._ops_mode = ops_mode
+        self._plan = plan
+        self._flags = bytearray() if ops_mode else bytearray(b"\x01") * len(items)
+        self._sel_rows.clear()
+        self._top = 0
+        self._render()
+
+    def clear(self) -> None:
+        self.set_backing((), row_getter=self._row_getter)
+
+    def selected_objects(self) -> list[object]:
+        """Return backing items for the selected rows (Treeview selection)."""
+        return [self._items[i] for i in sorted(self._sel_rows)]
+
+    def checked_objects(self) -> list[object]:
+        """Return backing items whose "Sel" flag is set."""
+        if self._ops_mode:
+            return [op for op in self._items if getattr(op, "selected", True)]
+        return [item for item, flag in zip(self._items, self._flags) if flag]
+
+    def _checked(self, row: int) -> bool:
+        if self._ops_mode:
+            return bool(getattr(self._items[row], "selected", True))
+        return bool(self._flags[row])
+
+    def _capacity(self) -> int:
+        if self._slots:
+            box = self.tree.bbox(self._slots[0])
+            if box:
+                _x, y, _w, h = box
+                if h > 0:
+                    return max(1, (self.tree.winfo_height() - y) // h)
+        return int(self.tree.cget("height"))
+
+    def _render(self) -> None:
+        total = len(self._items)
+        count = min(self._capacity(), total)
+        self._top = max(0, min(self._top, total - count))
+
+        while len(self._slots) > count:
+            self.tree.delete(self._slots.pop())
+            self._slot_values.pop()
+        while len(self._slots) < count:
+            iid = f"v{len(self._slots)}"
+            self.tree.insert("", tk.END, iid=iid)
+            self._slots.append(iid)
+            self._slot_values.append(())
+
+        selected = []
+        slot_values = self._slot_values
+        for i, iid in enumerate(self._slots):
+            row = self._top + i
+            sel = "✓" if self._checked(row) else ""
+            values = (sel,) + tuple(self._row_getter(self._items[row]))
+            if slot_values[i] != values:
+                self.tree.item(iid, values=values)
+                slot_values[i] = values
+            if row in self._sel_rows:
+                selected.append(iid)
+        self.tree.selection_set(selected)
+
+        if total:
+            self.ysb.set(self._top / total, (self._top + count) / total)
+        else:
+            self.ysb.set(0.0, 1.0)
+
+    def _scroll_by(self, rows: int) -> str:
+        self._top += rows
+        self._render()
+        return "break"
+
+    def _on_scrollbar(self, action: str, amount: str, unit: str | None = None) -> None:
+        if action == "moveto":
+            self._top = int(float(amount) * len(self._items))
+            self._render()
+        elif action == "scroll":
+            step = len(self._slots) if unit == "pages" else 1
+            self._scroll_by(int(amount) * step)
+
+    def _on_wheel(self, event) -> str:  # noqa: ANN001
+        return self._scroll_by(-3 if event.delta > 0 else 3)
+
+    def _on_select(self, _event) -> None:  # noqa: ANN001
+        # Map the slot selection back to row indices for the visible window only.
+        self._sel_rows.difference_update(range(self._top, self._top + len(self._slots)))
+        self._sel_rows.update(self._top + int(iid[1:]) for iid in self.tree.selection())
+
+    def _on_double_click(self, event) -> None:  # noqa: ANN001
+        iid = self.tree.identify_row(event.y)
+        if not iid:
+            return
+        row = self._top + int(iid[1:])
+        if self._ops_mode:
+            op = self._items[row]
+            if self._plan is not None:
+                self._plan.set_selected(op, not self._checked(row))
+            else:
+                setattr(op, "selected", not self._checked(row))
+        else:
+            self._flags[row] ^= 1
+        mark = "✓" if self._checked(row) else ""
+        self.tree.set(iid, "Sel", mark)
+        slot = int(iid[1:])
+        if self._slot_values[slot]:
+            self._slot_values[slot] = (mark,) + self._slot_values[slot][1:]
         if self._on_toggle:
             self._on_toggle()
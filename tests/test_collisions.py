@@ -11,3 +11,22 @@ def test_collision_detection_on_dst():
     plan.apply_collision_warnings()
     assert plan.operations[0].warning
     assert plan.operations[1].warning
+
+
+def test_collision_warnings_are_replaced_on_rerun():
+    plan = Plan(title="t")
+    plan.extend([
+        Operation(kind=OperationKind.MOVE, src="/a", dst="/x", warning="pre"),
+        Operation(kind=OperationKind.MOVE, src="/b", dst="/x"),
+    ])
+    plan.apply_collision_warnings()
+    plan.mark_changed()
+    plan.apply_collision_warnings()
+    assert plan.operations[0].warning == "pre; Collision: multiple ops target /x"
+    assert len(plan.warnings) == 1
+
+    plan.set_selected(plan.operations[1], False)
+    plan.apply_collision_warnings()
+    assert plan.operations[0].warning == "pre"
+    assert plan.operations[1].warning == ""
+    assert plan.warnings == []
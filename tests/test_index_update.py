@@ -0,0 +1,78 @@
+import sqlite3
+
+import pytest
+
+from jfo.core.operations import Operation, OperationKind
+from jfo.core.plan import Plan
+from jfo.infra import index_update, sqlite_index
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    path = tmp_path / "analysis.sqlite"
+    monkeypatch.setattr(sqlite_index, "_db_path", lambda: path)
+    sqlite_index.upsert_paths(["/m/A/a.mkv", "/m/A/a.nfo", "/m/B/b.mkv"], root="/m")
+    return path
+
+
+def _paths(db):
+    conn = sqlite3.connect(str(db))
+    try:
+        return sorted(r[0] for r in conn.execute("SELECT path FROM files"))
+    finally:
+        conn.close()
+
+
+def test_swap_plan_updates_files_then_folders(db):
+    plan = Plan(title="Swap")
+    plan.extend([
+        Operation(kind=OperationKind.RENAME, src="/m/A/a.mkv", dst="/m/A/B.mkv"),
+        Operation(kind=OperationKind.RENAME, src="/m/A/a.nfo", dst="/m/A/B.nfo"),
+        Operation(kind=OperationKind.RENAME, src="/m/B/b.mkv", dst="/m/B/A.mkv"),
+        Operation(kind=OperationKind.RENAME, src="/m/A", dst="/m/A.tmp"),
+        Operation(kind=OperationKind.RENAME, src="/m/B", dst="/m/A"),
+        Operation(kind=OperationKind.RENAME, src="/m/A.tmp", dst="/m/B"),
+    ])
+
+    stats = index_update.apply_plan_to_index(plan)
+
+    assert stats.inserted == 3 and stats.deleted == 3
+    assert _paths(db) == ["/m/A/A.mkv", "/m/B/B.mkv", "/m/B/B.nfo"]
+
+
+def test_chained_file_renames_are_applied_in_order(db):
+    plan = Plan(title="t")
+    plan.extend([
+        Operation(kind=OperationKind.RENAME, src="/m/A/a.mkv", dst="/m/A/x.mkv"),
+        Operation(kind=OperationKind.RENAME, src="/m/A/x.mkv", dst="/m/A/y.mkv"),
+    ])
+
+    index_update.submit_plan_to_index(plan).result()
+
+    assert _paths(db) == ["/m/A/a.nfo", "/m/A/y.mkv", "/m/B/b.mkv"]
+
+
+def test_directory_rename_rewrites_only_that_subtree(db):
+    sqlite_index.upsert_paths(["/m/A/sub/s.srt", "/m/AB/c.mkv"], root="/m")
+    plan = Plan(title="t")
+    plan.extend([Operation(kind=OperationKind.RENAME, src="/m/A", dst="/m/Z")])
+
+    stats = index_update.apply_plan_to_index(plan)
+
+    assert stats.updated_prefix == 3
+    assert _paths(db) == ["/m/AB/c.mkv", "/m/B/b.mkv", "/m/Z/a.mkv", "/m/Z/a.nfo", "/m/Z/sub/s.srt"]
+    conn = sqlite3.connect(str(db))
+    try:
+        assert conn.execute("SELECT dir FROM files WHERE path='/m/Z/sub/s.srt'").fetchone()[0] == "/m/Z/sub"
+    finally:
+        conn.close()
+
+
+def test_root_trie_picks_longest_containing_root():
+    trie = index_update._RootTrie(["/", "/m/", "/m/Movies", "/m/Mov"])
+
+    assert trie.match("/m/Movies/a.mkv") == "/m/Movies"
+    assert trie.match("/m/MoviesX/a.mkv") == "/m/"
+    assert trie.match("/m") == "/m/"
+    assert trie.match("/other/x") == "/"
+    assert index_update._RootTrie(["/m"]).match("/mnt/x") is None
@@ -0,0 +1,19 @@
+import json
+
+from jfo.infra import journal
+
+
+def test_run_output_is_referenced_from_the_journal_record(tmp_path, monkeypatch):
+    monkeypatch.setattr(journal, "_journal_path", lambda: tmp_path / "journal.jsonl")
+
+    output = journal.RunOutput()
+    output.write_stdout("mkdir /m/a")
+    output.write_stdout("mkdir /m/b")
+    output.close()
+    journal.append_journal({"tab": "create_dirs", "exit_code": 0, **output.record_fields()})
+
+    rec = json.loads((tmp_path / "journal.jsonl").read_text(encoding="utf-8"))
+    assert "stdout" not in rec and rec["stdout_lines"] == 2
+    assert journal.read_run_output(rec, "stdout") == "mkdir /m/a\nmkdir /m/b"
+    assert journal.read_run_output(rec, "stderr") == ""
+    assert journal.read_run_output({"stdout": "legacy"}, "stdout") == "legacy"
@@ -1,4 +1,4 @@
-from jfo.core.nfo import parse_nfo
+from jfo.core.nfo import parse_nfo, parse_nfo_bytes
 
 
 def test_parse_nfo_movie_basic():
@@ -25,3 +25,41 @@ def test_parse_nfo_imdb_in_id_field():
 """
     info = parse_nfo(xml)
     assert info.imdbid == "tt0078748"
+
+
+def test_parse_nfo_year_from_premiered_and_empty_tags():
+    xml = """
+<movie>
+  <title> </title>
+  <originaltitle>Heat</originaltitle>
+  <premiered>1995-12-15</premiered>
+</movie>
+"""
+    info = parse_nfo(xml)
+    assert info.title is None
+    assert info.original_title == "Heat"
+    assert info.year == 1995
+
+
+def test_parse_nfo_bytes_with_bom_and_latin1_declaration():
+    data = "﻿<?xml version='1.0' encoding='UTF-8'?><movie><title>Amélie</title></movie>".encode("utf-8")
+    assert parse_nfo_bytes(data).title == "Amélie"
+    latin = "<?xml version='1.0' encoding='ISO-8859-1'?><movie><title>Amélie</title></movie>".encode("latin-1")
+    assert parse_nfo_bytes(latin).title == "Amélie"
+
+
+def test_parse_nfo_stops_once_all_naming_fields_are_known():
+    # Everything after <imdbid> is never read, so trailing junk does not matter.
+    data = (
+        b"<movie><title>Heat</title><originaltitle>Heat</originaltitle><year>1995</year>"
+        b"<imdbid>tt0113277</imdbid><actor><name>Al Pacino</name></actor><broken"
+    )
+    info = parse_nfo_bytes(data)
+    assert (info.title, info.year, info.imdbid) == ("Heat", 1995, "tt0113277")
+
+
+def test_parse_nfo_streaming_falls_back_for_multiple_top_level_nodes():
+    xml = "<movie><title>Alien</title><actor><name>x</name><year>1</year></actor><id>tt0078748</id></movie><fileinfo/>"
+    info = parse_nfo(xml)
+    assert (info.title, info.year, info.imdbid) == ("Alien", None, "tt0078748")
+    assert parse_nfo_bytes(xml.encode()) == info
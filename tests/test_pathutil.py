@@ -0,0 +1,34 @@
+from pathlib import PurePosixPath
+
+from jfo.core.pathutil import posix_join, posix_name, posix_normpath, posix_parent, posix_split
+
+
+def test_matches_pureposixpath():
+    for p in ["/a/b/c.mkv", "/a/b/", "/a", "/", "rel/x", "x"]:
+        assert posix_parent(p) == str(PurePosixPath(p).parent), p
+        assert posix_name(p) == PurePosixPath(p).name, p
+
+
+def test_join():
+    assert posix_join("/a/b/", "c") == "/a/b/c"
+    assert posix_join("/", "c") == "/c"
+
+
+def test_normpath_matches_pureposixpath():
+    for p in ["/a/b", "/", "/a//b", "/a/./b", "/a/b/", "/a/../b", "/a/.b", "rel/x", "//x", "/a/b/."]:
+        assert posix_normpath(p) == str(PurePosixPath(p)), p
+
+
+def test_split_matches_pureposixpath():
+    for p in ["/a/b/c.mkv", "/a", "/", "/a//b", "/a/b/", "rel/x", "x", "//x"]:
+        pp = PurePosixPath(p)
+        assert posix_split(p) == (str(pp.parent), pp.name), p
+
+
+def test_media_file_parts_match_pureposixpath():
+    from jfo.core.media_grouping import MediaFile
+
+    for p in ["/m/Movie (2000)/Movie.en.SRT", "/m/.nfo", "/m/a.", "/m/noext", "/top.mkv", "/m/x/.hidden.jpg"]:
+        mf, pp = MediaFile(p), PurePosixPath(p)
+        assert (mf.dir, mf.name, mf.stem) == (str(pp.parent), pp.name, pp.stem), p
+        assert mf.suffix == pp.suffix.lower().lstrip("."), p
@@ -0,0 +1,82 @@
+from jfo.core.plan import Plan
+from jfo.core.operations import Operation, OperationKind
+
+
+def test_revision_bumps_on_extend_and_mark_changed():
+    plan = Plan(title="t")
+    r0 = plan.revision
+    plan.extend([Operation(kind=OperationKind.MOVE, src="/a", dst="/b")])
+    assert plan.revision > r0
+    r1 = plan.revision
+    plan.operations[0].selected = False
+    plan.mark_changed()
+    assert plan.revision > r1
+
+
+def test_journal_dicts_follow_selection():
+    from jfo.core.history import journal_dicts_selected
+
+    plan = Plan(title="t")
+    plan.extend([
+        Operation(kind=OperationKind.MOVE, src="/a", dst="/b"),
+        Operation(kind=OperationKind.MOVE, src="/c", dst="/d"),
+    ])
+    assert [d["src"] for d in journal_dicts_selected(plan)] == ["/a", "/c"]
+    plan.operations[0].selected = False
+    assert [d["src"] for d in journal_dicts_selected(plan)] == ["/c"]
+
+
+def test_count_selected_tracks_set_selected_without_rescan():
+    plan = Plan(title="t")
+    plan.extend([Operation(kind=OperationKind.MOVE, src=f"/s{i}", dst=f"/d{i}") for i in range(3)])
+    assert plan.count_selected() == 3
+
+    r = plan.revision
+    plan.set_selected(plan.operations[1], False)
+    assert plan.revision > r
+    assert plan._selected_cache == (plan.revision, 2)
+    assert plan.count_selected() == 2
+    plan.set_selected(plan.operations[1], False)
+    assert plan.count_selected() == 2
+
+    plan.operations[0].selected = False
+    plan.mark_changed()
+    assert plan.count_selected() == 1
+
+
+def test_set_selected_keeps_journal_dicts_cached():
+    from jfo.core.history import journal_dicts_selected
+
+    plan = Plan(title="t")
+    plan.extend([Operation(kind=OperationKind.MOVE, src="/a", dst="/b"), Operation(kind=OperationKind.MOVE, src="/c", dst="/d")])
+    journal_dicts_selected(plan)
+    cached = plan._journal_cache[1]
+
+    plan.set_selected(plan.operations[0], False)
+    assert [d["src"] for d in journal_dicts_selected(plan)] == ["/c"]
+    assert plan._journal_cache[1] is cached
+
+
+def test_apply_collision_warnings_is_idempotent_until_the_plan_changes():
+    plan = Plan(title="t")
+    plan.extend([
+        Operation(kind=OperationKind.MOVE, src="/r/a", dst="/r/x"),
+        Operation(kind=OperationKind.MOVE, src="/r/b", dst="/r/x"),
+    ])
+    plan.apply_collision_warnings()
+    warnings = list(plan.warnings)
+    op_warning = plan.operations[0].warning
+
+    plan.apply_collision_warnings()
+    assert plan.warnings == warnings
+    assert plan.operations[0].warning == op_warning
+
+    plan.set_selected(plan.operations[1], False)
+    plan.apply_collision_warnings()
+    assert plan.warnings == []
+    assert plan.operations[0].warning == ""
+
+
+def test_plan_uid_is_unique_per_instance():
+    uids = {Plan(title="t").uid for _ in range(100)}
+    assert len(uids) == 100
@@ -25,3 +25,8 @@ def test_bash_array_literal():
     arr = bash_array_literal(["/a b", "c"]) 
     assert arr.startswith("(") and arr.endswith(")")
     assert "'/a b'" in arr
+
+
+def test_bash_array_literal_reject_nul():
+    with pytest.raises(QuoteError):
+        bash_array_literal(["/ok", "a\x00b"])
@@ -0,0 +1,50 @@
+import subprocess
+
+import pytest
+
+from jfo.infra.remote_fs import list_mountpoints, multi_query, read_files
+from jfo.infra.ssh_client import ExecResult
+
+
+class _LocalBash:
+    """Runs the script with the local bash, like `bash -s` on the remote."""
+
+    def exec_bash_script_streaming_raw(self, script, *, on_stdout_chunk, on_stderr):
+        res = subprocess.run(["bash", "-s"], input=script.encode("utf-8"), capture_output=True, check=False)
+        on_stdout_chunk(res.stdout)
+        on_stdout_chunk(b"")
+        return res.returncode
+
+
+class _FailingDf:
+    """Runs commands with the local bash; `df` prints one mount and exits 1."""
+
+    def exec_command(self, command, *, timeout=60.0):
+        df = "df() { echo 'Filesystem Size Used Avail Use% Mounted on'; echo '/dev/md0 1G 1M 1G 1% /volume1'; return 1; }; "
+        res = subprocess.run(["bash", "-c", df + command], capture_output=True, text=True, check=False)
+        return ExecResult(exit_status=res.returncode, stdout=res.stdout, stderr=res.stderr)
+
+
+def test_read_files_fetches_many_files_in_one_run(tmp_path):
+    a = tmp_path / "a b.nfo"
+    a.write_bytes(b"<movie>\0x</movie>\n")
+    c = tmp_path / "it's.nfo"
+    c.write_bytes(b"")
+    (tmp_path / "dir.nfo").mkdir()
+
+    got = read_files(_LocalBash(), [str(a), str(tmp_path / "missing.nfo"), str(c), str(tmp_path / "dir.nfo"), str(a)])
+
+    assert got == {str(a): b"<movie>\0x</movie>\n", str(c): b""}
+
+
+def test_failing_df_does_not_drop_the_listing(tmp_path):
+    (tmp_path / "Filme").mkdir()
+    (tmp_path / "a.mkv").write_bytes(b"")
+
+    res = multi_query(_FailingDf(), mounts=True, list_paths=[str(tmp_path)])
+
+    assert res.mount_error == "df failed (exit 1)"
+    assert res.mountpoints is None
+    assert res.directories == {str(tmp_path): ["Filme"]}
+    with pytest.raises(RuntimeError, match="df failed"):
+        list_mountpoints(_FailingDf())
@@ -0,0 +1,85 @@
+import re
+
+from jfo.core.history import parse_ops_from_script
+from jfo.core.operations import Operation, OperationKind
+from jfo.core.plan import Plan
+from jfo.core.scriptgen import ScriptOptions, generate_bash_script
+
+
+def test_same_name_moves_are_batched_per_directory():
+    plan = Plan(title="t")
+    plan.extend([
+        Operation(kind=OperationKind.MOVE, src="/data/in/a.mkv", dst="/data/out/a.mkv"),
+        Operation(kind=OperationKind.MOVE, src="/data/in/b.mkv", dst="/data/out/b.mkv"),
+        Operation(kind=OperationKind.RENAME, src="/data/out/c.mkv", dst="/data/out/d.mkv"),
+    ])
+    script = generate_bash_script(plan, options=ScriptOptions(allowed_roots=["/data"]))
+
+    assert "safe_mv_into '/data/out' '/data/in/a.mkv' '/data/in/b.mkv'" in script
+    assert "safe_mv '/data/out/c.mkv' '/data/out/d.mkv'" in script
+    assert [(o.src, o.dst) for o in parse_ops_from_script(script)] == [(o.src, o.dst) for o in plan.operations]
+
+
+def test_move_batches_are_capped():
+    from jfo.core.scriptgen import _MV_BATCH_MAX_SRCS
+
+    n = _MV_BATCH_MAX_SRCS * 2 + 10
+    plan = Plan(title="t")
+    plan.extend([
+        Operation(kind=OperationKind.MOVE, src=f"/data/in/{i:05d}.mkv", dst=f"/data/out/{i:05d}.mkv")
+        for i in range(n)
+    ])
+    script = generate_bash_script(plan, options=ScriptOptions(allowed_roots=["/data"]))
+
+    batch_lines = [l for l in script.splitlines() if l.startswith("safe_mv_into ")]
+    assert len(batch_lines) == 3
+    assert all(l.count("'/data/in/") <= _MV_BATCH_MAX_SRCS for l in batch_lines)
+    assert [(o.src, o.dst) for o in parse_ops_from_script(script)] == [(o.src, o.dst) for o in plan.operations]
+
+
+def test_hoisted_dir_renames_round_trip_through_parser():
+    plan = Plan(title="t")
+    plan.extend([
+        Operation(kind=OperationKind.RENAME, src="/data/Foo's/a.mkv", dst="/data/Foo's/b.mkv"),
+        Operation(kind=OperationKind.RENAME, src="/data/Foo's/a.nfo", dst="/data/Foo's/b.nfo"),
+    ])
+    script = generate_bash_script(plan, options=ScriptOptions(allowed_roots=["/data"], hoist_dirs=True))
+
+    assert script.count("_D=") == 1
+    assert [(o.src, o.dst) for o in parse_ops_from_script(script)] == [(o.src, o.dst) for o in plan.operations]
+
+
+def test_with_dry_run_matches_regeneration():
+    from jfo.core.scriptgen import with_dry_run
+
+    plan = Plan(title="t")
+    plan.extend([Operation(kind=OperationKind.MOVE, src="/data/a.mkv", dst="/data/b/a.mkv")])
+    dry = generate_bash_script(plan, options=ScriptOptions(allowed_roots=["/data"], dry_run=True))
+    real = generate_bash_script(plan, options=ScriptOptions(allowed_roots=["/data"], dry_run=False))
+
+    def body(s: str) -> str:
+        return "\n".join(ln for ln in s.splitlines() if not ln.startswith("# Created"))
+
+    assert body(with_dry_run(dry, False)) == body(real)
+    assert body(with_dry_run(real, True)) == body(dry)
+    assert with_dry_run(dry, True) is dry
+
+
+def test_annotate_ops_off_drops_only_the_comments():
+    plan = Plan(title="t")
+    plan.extend([
+        Operation(kind=OperationKind.MOVE, src="/data/in/a.mkv", dst="/data/out/a.mkv"),
+        Operation(kind=OperationKind.RENAME, src="/data/out/c.mkv", dst="/data/out/d.mkv"),
+        Operation(kind=OperationKind.MKDIR, dst="/data/new"),
+    ])
+    on = generate_bash_script(plan, options=ScriptOptions(allowed_roots=["/data"]))
+    off = generate_bash_script(plan, options=ScriptOptions(allowed_roots=["/data"], annotate_ops=False))
+
+    assert "# 1. mv /data/in/a.mkv -> /data/out/a.mkv" in on
+    assert "# 1. " not in off and "# 3. " not in off
+    assert len(off) < len(on)
+    def strip(script):
+        return [l for l in script.splitlines() if not re.match(r"# (\d+\.|Created) ", l)]
+
+    assert strip(on) == strip(off)
+    assert [(o.src, o.dst) for o in parse_ops_from_script(off)] == [(o.src, o.dst) for o in parse_ops_from_script(on)]
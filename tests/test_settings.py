@@ -0,0 +1,24 @@
+from jfo.infra.settings import AppSettings
+
+
+def test_media_ext_set_is_normalized_and_follows_edits():
+    s = AppSettings(video_exts=["MKV", ".mp4"], sidecar_exts=["nfo"])
+    exts = s.media_ext_set
+    assert exts == frozenset({"mkv", "mp4", "nfo"})
+    assert s.media_ext_set is exts
+
+    s.video_exts.append(".TS")
+    assert "ts" in s.media_ext_set
+    s.sidecar_exts = []
+    assert s.media_ext_set == frozenset({"mkv", "mp4", "ts"})
+
+
+def test_video_and_sidecar_ext_sets_share_the_snapshot():
+    s = AppSettings(video_exts=["MKV"], sidecar_exts=[".NFO", "srt"])
+    assert s.video_ext_set == frozenset({"mkv"})
+    assert s.sidecar_ext_set == frozenset({"nfo", "srt"})
+    video = s.video_ext_set
+
+    s.sidecar_exts.append("ass")
+    assert "ass" in s.sidecar_ext_set
+    assert s.video_ext_set == video
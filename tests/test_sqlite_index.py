@@ -0,0 +1,159 @@
+import csv
+import json
+import sqlite3
+
+from jfo.infra import sqlite_index
+
+
+def test_exports_stream_all_rows_in_batches(tmp_path, monkeypatch):
+    monkeypatch.setattr(sqlite_index, "_db_path", lambda: tmp_path / "analysis.sqlite")
+    paths = [f"/m/d/f{i:02d}.mkv" for i in range(25)]
+    sqlite_index.upsert_paths(paths, root="/m")
+    sqlite_index.upsert_paths(["/x/other.mkv"], root="/x")
+
+    progress: list[int] = []
+    out_csv = tmp_path / "out.csv"
+    n = sqlite_index.export_root_to_csv("/m", str(out_csv), batch=10, on_progress=progress.append)
+
+    assert n == 25
+    assert progress == [10, 20, 25]
+    with open(out_csv, newline="", encoding="utf-8") as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == ["path", "dir", "name", "ext", "root", "scanned_at"]
+    assert [r[0] for r in rows[1:]] == paths
+
+    out_jsonl = tmp_path / "out.jsonl"
+    assert sqlite_index.export_root_to_jsonl("/m", str(out_jsonl), batch=7) == 25
+    objs = [json.loads(line) for line in out_jsonl.read_text(encoding="utf-8").splitlines()]
+    assert [o["path"] for o in objs] == paths
+    assert objs[0]["ext"] == "mkv" and objs[0]["root"] == "/m"
+
+
+def test_substring_search_uses_trigram_index_and_tracks_changes(tmp_path, monkeypatch):
+    monkeypatch.setattr(sqlite_index, "_db_path", lambda: tmp_path / "analysis.sqlite")
+    sqlite_index.upsert_paths(["/m/Alien (1979)/Alien.mkv", "/m/Heat/Heat.nfo", "/m/Up/Up.mkv"], root="/m")
+
+    conn = sqlite_index.connect()
+    try:
+        has_fts = sqlite_index._has_fts(conn)
+    finally:
+        conn.close()
+
+    assert [r[0] for r in sqlite_index.search_files_for_root("/m", "alien")] == ["/m/Alien (1979)/Alien.mkv"]
+    assert [r[0] for r in sqlite_index.search_files_for_root("/m", "ea", exts=["nfo"])] == ["/m/Heat/Heat.nfo"]
+    assert sqlite_index.search_files("up/") == ["/m/Up/Up.mkv"]
+
+    conn = sqlite_index.connect()
+    try:
+        conn.execute("UPDATE files SET path='/m/Down/Down.mkv' WHERE path='/m/Up/Up.mkv'")
+        conn.execute("DELETE FROM files WHERE path LIKE '/m/Heat/%'")
+        conn.commit()
+    finally:
+        conn.close()
+
+    assert sqlite_index.search_files("/up/") == []
+    assert sqlite_index.search_files("down") == ["/m/Down/Down.mkv"]
+    assert [r[0] for r in sqlite_index.search_files_any_root("heat")] == []
+    conn = sqlite_index.connect()
+    try:
+        assert sqlite_index._substring_match(conn, "ab")[0] == "files f"
+        assert sqlite_index._substring_match(conn, "abc")[0].startswith("files_fts") == has_fts
+    finally:
+        conn.close()
+
+
+def test_distinct_queries_are_cached_until_the_index_changes(tmp_path, monkeypatch):
+    monkeypatch.setattr(sqlite_index, "_db_path", lambda: tmp_path / "analysis.sqlite")
+    sqlite_index.upsert_paths(["/m/A/a.mkv"], root="/m")
+
+    assert sqlite_index.distinct_roots() == ["/m"]
+    hits = sqlite_index._distinct_roots_cached.cache_info().hits
+    assert sqlite_index.distinct_roots() == ["/m"]
+    assert sqlite_index._distinct_roots_cached.cache_info().hits == hits + 1
+
+    sqlite_index.upsert_paths(["/x/B/b.mkv"], root="/x")
+    assert sqlite_index.distinct_roots() == ["/m", "/x"]
+    assert sqlite_index.distinct_dirs_for_root("/x") == ["/x/B"]
+
+
+def test_distinct_dirs_prefix_is_a_range_match(tmp_path, monkeypatch):
+    monkeypatch.setattr(sqlite_index, "_db_path", lambda: tmp_path / "analysis.sqlite")
+    sqlite_index.upsert_paths(["/m/Ab/a.mkv", "/m/Ab/b.mkv", "/m/Abc/c.mkv", "/m/B/d.mkv", "/n/Ab/e.mkv"], root="/m")
+    sqlite_index.upsert_paths(["/m/Ax/f.mkv"], root="/other")
+
+    assert sqlite_index.distinct_dirs_for_root("/m", prefix="/m/Ab") == ["/m/Ab", "/m/Abc"]
+    assert sqlite_index.distinct_dirs_for_root("/m") == ["/m/Ab", "/m/Abc", "/m/B", "/n/Ab"]
+    assert sqlite_index.distinct_dirs_for_root("/m", prefix="/m/", limit=2) == ["/m/Ab", "/m/Abc"]
+
+    # Like the LIKE it replaced, the prefix match ignores ASCII case.
+    assert sqlite_index.distinct_dirs_for_root("/m", prefix="/M/aB") == ["/m/Ab", "/m/Abc"]
+    sqlite_index.upsert_paths(["/m/x@y/g.mkv", "/m/x[y/h.mkv"], root="/m")
+    assert sqlite_index.distinct_dirs_for_root("/m", prefix="/m/x?") == []
+    assert sqlite_index.distinct_dirs_for_root("/m", prefix="/m/X@") == ["/m/x@y"]
+
+
+def test_dir_name_ext_are_generated_and_legacy_tables_migrate(tmp_path, monkeypatch):
+    db = tmp_path / "analysis.sqlite"
+    monkeypatch.setattr(sqlite_index, "_db_path", lambda: db)
+    legacy = sqlite3.connect(db)
+    legacy.execute(
+        "CREATE TABLE files (path TEXT PRIMARY KEY, dir TEXT NOT NULL, name TEXT NOT NULL, "
+        "ext TEXT NOT NULL, root TEXT NOT NULL, scanned_at INTEGER NOT NULL)"
+    )
+    legacy.execute("INSERT INTO files VALUES('/m/Old/old.mkv', '/m/Old', 'old.mkv', 'mkv', '/m', 1)")
+    legacy.commit()
+    legacy.close()
+
+    sqlite_index.upsert_paths(["/m/A b/Film.Part.MKV", "/m/README", "/top.nfo"], root="/m")
+
+    conn = sqlite_index.connect()
+    try:
+        rows = conn.execute("SELECT path, dir, name, ext FROM files ORDER BY path").fetchall()
+    finally:
+        conn.close()
+    assert rows == [
+        ("/m/A b/Film.Part.MKV", "/m/A b", "Film.Part.MKV", "mkv"),
+        ("/m/Old/old.mkv", "/m/Old", "old.mkv", "mkv"),
+        ("/m/README", "/m", "README", ""),
+        ("/top.nfo", "/", "top.nfo", "nfo"),
+    ]
+    assert sqlite_index.search_files("old.m") == ["/m/Old/old.mkv"]
+
+
+def test_files_under_dir_recursive_is_scoped_to_the_subtree(tmp_path, monkeypatch):
+    monkeypatch.setattr(sqlite_index, "_db_path", lambda: tmp_path / "analysis.sqlite")
+    sqlite_index.upsert_paths(
+        ["/m/a_b/x.mkv", "/m/a_b/sub/y.nfo", "/m/axb/z.mkv", "/m/a_b.mkv", "/m/a_b0/w.mkv"], root="/m"
+    )
+
+    assert sqlite_index.files_under_dir_recursive("/m/a_b/") == ["/m/a_b/sub/y.nfo", "/m/a_b/x.mkv"]
+    assert sqlite_index.files_under_dir_recursive("/m/a_b", exts=[".MKV"]) == ["/m/a_b/x.mkv"]
+    assert sqlite_index.files_under_dir_recursive_for_root("/x", "/m/a_b") == []
+    assert len(sqlite_index.files_under_dir_recursive("/")) == 5
+
+
+def test_ext_filter_normalizes_and_orders_extensions():
+    assert sqlite_index._ext_filter(["MKV", ".mp4", "mkv"]) == (("mkv", "mp4"), "?,?")
+    fs = frozenset({"mp4", "avi"})
+    assert sqlite_index._ext_filter(fs) is sqlite_index._ext_filter(fs)
+
+
+def test_redundant_dir_index_is_dropped(tmp_path, monkeypatch):
+    db = tmp_path / "analysis.sqlite"
+    monkeypatch.setattr(sqlite_index, "_db_path", lambda: db)
+    sqlite_index.init_db()
+    conn = sqlite_index.connect()
+    conn.execute("CREATE INDEX idx_files_dir ON files(dir)")
+    conn.commit()
+    conn.close()
+    sqlite_index._initialized.discard(str(db))
+
+    sqlite_index.init_db()
+
+    conn = sqlite_index.connect()
+    try:
+        names = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type='index'")}
+    finally:
+        conn.close()
+    assert "idx_files_dir" not in names
+    assert "idx_files_dir_ext" in names
@@ -0,0 +1,27 @@
+import pytest
+
+from jfo.core.validators import Sandbox, SandboxViolation
+
+
+def test_allows_children_of_agrees_with_per_path_checks():
+    sb = Sandbox(["/volume1/movies", "/volume2/tv/"])
+    for directory in ["/volume1/movies", "/volume1/movies/A (2001)", "/volume1", "/volume2/tv", "/", "/volume1/movies/../x"]:
+        for name in ["a.mkv", "movies", "tv"]:
+            path = directory.rstrip("/") + "/" + name
+            try:
+                sb.assert_path_allowed(path)
+                allowed = True
+            except SandboxViolation:
+                allowed = False
+            if sb.allows_children_of(directory):
+                assert allowed, path
+
+    assert sb.allows_children_of("/volume1/movies")
+    assert not sb.allows_children_of("/volume1")
+    assert not sb.allows_children_of("/volume1/movies/")
+    assert not Sandbox([]).allows_children_of("/volume1/movies")
+
+
+def test_assert_path_allowed_rejects_traversal():
+    with pytest.raises(SandboxViolation):
+        Sandbox(["/volume1/movies"]).assert_path_allowed("/volume1/movies/../etc")